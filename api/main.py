@@ -3,12 +3,23 @@ from fastapi.responses import RedirectResponse, HTMLResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi import Request
+from contextlib import asynccontextmanager
 import os
 
-from .routers import auth, emails, chatbot, github, github_chatbot, teams, teams_chatbot
-from .services.email_service import EmailService
-from .services.ai_service import AIService
+from .routers import auth, emails, chatbot, github, github_chatbot, teams, teams_chatbot, briefing, jobs, updates, webhooks, search, insights
+from .routers import dashboard as dashboard_router
+from .services.service_container import container
+from .services.circuit_breaker_service import CLOSED, gemini_breaker
+from .services.single_flight_service import single_flight
+from .services.graph_client_service import graph_throttle_policy
+from .services.deadline_service import budget_for_path, request_deadline
+from .services.job_service import job_queue
+from .services.update_service import update_broker
+from .services.store_service import local_store
+from .services.swr_cache_service import swr_cache
+from .services.rollup_service import activity_rollups
 from .routers.auth import is_authenticated, tokens
+from .routers.jobs import submit_job
 
 # Constants
 APP_TITLE = "MCP Outlook Reader API"
@@ -19,11 +30,25 @@ PORT = 8000
 STATIC_DIR = "frontend/static"
 TEMPLATES_DIR = "frontend/templates"
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Share one service container for the app's lifetime and close it on shutdown"""
+    app.state.container = container
+    app.state.job_queue = job_queue
+    local_store.start()
+    activity_rollups.load(local_store)
+    job_queue.start()
+    yield
+    job_queue.stop()
+    local_store.stop()
+    container.close()
+
 # Create FastAPI app
 app = FastAPI(
     title=APP_TITLE,
     description=APP_DESCRIPTION,
-    version=APP_VERSION
+    version=APP_VERSION,
+    lifespan=lifespan
 )
 
 # Include routers
@@ -34,6 +59,25 @@ app.include_router(github.router)
 app.include_router(github_chatbot.router)
 app.include_router(teams.router)
 app.include_router(teams_chatbot.router)
+app.include_router(briefing.router)
+app.include_router(jobs.router)
+app.include_router(updates.router)
+app.include_router(webhooks.router)
+app.include_router(search.router)
+app.include_router(insights.router)
+app.include_router(dashboard_router.router)
+
+@app.middleware("http")
+async def apply_request_deadline(request: Request, call_next):
+    """Give each request a time budget that every upstream call inherits"""
+    with request_deadline(budget_for_path(request.url.path)) as deadline:
+        response = await call_next(request)
+    
+    # Mark responses built from partial upstream data
+    if deadline.partial:
+        response.headers["X-Partial-Results"] = "true"
+        response.headers["X-Skipped-Upstream-Calls"] = ", ".join(deadline.skipped)
+    return response
 
 # Serve static files
 if os.path.exists(STATIC_DIR):
@@ -54,8 +98,7 @@ def home():
 def github_callback(code: str):
     """Handle GitHub OAuth callback"""
     try:
-        from .services.github_auth_service import GitHubAuthService
-        auth_service = GitHubAuthService()
+        auth_service = container.github_auth_service
         token_response = auth_service.get_access_token(code)
         
         if "error" in token_response:
@@ -68,6 +111,13 @@ def github_callback(code: str):
         from .routers.github import github_tokens
         github_tokens["github_access_token"] = token_response["access_token"]
         
+        # GitHub data mirrored on disk for a different account must never be served to this one
+        access_token = github_tokens["github_access_token"]
+        swr_cache.claim_account("github", access_token, lambda: str(auth_service.get_user_info(access_token)["id"]))
+        
+        # Warm the GitHub data, summary and suggestion answers before the dashboard asks for them
+        submit_job("github-summary")
+        
         return RedirectResponse(url="/dashboard", status_code=302)
         
     except Exception as e:
@@ -100,8 +150,7 @@ def teams_callback(code: str = None, error: str = None, error_description: str =
                 "No authorization code received from Microsoft. Please try again."
             )
         
-        from .services.teams_auth_service import TeamsAuthService
-        auth_service = TeamsAuthService()
+        auth_service = container.teams_auth_service
         token_response = auth_service.get_access_token(code)
         
         if "error" in token_response:
@@ -116,6 +165,13 @@ def teams_callback(code: str = None, error: str = None, error_description: str =
         if "refresh_token" in token_response:
             teams_tokens["teams_refresh_token"] = token_response["refresh_token"]
         
+        # Teams data mirrored on disk for a different account must never be served to this one
+        access_token = teams_tokens["teams_access_token"]
+        swr_cache.claim_account("teams", access_token, lambda: auth_service.get_user_info(access_token)["id"])
+        
+        # Warm the Teams data, summary and suggestion answers before the dashboard asks for them
+        submit_job("teams-summary")
+        
         return RedirectResponse(url="/dashboard", status_code=302)
         
     except Exception as e:
@@ -126,27 +182,24 @@ def teams_callback(code: str = None, error: str = None, error_description: str =
 
 @app.get("/dashboard")
 def dashboard(request: Request):
-    """Main dashboard - shows email summary if authenticated"""
+    """Main dashboard - renders at once from cached data; the page hydrates the rest"""
     if not is_authenticated():
         return RedirectResponse(url="/auth/login", status_code=302)
     
     try:
-        email_service = EmailService()
-        ai_service = AIService()
-        
-        emails = email_service.get_all_emails(tokens["access_token"])
-        ai_summary = ai_service.summarize_emails(emails)
-        
-        # Count unread emails
-        unread_count = sum(1 for email in emails if not email.get("isRead", True))
+        # Only cached data here: no Graph call or LLM generation before the first byte
+        update_seq = update_broker.seq
+        email = dashboard_router.bootstrap_provider("email")
         
+        # Anything missing is filled in by the page from /dashboard/bootstrap and the update stream
         return templates.TemplateResponse(
             "dashboard.html",
             {
                 "request": request,
-                "summary": ai_summary,
-                "email_count": len(emails),
-                "unread_count": unread_count
+                "summary": email["summary"],
+                "update_seq": update_seq,
+                "email_count": email.get("email_count"),
+                "unread_count": email.get("unread_count")
             }
         )
         
@@ -164,7 +217,15 @@ def api_docs():
 @app.get("/health")
 def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "service": APP_TITLE}
+    gemini = gemini_breaker.snapshot()
+    return {
+        "status": "healthy" if gemini["state"] == CLOSED else "degraded",
+        "service": APP_TITLE,
+        "circuit_breakers": {"gemini": gemini},
+        "single_flight": single_flight.snapshot(),
+        "graph_throttling": graph_throttle_policy.snapshot(),
+        "graph_subscriptions": container.graph_subscriptions.snapshot()
+    }
 
 def _create_error_html_response(title: str, error_message: str) -> HTMLResponse:
     """Create a standardized error HTML response"""
@@ -6,10 +6,12 @@ class ChatMessage(BaseModel):
     """Model for chat messages"""
     message: str
     timestamp: Optional[str] = None
+    conversation_id: Optional[str] = None
 
 
 class ChatResponse(BaseModel):
     """Model for chatbot responses"""
     response: str
     status: str = "success"
-    message_count: Optional[int] = None 
\ No newline at end of file
+    message_count: Optional[int] = None
+    conversation_id: Optional[str] = None 
\ No newline at end of file
@@ -1,2 +1,2 @@
 # Routers Package
-from . import auth, emails, chatbot, github, github_chatbot, teams, teams_chatbot 
\ No newline at end of file
+from . import auth, emails, chatbot, github, github_chatbot, teams, teams_chatbot, briefing, jobs, updates, webhooks, dashboard, search 
\ No newline at end of file
@@ -2,6 +2,11 @@ from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import RedirectResponse
 from typing import Dict
 from ..services.auth_service import AuthService
+from ..services.service_container import container
+from ..services.store_service import local_store
+from ..services.email_body_service import email_body_cache
+from ..services.rollup_service import activity_rollups
+from ..services.swr_cache_service import swr_cache
 from ..models.auth import AuthStatus, TokenResponse, AuthError
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
@@ -11,7 +16,7 @@ tokens = {}
 
 def get_auth_service() -> AuthService:
     """Dependency to get auth service"""
-    return AuthService()
+    return container.auth_service
 
 def is_authenticated() -> bool:
     """Check if user is authenticated"""
@@ -49,6 +54,15 @@ def callback(
         
         tokens["access_token"] = token_response["access_token"]
         
+        # Mail mirrored on disk for a different account must never be served to this one
+        access_token = tokens["access_token"]
+        if swr_cache.claim_account("email", access_token, lambda: auth_service.get_user_info(access_token)["id"]):
+            email_body_cache.clear()
+        
+        # Warm the inbox, summary and suggestion answers before the dashboard asks for them
+        from .jobs import submit_job
+        submit_job("email-summary")
+        
         return RedirectResponse(url="/dashboard", status_code=302)
         
     except HTTPException:
@@ -76,6 +90,11 @@ def logout():
     if "access_token" in tokens:
         del tokens["access_token"]
     
+    # The next account to sign in must not be served this one's mail from disk
+    local_store.clear("email")
+    email_body_cache.clear()
+    activity_rollups.clear("email")
+    
     return {"message": "Logged out successfully"}
 
 @router.get("/token")
@@ -0,0 +1,138 @@
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+from ..services.email_service import EmailService
+from ..services.github_service import GitHubService
+from ..services.teams_service import TeamsService
+from ..services.ai_service import AIService
+from ..services.briefing_service import BriefingCache, briefing_cache
+from ..services.suggestion_cache_service import compute_fingerprint, suggestion_cache
+from ..services.service_container import container
+from ..services.deadline_service import with_current_context, partial_info
+from ..services.swr_cache_service import swr_cache, swr_key
+from .auth import is_authenticated, tokens
+from .github import is_github_authenticated, github_tokens
+from .teams import is_teams_authenticated, teams_tokens
+from . import chatbot, github_chatbot, teams_chatbot
+
+router = APIRouter(tags=["briefing"])
+
+def get_email_service() -> EmailService:
+    """Dependency to get email service"""
+    return container.email_service
+
+def get_github_service() -> GitHubService:
+    """Dependency to get GitHub service"""
+    return container.github_service
+
+def get_teams_service() -> TeamsService:
+    """Dependency to get Teams service"""
+    return container.teams_service
+
+def get_ai_service() -> AIService:
+    """Dependency to get AI service"""
+    return container.ai_service
+
+def get_briefing_cache() -> BriefingCache:
+    """Dependency to get the shared briefing cache"""
+    return briefing_cache
+
+@router.get("/briefing")
+def get_briefing(
+    background_tasks: BackgroundTasks,
+    email_service: EmailService = Depends(get_email_service),
+    github_service: GitHubService = Depends(get_github_service),
+    teams_service: TeamsService = Depends(get_teams_service),
+    ai_service: AIService = Depends(get_ai_service),
+    cache: BriefingCache = Depends(get_briefing_cache)
+) -> Dict:
+    """Get one combined AI summary for email, GitHub and Teams"""
+    if not is_authenticated():
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    # Fetch every connected source concurrently, through the caches the login prefetch warms
+    email_token = tokens["access_token"]
+    loaders = {"email": lambda: swr_cache.get(swr_key("emails/all", email_token), lambda: email_service.get_all_emails(email_token))[0]}
+    if is_github_authenticated():
+        github_token = github_tokens["github_access_token"]
+        loaders["github"] = lambda: swr_cache.get(swr_key("github/all", github_token), lambda: github_service.get_all_github_data(github_token))[0]
+    if is_teams_authenticated():
+        teams_token = teams_tokens["teams_access_token"]
+        loaders["teams"] = lambda: swr_cache.get(swr_key("teams/all", teams_token), lambda: teams_service.get_teams_data_with_meetings(teams_token))[0]
+    
+    data = {}
+    with ThreadPoolExecutor(max_workers=len(loaders)) as pool:
+        futures = {source: pool.submit(with_current_context(loader)) for source, loader in loaders.items()}
+        for source, future in futures.items():
+            try:
+                data[source] = future.result()
+            except Exception as e:
+                print(f"Warning: Could not load {source} data for briefing: {e}")
+    
+    if "email" not in data:
+        raise HTTPException(status_code=500, detail="Failed to generate briefing: could not load emails")
+    
+    try:
+        source_fingerprints = {source: compute_fingerprint(source_data) for source, source_data in data.items()}
+        fingerprint = compute_fingerprint(source_fingerprints)
+        
+        # Fall back to per-source summaries, e.g. the ones generated by the login prefetch
+        sections = cache.get(fingerprint) or cache.get_sections(source_fingerprints)
+        cached = sections is not None
+        if not cached:
+            sections = ai_service.summarize_briefing(
+                emails=data.get("email"),
+                github_data=data.get("github"),
+                teams_data=data.get("teams")
+            )
+            cache.put(fingerprint, source_fingerprints, sections)
+        
+        # Refresh the precomputed suggestion answers for any source whose data changed
+        precompute = {
+            "email": (chatbot.precompute_suggestion_answers, tokens.get("access_token")),
+            "github": (github_chatbot.precompute_suggestion_answers, github_tokens.get("github_access_token")),
+            "teams": (teams_chatbot.precompute_suggestion_answers, teams_tokens.get("teams_access_token"))
+        }
+        for source, source_data in data.items():
+            if suggestion_cache.observe(source, source_data):
+                task, token = precompute[source]
+                background_tasks.add_task(task, token, source_data)
+        
+        emails = data["email"]
+        result = {
+            "email": {
+                "summary": sections.get("email"),
+                "email_count": len(emails),
+                "unread_count": sum(1 for email in emails if not email.get("isRead", True))
+            },
+            "github": None,
+            "teams": None,
+            "cached": cached,
+            **partial_info(),
+            "status": "success"
+        }
+        
+        if "github" in data:
+            github_data = data["github"]
+            result["github"] = {
+                "summary": sections.get("github"),
+                "total_repos": github_data["total_repos"],
+                "total_commits": github_data["total_commits"],
+                "total_issues": github_data["total_issues"],
+                "total_pull_requests": github_data["total_pull_requests"]
+            }
+        
+        if "teams" in data:
+            teams_data = data["teams"]
+            result["teams"] = {
+                "summary": sections.get("teams"),
+                "total_teams": teams_data["total_teams"],
+                "total_channels": teams_data["total_channels"],
+                "total_messages": teams_data["total_messages"],
+                "total_chats": teams_data["total_chats"],
+                "total_meetings": teams_data["total_meetings"]
+            }
+        
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to generate briefing: {str(e)}")
@@ -1,7 +1,11 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict
-from ..services.chatbot_service import ChatbotService
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from typing import Dict, List, Optional
+from ..services.chatbot_service import ChatbotService, EMAIL_SUGGESTIONS
 from ..services.email_service import EmailService
+from ..services.chat_session_service import ChatSessionService, chat_sessions
+from ..services.suggestion_cache_service import SuggestionCacheService, suggestion_cache
+from ..services.service_container import container
+from ..services.deadline_service import no_deadline
 from ..models.chatbot import ChatMessage, ChatResponse
 from .auth import is_authenticated, tokens
 
@@ -9,50 +13,100 @@ router = APIRouter(prefix="/chatbot", tags=["chatbot"])
 
 def get_chatbot_service() -> ChatbotService:
     """Dependency to get chatbot service"""
-    return ChatbotService()
+    return container.chatbot_service
 
 def get_email_service() -> EmailService:
     """Dependency to get email service"""
-    return EmailService()
+    return container.email_service
+
+def get_chat_session_service() -> ChatSessionService:
+    """Dependency to get the shared chat session store"""
+    return chat_sessions
+
+def get_suggestion_cache() -> SuggestionCacheService:
+    """Dependency to get the shared suggestion answer cache"""
+    return suggestion_cache
+
+def precompute_suggestion_answers(access_token: str, emails: Optional[List[Dict]] = None):
+    """Pre-generate answers to the suggested questions against the current email snapshot"""
+    # Runs after the response, so it must not inherit the request deadline
+    with no_deadline():
+        try:
+            if emails is None:
+                emails = container.email_service.get_all_emails(access_token)
+            
+            chatbot_service = container.chatbot_service
+            generated = suggestion_cache.precompute(
+                "email",
+                emails,
+                EMAIL_SUGGESTIONS,
+                lambda question, data: chatbot_service.chat_about_emails(question, data, raise_on_error=True)
+            )
+            print(f"Precomputed {generated} email suggestion answers")
+        except Exception as e:
+            print(f"Warning: Could not precompute email suggestion answers: {e}")
 
 @router.post("/chat")
 def chat_with_assistant(
     message: ChatMessage,
+    background_tasks: BackgroundTasks,
     chatbot_service: ChatbotService = Depends(get_chatbot_service),
-    email_service: EmailService = Depends(get_email_service)
+    email_service: EmailService = Depends(get_email_service),
+    session_service: ChatSessionService = Depends(get_chat_session_service),
+    answer_cache: SuggestionCacheService = Depends(get_suggestion_cache)
 ) -> ChatResponse:
     """Chat with email assistant"""
     if not is_authenticated():
         raise HTTPException(status_code=401, detail="Not authenticated")
     
     try:
-        # Get emails for context
-        emails = email_service.get_all_emails(tokens["access_token"])
+        session = session_service.get_session(message.conversation_id, "email")
+        
+        # Suggestion chips are answered from the precomputed cache when available
+        cached = answer_cache.get_answer("email", message.message)
+        if cached is not None:
+            response, emails = cached
+            if session is None:
+                session = session_service.create_session("email", emails)
+            session.add_turn(message.message, response)
+            
+            return ChatResponse(
+                response=response,
+                status="success",
+                message_count=len(session.data),
+                conversation_id=session.session_id
+            )
+        
+        # Follow-ups reuse the session's email snapshot instead of re-fetching
+        if session is None or session.is_snapshot_stale():
+            emails = email_service.get_all_emails(tokens["access_token"])
+            if session is None:
+                session = session_service.create_session("email", emails)
+            else:
+                session.update_snapshot(emails)
+            
+            if answer_cache.observe("email", emails):
+                background_tasks.add_task(precompute_suggestion_answers, tokens["access_token"], emails)
         
         # Generate chatbot response
-        response = chatbot_service.chat_about_emails(message.message, emails)
+        access_token = tokens["access_token"]
+        response = chatbot_service.chat_about_emails(
+            message.message, session.data, session,
+            fetch_body=lambda email_id: email_service.get_email_body(access_token, email_id)
+        )
+        session.add_turn(message.message, response)
         
         return ChatResponse(
             response=response,
             status="success",
-            message_count=len(emails)
+            message_count=len(session.data),
+            conversation_id=session.session_id
         )
-        
+    
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate response: {str(e)}")
 
 @router.get("/suggestions")
 def get_chat_suggestions() -> Dict:
     """Get suggested questions for the chatbot"""
-    suggestions = [
-        "How many unread emails do I have?",
-        "Show me emails from a specific sender",
-        "What are the most recent emails?",
-        "Are there any urgent emails?",
-        "Summarize my emails by topic",
-        "Find emails about meetings",
-        "What's my email activity pattern?",
-        "Which senders email me most often?"
-    ]
-    
-    return {"suggestions": suggestions} 
\ No newline at end of file
+    return {"suggestions": EMAIL_SUGGESTIONS}
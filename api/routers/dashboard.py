@@ -0,0 +1,76 @@
+from fastapi import APIRouter, HTTPException
+from typing import Dict
+from ..services.briefing_service import briefing_cache
+from ..services.suggestion_cache_service import compute_fingerprint
+from ..services.swr_cache_service import swr_cache, swr_key
+from ..services.update_service import update_broker
+from ..services.chatbot_service import EMAIL_SUGGESTIONS
+from ..services.github_chatbot_service import GITHUB_SUGGESTIONS
+from ..services.teams_chatbot_service import TEAMS_SUGGESTIONS
+from .auth import is_authenticated, tokens
+from .github import is_github_authenticated, github_tokens
+from .teams import is_teams_authenticated, teams_tokens
+from .jobs import submit_job
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+def email_counts(emails) -> Dict:
+    return {
+        "email_count": len(emails),
+        "unread_count": sum(1 for email in emails if not email.get("isRead", True))
+    }
+
+def github_counts(github_data: Dict) -> Dict:
+    return {
+        "total_repos": github_data["total_repos"],
+        "total_commits": github_data["total_commits"],
+        "total_issues": github_data["total_issues"],
+        "total_pull_requests": github_data["total_pull_requests"]
+    }
+
+def teams_counts(teams_data: Dict) -> Dict:
+    return {
+        "total_teams": teams_data["total_teams"],
+        "total_channels": teams_data["total_channels"],
+        "total_messages": teams_data["total_messages"],
+        "total_chats": teams_data["total_chats"],
+        "total_meetings": teams_data.get("total_meetings", 0)
+    }
+
+# Per provider: cached snapshot, the job that (re)builds it, auth check, token, suggestions and counts
+PROVIDERS = {
+    "email": ("emails/all", "email-summary", is_authenticated, lambda: tokens.get("access_token"), EMAIL_SUGGESTIONS, email_counts),
+    "github": ("github/all", "github-summary", is_github_authenticated, lambda: github_tokens.get("github_access_token"), GITHUB_SUGGESTIONS, github_counts),
+    "teams": ("teams/all", "teams-summary", is_teams_authenticated, lambda: teams_tokens.get("teams_access_token"), TEAMS_SUGGESTIONS, teams_counts)
+}
+
+def bootstrap_provider(source: str) -> Dict:
+    """Auth status, counts, cached summary and suggestions for one provider, from cache only"""
+    snapshot_endpoint, job_kind, is_connected, get_token, suggestions, counts = PROVIDERS[source]
+    if not is_connected():
+        return {"connected": False}
+
+    result = {"connected": True, "summary": None, "suggestions": suggestions, "job_id": None}
+    cached = swr_cache.peek(swr_key(snapshot_endpoint, get_token()))
+    if cached is not None:
+        snapshot, _ = cached
+        result.update(counts(snapshot))
+        result["summary"] = briefing_cache.get_section(source, compute_fingerprint(snapshot))
+
+    # Missing or stale pieces are rebuilt by a background job; job_id lets the page follow it
+    if result["summary"] is None or cached[1] >= swr_cache.fresh_seconds:
+        result["job_id"] = submit_job(job_kind).job_id
+    return result
+
+@router.get("/bootstrap")
+def get_dashboard_bootstrap() -> Dict:
+    """Everything the dashboard needs on load, for every provider, in one round trip"""
+    if not is_authenticated():
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    # Read before any job is queued, so the update stream replays whatever those jobs publish
+    update_seq = update_broker.seq
+    return {
+        **{source: bootstrap_provider(source) for source in PROVIDERS},
+        "update_seq": update_seq
+    }
@@ -1,19 +1,30 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Response
 from typing import List, Dict
 from ..services.email_service import EmailService
 from ..services.ai_service import AIService
+from ..services.suggestion_cache_service import suggestion_cache
+from ..services.service_container import container
+from ..services.deadline_service import partial_info
+from ..services.swr_cache_service import swr_cache, swr_key
+from ..services.briefing_service import summarize_cached
+from ..services.email_body_service import EmailBodyCache, email_body_cache
 from ..models.auth import EmailSummary
 from .auth import is_authenticated, tokens
+from .chatbot import precompute_suggestion_answers
 
 router = APIRouter(prefix="/emails", tags=["emails"])
 
 def get_email_service() -> EmailService:
     """Dependency to get email service"""
-    return EmailService()
+    return container.email_service
 
 def get_ai_service() -> AIService:
     """Dependency to get AI service"""
-    return AIService()
+    return container.ai_service
+
+def get_email_body_cache() -> EmailBodyCache:
+    """Dependency to get the shared email body cache"""
+    return email_body_cache
 
 @router.get("/summary")
 def get_email_summary(
@@ -30,6 +41,7 @@ def get_email_summary(
 
 @router.get("/all")
 def get_all_emails(
+    response: Response,
     email_service: EmailService = Depends(get_email_service)
 ) -> List[Dict]:
     """Get all emails"""
@@ -37,12 +49,19 @@ def get_all_emails(
         raise HTTPException(status_code=401, detail="Not authenticated")
     
     try:
-        return email_service.get_all_emails(tokens["access_token"])
+        access_token = tokens["access_token"]
+        data, age = swr_cache.get(
+            swr_key("emails/all", access_token),
+            lambda: email_service.get_all_emails(access_token)
+        )
+        response.headers["Age"] = str(age)
+        return data
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get emails: {str(e)}")
 
 @router.get("/unread")
 def get_unread_emails(
+    response: Response,
     email_service: EmailService = Depends(get_email_service)
 ) -> List[Dict]:
     """Get unread emails"""
@@ -50,12 +69,19 @@ def get_unread_emails(
         raise HTTPException(status_code=401, detail="Not authenticated")
     
     try:
-        return email_service.get_unread_emails(tokens["access_token"])
+        access_token = tokens["access_token"]
+        data, age = swr_cache.get(
+            swr_key("emails/unread", access_token),
+            lambda: email_service.get_unread_emails(access_token)
+        )
+        response.headers["Age"] = str(age)
+        return data
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get emails: {str(e)}")
 
 @router.get("/ai-summary")
 def get_ai_email_summary(
+    background_tasks: BackgroundTasks,
     email_service: EmailService = Depends(get_email_service),
     ai_service: AIService = Depends(get_ai_service)
 ) -> Dict:
@@ -64,8 +90,13 @@ def get_ai_email_summary(
         raise HTTPException(status_code=401, detail="Not authenticated")
     
     try:
-        emails = email_service.get_all_emails(tokens["access_token"])
-        ai_summary = ai_service.summarize_emails(emails)
+        access_token = tokens["access_token"]
+        emails, _ = swr_cache.get(swr_key("emails/all", access_token), lambda: email_service.get_all_emails(access_token))
+        ai_summary = summarize_cached("email", emails, ai_service.summarize_emails)
+        
+        # Refresh the precomputed suggestion answers if the data changed
+        if suggestion_cache.observe("email", emails):
+            background_tasks.add_task(precompute_suggestion_answers, tokens["access_token"], emails)
         
         # Count unread emails
         unread_count = sum(1 for email in emails if not email.get("isRead", True))
@@ -74,11 +105,28 @@ def get_ai_email_summary(
             "summary": ai_summary,
             "email_count": len(emails),
             "unread_count": unread_count,
+            **partial_info(),
             "status": "success"
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate AI summary: {str(e)}")
 
+@router.get("/{email_id}/body")
+def get_email_body(
+    email_id: str,
+    email_service: EmailService = Depends(get_email_service),
+    body_cache: EmailBodyCache = Depends(get_email_body_cache)
+) -> Dict:
+    """Get an email's full body as plain text, loaded on demand and cached"""
+    if not is_authenticated():
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    access_token = tokens["access_token"]
+    content = body_cache.get(email_id, lambda email_id: email_service.get_email_body(access_token, email_id))
+    if content is None:
+        raise HTTPException(status_code=404, detail="Email not found")
+    return {"id": email_id, "contentType": "text", "content": content}
+
 @router.patch("/{email_id}/read")
 def mark_email_as_read(
     email_id: str,
@@ -91,6 +139,8 @@ def mark_email_as_read(
     try:
         success = email_service.mark_as_read(tokens["access_token"], email_id)
         if success:
+            # Cached email lists now show a stale read state
+            swr_cache.invalidate("emails/")
             return {"message": "Email marked as read"}
         else:
             raise HTTPException(status_code=400, detail="Failed to mark email as read")
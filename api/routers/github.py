@@ -1,8 +1,15 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Response
 from typing import List, Dict
 from ..services.github_service import GitHubService
 from ..services.github_auth_service import GitHubAuthService
 from ..services.ai_service import AIService
+from ..services.suggestion_cache_service import suggestion_cache
+from ..services.service_container import container
+from ..services.deadline_service import partial_info
+from ..services.swr_cache_service import swr_cache, swr_key
+from ..services.briefing_service import summarize_cached
+from ..services.store_service import local_store
+from ..services.rollup_service import activity_rollups
 from ..models.github import GitHubSummary
 from .auth import is_authenticated
 
@@ -13,15 +20,15 @@ github_tokens = {}
 
 def get_github_service() -> GitHubService:
     """Dependency to get GitHub service"""
-    return GitHubService()
+    return container.github_service
 
 def get_github_auth_service() -> GitHubAuthService:
     """Dependency to get GitHub auth service"""
-    return GitHubAuthService()
+    return container.github_auth_service
 
 def get_ai_service() -> AIService:
     """Dependency to get AI service"""
-    return AIService()
+    return container.ai_service
 
 def is_github_authenticated() -> bool:
     """Check if user is authenticated with GitHub"""
@@ -59,6 +66,14 @@ def github_callback(
         
         github_tokens["github_access_token"] = token_response["access_token"]
         
+        # GitHub data mirrored on disk for a different account must never be served to this one
+        access_token = github_tokens["github_access_token"]
+        swr_cache.claim_account("github", access_token, lambda: str(auth_service.get_user_info(access_token)["id"]))
+        
+        # Warm the GitHub data, summary and suggestion answers before the dashboard asks for them
+        from .jobs import submit_job
+        submit_job("github-summary")
+        
         return {"message": "GitHub authentication successful"}
         
     except HTTPException:
@@ -86,6 +101,9 @@ def github_logout():
     if "github_access_token" in github_tokens:
         del github_tokens["github_access_token"]
     
+    local_store.clear("github")
+    activity_rollups.clear("github")
+    
     return {"message": "GitHub logout successful"}
 
 @router.get("/summary")
@@ -103,6 +121,7 @@ def get_github_summary(
 
 @router.get("/repositories")
 def get_github_repositories(
+    response: Response,
     github_service: GitHubService = Depends(get_github_service)
 ) -> List[Dict]:
     """Get GitHub repositories"""
@@ -110,12 +129,19 @@ def get_github_repositories(
         raise HTTPException(status_code=401, detail="Not authenticated with GitHub")
     
     try:
-        return github_service.get_user_repositories(github_tokens["github_access_token"])
+        access_token = github_tokens["github_access_token"]
+        data, age = swr_cache.get(
+            swr_key("github/repositories", access_token),
+            lambda: github_service.get_user_repositories(access_token)
+        )
+        response.headers["Age"] = str(age)
+        return data
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get repositories: {str(e)}")
 
 @router.get("/commits")
 def get_github_commits(
+    response: Response,
     github_service: GitHubService = Depends(get_github_service)
 ) -> List[Dict]:
     """Get GitHub commits"""
@@ -123,26 +149,34 @@ def get_github_commits(
         raise HTTPException(status_code=401, detail="Not authenticated with GitHub")
     
     try:
-        # Get all repositories and their commits
-        repositories = github_service.get_user_repositories(github_tokens["github_access_token"])
-        all_commits = []
+        access_token = github_tokens["github_access_token"]
         
-        for repo in repositories[:10]:  # Limit to first 10 repos
-            try:
-                commits = github_service.get_repository_commits(
-                    github_tokens["github_access_token"], 
-                    repo["full_name"]
-                )
-                all_commits.extend(commits)
-            except Exception as e:
-                print(f"Warning: Could not get commits for {repo['full_name']}: {e}")
+        def load() -> List[Dict]:
+            # Get all repositories and their commits
+            repositories = github_service.get_user_repositories(access_token)
+            all_commits = []
+            
+            for repo in repositories[:10]:  # Limit to first 10 repos
+                try:
+                    commits = github_service.get_repository_commits(
+                        access_token, 
+                        repo["full_name"]
+                    )
+                    all_commits.extend(commits)
+                except Exception as e:
+                    print(f"Warning: Could not get commits for {repo['full_name']}: {e}")
+            
+            return all_commits
         
-        return all_commits
+        data, age = swr_cache.get(swr_key("github/commits", access_token), load)
+        response.headers["Age"] = str(age)
+        return data
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get commits: {str(e)}")
 
 @router.get("/issues")
 def get_github_issues(
+    response: Response,
     github_service: GitHubService = Depends(get_github_service)
 ) -> List[Dict]:
     """Get GitHub issues"""
@@ -150,12 +184,19 @@ def get_github_issues(
         raise HTTPException(status_code=401, detail="Not authenticated with GitHub")
     
     try:
-        return github_service.get_user_issues(github_tokens["github_access_token"])
+        access_token = github_tokens["github_access_token"]
+        data, age = swr_cache.get(
+            swr_key("github/issues", access_token),
+            lambda: github_service.get_user_issues(access_token)
+        )
+        response.headers["Age"] = str(age)
+        return data
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get issues: {str(e)}")
 
 @router.get("/pull-requests")
 def get_github_pull_requests(
+    response: Response,
     github_service: GitHubService = Depends(get_github_service)
 ) -> List[Dict]:
     """Get GitHub pull requests"""
@@ -163,12 +204,19 @@ def get_github_pull_requests(
         raise HTTPException(status_code=401, detail="Not authenticated with GitHub")
     
     try:
-        return github_service.get_user_pull_requests(github_tokens["github_access_token"])
+        access_token = github_tokens["github_access_token"]
+        data, age = swr_cache.get(
+            swr_key("github/pull-requests", access_token),
+            lambda: github_service.get_user_pull_requests(access_token)
+        )
+        response.headers["Age"] = str(age)
+        return data
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get pull requests: {str(e)}")
 
 @router.get("/ai-summary")
 def get_ai_github_summary(
+    background_tasks: BackgroundTasks,
     github_service: GitHubService = Depends(get_github_service),
     ai_service: AIService = Depends(get_ai_service)
 ) -> Dict:
@@ -177,8 +225,14 @@ def get_ai_github_summary(
         raise HTTPException(status_code=401, detail="Not authenticated with GitHub")
     
     try:
-        github_data = github_service.get_all_github_data(github_tokens["github_access_token"])
-        ai_summary = ai_service.summarize_github_data(github_data)
+        access_token = github_tokens["github_access_token"]
+        github_data, _ = swr_cache.get(swr_key("github/all", access_token), lambda: github_service.get_all_github_data(access_token))
+        ai_summary = summarize_cached("github", github_data, ai_service.summarize_github_data)
+        
+        # Refresh the precomputed suggestion answers if the data changed
+        if suggestion_cache.observe("github", github_data):
+            from .github_chatbot import precompute_suggestion_answers
+            background_tasks.add_task(precompute_suggestion_answers, github_tokens["github_access_token"], github_data)
         
         return {
             "summary": ai_summary,
@@ -186,6 +240,7 @@ def get_ai_github_summary(
             "total_commits": github_data["total_commits"],
             "total_issues": github_data["total_issues"],
             "total_pull_requests": github_data["total_pull_requests"],
+            **partial_info(),
             "status": "success"
         }
     except Exception as e:
@@ -1,7 +1,11 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict
-from ..services.github_chatbot_service import GitHubChatbotService
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from typing import Dict, Optional
+from ..services.github_chatbot_service import GitHubChatbotService, GITHUB_SUGGESTIONS
 from ..services.github_service import GitHubService
+from ..services.chat_session_service import ChatSessionService, chat_sessions
+from ..services.suggestion_cache_service import SuggestionCacheService, suggestion_cache
+from ..services.service_container import container
+from ..services.deadline_service import no_deadline
 from ..models.chatbot import ChatMessage, ChatResponse
 from .github import is_github_authenticated, github_tokens
 
@@ -9,52 +13,96 @@ router = APIRouter(prefix="/github-chatbot", tags=["github-chatbot"])
 
 def get_github_chatbot_service() -> GitHubChatbotService:
     """Dependency to get GitHub chatbot service"""
-    return GitHubChatbotService()
+    return container.github_chatbot_service
 
 def get_github_service() -> GitHubService:
     """Dependency to get GitHub service"""
-    return GitHubService()
+    return container.github_service
+
+def get_chat_session_service() -> ChatSessionService:
+    """Dependency to get the shared chat session store"""
+    return chat_sessions
+
+def get_suggestion_cache() -> SuggestionCacheService:
+    """Dependency to get the shared suggestion answer cache"""
+    return suggestion_cache
+
+def precompute_suggestion_answers(token: str, github_data: Optional[Dict] = None):
+    """Pre-generate answers to the suggested questions against the current GitHub snapshot"""
+    # Runs after the response, so it must not inherit the request deadline
+    with no_deadline():
+        try:
+            if github_data is None:
+                github_data = container.github_service.get_all_github_data(token)
+            
+            chatbot_service = container.github_chatbot_service
+            generated = suggestion_cache.precompute(
+                "github",
+                github_data,
+                GITHUB_SUGGESTIONS,
+                lambda question, data: chatbot_service.chat_about_github(question, data, raise_on_error=True)
+            )
+            print(f"Precomputed {generated} GitHub suggestion answers")
+        except Exception as e:
+            print(f"Warning: Could not precompute GitHub suggestion answers: {e}")
 
 @router.post("/chat")
 def chat_with_github_assistant(
     message: ChatMessage,
+    background_tasks: BackgroundTasks,
     chatbot_service: GitHubChatbotService = Depends(get_github_chatbot_service),
-    github_service: GitHubService = Depends(get_github_service)
+    github_service: GitHubService = Depends(get_github_service),
+    session_service: ChatSessionService = Depends(get_chat_session_service),
+    answer_cache: SuggestionCacheService = Depends(get_suggestion_cache)
 ) -> ChatResponse:
     """Chat with GitHub assistant"""
     if not is_github_authenticated():
         raise HTTPException(status_code=401, detail="Not authenticated with GitHub")
     
     try:
-        # Get GitHub data for context
-        github_data = github_service.get_all_github_data(github_tokens["github_access_token"])
+        session = session_service.get_session(message.conversation_id, "github")
+        
+        # Suggestion chips are answered from the precomputed cache when available
+        cached = answer_cache.get_answer("github", message.message)
+        if cached is not None:
+            response, github_data = cached
+            if session is None:
+                session = session_service.create_session("github", github_data)
+            session.add_turn(message.message, response)
+            
+            return ChatResponse(
+                response=response,
+                status="success",
+                message_count=len(session.data.get("repositories", [])),
+                conversation_id=session.session_id
+            )
+        
+        # Follow-ups reuse the session's GitHub snapshot instead of re-crawling
+        if session is None or session.is_snapshot_stale():
+            github_data = github_service.get_all_github_data(github_tokens["github_access_token"])
+            if session is None:
+                session = session_service.create_session("github", github_data)
+            else:
+                session.update_snapshot(github_data)
+            
+            if answer_cache.observe("github", github_data):
+                background_tasks.add_task(precompute_suggestion_answers, github_tokens["github_access_token"], github_data)
         
         # Generate chatbot response
-        response = chatbot_service.chat_about_github(message.message, github_data)
+        response = chatbot_service.chat_about_github(message.message, session.data, session)
+        session.add_turn(message.message, response)
         
         return ChatResponse(
             response=response,
             status="success",
-            message_count=len(github_data.get("repositories", []))
+            message_count=len(session.data.get("repositories", [])),
+            conversation_id=session.session_id
         )
-        
+    
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate response: {str(e)}")
 
 @router.get("/suggestions")
 def get_github_chat_suggestions() -> Dict:
     """Get suggested questions for the GitHub chatbot"""
-    suggestions = [
-        "How many repositories do I have?",
-        "What are my most recent commits?",
-        "Show me my open issues",
-        "What languages do I use most?",
-        "Which repositories are most active?",
-        "How many pull requests do I have?",
-        "What's my GitHub activity pattern?",
-        "Which repositories have the most stars?",
-        "What are my most popular repositories?",
-        "Show me my recent contributions"
-    ]
-    
-    return {"suggestions": suggestions} 
\ No newline at end of file
+    return {"suggestions": GITHUB_SUGGESTIONS}
@@ -0,0 +1,80 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Any, Callable, Dict
+from ..services.rollup_service import ActivityRollups, activity_rollups, ROLLUP_DAYS, TOP_KEYS
+from ..services.swr_cache_service import swr_cache, swr_key
+from ..services.service_container import container
+from .auth import is_authenticated, tokens
+from .github import is_github_authenticated, github_tokens
+from .teams import is_teams_authenticated, teams_tokens
+
+router = APIRouter(prefix="/insights", tags=["insights"])
+
+# Constants
+MAX_TOP_KEYS = 50
+
+def get_activity_rollups() -> ActivityRollups:
+    """Dependency to get the shared activity rollups"""
+    return activity_rollups
+
+def source_insights(rollups: ActivityRollups, source: str, endpoint: str, access_token: str, loader: Callable[[], Any], days: int, top: int) -> Dict:
+    """A source's activity pattern, counting anything in its cached snapshot that the rollups have not seen yet"""
+    data, _ = swr_cache.get(swr_key(endpoint, access_token), loader)
+    rollups.observe(endpoint, data)
+    return rollups.insights(source, days, top)
+
+@router.get("/email")
+def get_email_insights(
+    days: int = Query(ROLLUP_DAYS, ge=1, le=ROLLUP_DAYS),
+    top: int = Query(TOP_KEYS, ge=1, le=MAX_TOP_KEYS),
+    rollups: ActivityRollups = Depends(get_activity_rollups)
+) -> Dict:
+    """Email activity by hour, weekday and day, with the most frequent senders"""
+    if not is_authenticated():
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    try:
+        access_token = tokens["access_token"]
+        return source_insights(
+            rollups, "email", "emails/all", access_token,
+            lambda: container.email_service.get_all_emails(access_token), days, top
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get email insights: {str(e)}")
+
+@router.get("/github")
+def get_github_insights(
+    days: int = Query(ROLLUP_DAYS, ge=1, le=ROLLUP_DAYS),
+    top: int = Query(TOP_KEYS, ge=1, le=MAX_TOP_KEYS),
+    rollups: ActivityRollups = Depends(get_activity_rollups)
+) -> Dict:
+    """GitHub commits, issues and pull requests by hour, weekday and day, with the most active repositories and authors"""
+    if not is_github_authenticated():
+        raise HTTPException(status_code=401, detail="Not authenticated with GitHub")
+    
+    try:
+        access_token = github_tokens["github_access_token"]
+        return source_insights(
+            rollups, "github", "github/all", access_token,
+            lambda: container.github_service.get_all_github_data(access_token), days, top
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get GitHub insights: {str(e)}")
+
+@router.get("/teams")
+def get_teams_insights(
+    days: int = Query(ROLLUP_DAYS, ge=1, le=ROLLUP_DAYS),
+    top: int = Query(TOP_KEYS, ge=1, le=MAX_TOP_KEYS),
+    rollups: ActivityRollups = Depends(get_activity_rollups)
+) -> Dict:
+    """Teams messages by hour, weekday and day, with the most active senders, teams, channels and chats"""
+    if not is_teams_authenticated():
+        raise HTTPException(status_code=401, detail="Not authenticated with Teams")
+    
+    try:
+        access_token = teams_tokens["teams_access_token"]
+        return source_insights(
+            rollups, "teams", "teams/all", access_token,
+            lambda: container.teams_service.get_teams_data_with_meetings(access_token), days, top
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get Teams insights: {str(e)}")
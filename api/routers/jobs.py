@@ -0,0 +1,220 @@
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
+from typing import Dict
+import asyncio
+import json
+from ..services.job_service import JobService, Job, TERMINAL_STATES, job_queue
+from ..services.suggestion_cache_service import suggestion_cache
+from ..services.briefing_service import summarize_cached
+from ..services.swr_cache_service import swr_cache, swr_key
+from ..services.update_service import update_broker
+from ..services.record_service import record_json
+from ..services.service_container import container
+from .auth import is_authenticated, tokens
+from .github import is_github_authenticated, github_tokens
+from .teams import is_teams_authenticated, teams_tokens
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+# Constants
+KEEPALIVE_SECONDS = 15
+JOB_POLL_SECONDS = 0.5
+
+def get_job_queue() -> JobService:
+    """Dependency to get the shared job queue"""
+    return job_queue
+
+def cached_snapshot(endpoint: str, params: Dict):
+    """The cached snapshot a webhook patched in place, when the job was asked to reuse it"""
+    if not params.get("from_cache"):
+        return None
+    cached = swr_cache.peek(swr_key(endpoint, params["access_token"]))
+    return cached[0] if cached else None
+
+def run_email_summary(params: Dict) -> Dict:
+    """Fetch emails and summarize them, warming the caches the dashboard reads"""
+    # Later inbox changes arrive as change notifications when a public webhook URL is configured
+    container.graph_subscriptions.ensure("email", lambda: tokens.get("access_token"))
+    
+    emails = cached_snapshot("emails/all", params)
+    if emails is None:
+        emails = container.email_service.get_all_emails(params["access_token"])
+        swr_cache.put(swr_key("emails/all", params["access_token"]), emails)
+    ai_summary = summarize_cached("email", emails, container.ai_service.summarize_emails)
+    
+    result = {
+        "summary": ai_summary,
+        "email_count": len(emails),
+        "unread_count": sum(1 for email in emails if not email.get("isRead", True))
+    }
+    
+    # Open dashboards get just the fields that changed
+    update_broker.publish("email", result)
+    
+    # Answers take several model calls, so they get their own job instead of delaying this result
+    if suggestion_cache.observe("email", emails):
+        submit_job("email-suggestions", refresh=True, from_cache=True)
+    
+    return result
+
+def run_github_crawl(params: Dict) -> Dict:
+    """Crawl repositories, commits, issues and pull requests"""
+    github_data = container.github_service.get_all_github_data(params["access_token"])
+    swr_cache.put(swr_key("github/all", params["access_token"]), github_data)
+    return github_data
+
+def run_github_summary(params: Dict) -> Dict:
+    """Crawl GitHub and summarize it"""
+    github_data = cached_snapshot("github/all", params)
+    if github_data is None:
+        github_data = run_github_crawl(params)
+    ai_summary = summarize_cached("github", github_data, container.ai_service.summarize_github_data)
+    
+    result = {
+        "summary": ai_summary,
+        "total_repos": github_data["total_repos"],
+        "total_commits": github_data["total_commits"],
+        "total_issues": github_data["total_issues"],
+        "total_pull_requests": github_data["total_pull_requests"]
+    }
+    
+    # Open dashboards get just the fields that changed
+    update_broker.publish("github", result)
+    
+    # Answers take several model calls, so they get their own job instead of delaying this result
+    if suggestion_cache.observe("github", github_data):
+        submit_job("github-suggestions", refresh=True, from_cache=True)
+    
+    return result
+
+def run_teams_crawl(params: Dict) -> Dict:
+    """Crawl teams, channels, chats and meetings"""
+    teams_data = container.teams_service.get_teams_data_with_meetings(params["access_token"])
+    swr_cache.put(swr_key("teams/all", params["access_token"]), teams_data)
+    return teams_data
+
+def run_teams_summary(params: Dict) -> Dict:
+    """Crawl Teams and summarize it"""
+    container.graph_subscriptions.ensure("teams", lambda: teams_tokens.get("teams_access_token"))
+    
+    teams_data = cached_snapshot("teams/all", params)
+    if teams_data is None:
+        teams_data = run_teams_crawl(params)
+    ai_summary = summarize_cached("teams", teams_data, container.ai_service.summarize_teams_data)
+    
+    result = {
+        "summary": ai_summary,
+        "total_teams": teams_data["total_teams"],
+        "total_channels": teams_data["total_channels"],
+        "total_messages": teams_data["total_messages"],
+        "total_chats": teams_data["total_chats"],
+        "total_meetings": teams_data["total_meetings"]
+    }
+    
+    # Open dashboards get just the fields that changed
+    update_broker.publish("teams", result)
+    
+    # Answers take several model calls, so they get their own job instead of delaying this result
+    if suggestion_cache.observe("teams", teams_data):
+        submit_job("teams-suggestions", refresh=True, from_cache=True)
+    
+    return result
+
+def run_email_suggestions(params: Dict) -> Dict:
+    """Pre-generate answers to the email suggestions against the cached snapshot"""
+    from .chatbot import precompute_suggestion_answers
+    precompute_suggestion_answers(params["access_token"], cached_snapshot("emails/all", params))
+    return {"source": "email"}
+
+def run_github_suggestions(params: Dict) -> Dict:
+    """Pre-generate answers to the GitHub suggestions against the cached snapshot"""
+    from .github_chatbot import precompute_suggestion_answers
+    precompute_suggestion_answers(params["access_token"], cached_snapshot("github/all", params))
+    return {"source": "github"}
+
+def run_teams_suggestions(params: Dict) -> Dict:
+    """Pre-generate answers to the Teams suggestions against the cached snapshot"""
+    from .teams_chatbot import precompute_suggestion_answers
+    precompute_suggestion_answers(params["access_token"], cached_snapshot("teams/all", params))
+    return {"source": "teams"}
+
+# Job kinds: handler, auth check and the token the job runs with
+JOB_KINDS = {
+    "email-summary": (run_email_summary, is_authenticated, lambda: tokens.get("access_token")),
+    "github-crawl": (run_github_crawl, is_github_authenticated, lambda: github_tokens.get("github_access_token")),
+    "github-summary": (run_github_summary, is_github_authenticated, lambda: github_tokens.get("github_access_token")),
+    "teams-crawl": (run_teams_crawl, is_teams_authenticated, lambda: teams_tokens.get("teams_access_token")),
+    "teams-summary": (run_teams_summary, is_teams_authenticated, lambda: teams_tokens.get("teams_access_token")),
+    "email-suggestions": (run_email_suggestions, is_authenticated, lambda: tokens.get("access_token")),
+    "github-suggestions": (run_github_suggestions, is_github_authenticated, lambda: github_tokens.get("github_access_token")),
+    "teams-suggestions": (run_teams_suggestions, is_teams_authenticated, lambda: teams_tokens.get("teams_access_token"))
+}
+
+for kind, (handler, _, _) in JOB_KINDS.items():
+    job_queue.register(kind, handler)
+
+def submit_job(kind: str, refresh: bool = False, **params) -> Job:
+    """Queue a job of the given kind with the caller's current token and any extra params"""
+    _, is_connected, get_token = JOB_KINDS[kind]
+    if not is_connected():
+        raise HTTPException(status_code=401, detail=f"Not authenticated for {kind}")
+    return job_queue.submit(kind, {"access_token": get_token(), **params}, refresh=refresh)
+
+def _get_job_or_404(queue: JobService, job_id: str) -> Job:
+    job = queue.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.post("/{kind}", status_code=202)
+def start_job(kind: str, refresh: bool = False) -> Dict:
+    """Start a crawl or summary job and return its id"""
+    if kind not in JOB_KINDS:
+        raise HTTPException(status_code=404, detail=f"Unknown job kind: {kind}. Available: {', '.join(JOB_KINDS)}")
+    
+    job = submit_job(kind, refresh=refresh)
+    return {
+        "job_id": job.job_id,
+        "kind": job.kind,
+        "status": job.status,
+        "status_url": f"/jobs/{job.job_id}",
+        "events_url": f"/jobs/{job.job_id}/events"
+    }
+
+@router.get("/{job_id}")
+def get_job_status(job_id: str, queue: JobService = Depends(get_job_queue)) -> Dict:
+    """Get a job's status, progress and (once finished) result"""
+    return _get_job_or_404(queue, job_id).to_dict()
+
+@router.get("/{job_id}/events")
+def stream_job_events(job_id: str, queue: JobService = Depends(get_job_queue)):
+    """Stream a job's progress as server-sent events until it finishes"""
+    job = _get_job_or_404(queue, job_id)
+    
+    # Polled from the event loop, so a watching tab does not hold a worker thread
+    async def events():
+        version = -1
+        idle = 0.0
+        while True:
+            if job.version != version:
+                version = job.version
+                idle = 0.0
+                snapshot = job.to_dict()
+                finished = snapshot["status"] in TERMINAL_STATES
+                event = snapshot["status"] if finished else "progress"
+                yield f"event: {event}\ndata: {json.dumps(snapshot, default=record_json)}\n\n"
+                if finished:
+                    return
+            elif idle >= KEEPALIVE_SECONDS:
+                idle = 0.0
+                # Comment line keeps proxies from closing an idle stream
+                yield ": keepalive\n\n"
+            else:
+                await asyncio.sleep(JOB_POLL_SECONDS)
+                idle += JOB_POLL_SECONDS
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,87 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Dict, List, Optional
+import time
+from ..services.store_service import LocalStore, local_store, DEFAULT_SEARCH_LIMIT
+from .auth import is_authenticated
+from .teams import is_teams_authenticated
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+# Constants
+MAX_SEARCH_LIMIT = 200
+
+def get_local_store() -> LocalStore:
+    """Dependency to get the shared local store"""
+    return local_store
+
+def connected_kinds() -> List[str]:
+    """Searchable kinds whose provider is signed in"""
+    kinds = []
+    if is_authenticated():
+        kinds.append("email")
+    if is_teams_authenticated():
+        kinds.append("message")
+    return kinds
+
+def run_search(store: LocalStore, kinds: List[str], **filters) -> Dict:
+    start = time.perf_counter()
+    results = store.search(kinds=kinds, **filters)
+    return {
+        "results": results,
+        "count": len(results),
+        "took_ms": round((time.perf_counter() - start) * 1000, 2)
+    }
+
+@router.get("")
+def search_all(
+    q: Optional[str] = None,
+    sender: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    team: Optional[str] = None,
+    channel: Optional[str] = None,
+    unread: Optional[bool] = None,
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    store: LocalStore = Depends(get_local_store)
+) -> Dict:
+    """Search mirrored emails and Teams messages without calling Graph"""
+    if not is_authenticated():
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    return run_search(
+        store, connected_kinds(),
+        query=q, sender=sender, since=since, until=until, team=team, channel=channel, unread=unread, limit=limit
+    )
+
+@router.get("/emails")
+def search_emails(
+    q: Optional[str] = None,
+    sender: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    unread: Optional[bool] = None,
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    store: LocalStore = Depends(get_local_store)
+) -> Dict:
+    """Search mirrored emails by text, sender, date range and read state"""
+    if not is_authenticated():
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    return run_search(store, ["email"], query=q, sender=sender, since=since, until=until, unread=unread, limit=limit)
+
+@router.get("/messages")
+def search_messages(
+    q: Optional[str] = None,
+    sender: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    team: Optional[str] = None,
+    channel: Optional[str] = None,
+    limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    store: LocalStore = Depends(get_local_store)
+) -> Dict:
+    """Search mirrored Teams channel and chat messages by text, sender, date range, team and channel"""
+    if not is_teams_authenticated():
+        raise HTTPException(status_code=401, detail="Not authenticated with Teams")
+    
+    return run_search(store, ["message"], query=q, sender=sender, since=since, until=until, team=team, channel=channel, limit=limit)
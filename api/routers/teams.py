@@ -1,8 +1,15 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List, Dict
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Response
+from typing import List, Dict, Optional
 from ..services.teams_service import TeamsService
 from ..services.teams_auth_service import TeamsAuthService
 from ..services.ai_service import AIService
+from ..services.suggestion_cache_service import suggestion_cache
+from ..services.service_container import container
+from ..services.deadline_service import partial_info
+from ..services.swr_cache_service import swr_cache, swr_key
+from ..services.briefing_service import summarize_cached
+from ..services.store_service import local_store
+from ..services.rollup_service import activity_rollups
 from ..models.teams import TeamsSummary
 from .auth import is_authenticated
 
@@ -13,15 +20,15 @@ teams_tokens = {}
 
 def get_teams_service() -> TeamsService:
     """Dependency to get Teams service"""
-    return TeamsService()
+    return container.teams_service
 
 def get_teams_auth_service() -> TeamsAuthService:
     """Dependency to get Teams auth service"""
-    return TeamsAuthService()
+    return container.teams_auth_service
 
 def get_ai_service() -> AIService:
     """Dependency to get AI service"""
-    return AIService()
+    return container.ai_service
 
 def is_teams_authenticated() -> bool:
     """Check if user is authenticated with Teams"""
@@ -61,6 +68,14 @@ def teams_callback(
         if "refresh_token" in token_response:
             teams_tokens["teams_refresh_token"] = token_response["refresh_token"]
         
+        # Teams data mirrored on disk for a different account must never be served to this one
+        access_token = teams_tokens["teams_access_token"]
+        swr_cache.claim_account("teams", access_token, lambda: auth_service.get_user_info(access_token)["id"])
+        
+        # Warm the Teams data, summary and suggestion answers before the dashboard asks for them
+        from .jobs import submit_job
+        submit_job("teams-summary")
+        
         return {"message": "Teams authentication successful"}
         
     except HTTPException:
@@ -90,6 +105,9 @@ def teams_logout():
     if "teams_refresh_token" in teams_tokens:
         del teams_tokens["teams_refresh_token"]
     
+    local_store.clear("teams")
+    activity_rollups.clear("teams")
+    
     return {"message": "Teams logout successful"}
 
 @router.get("/summary")
@@ -107,6 +125,7 @@ def get_teams_summary(
 
 @router.get("/teams")
 def get_teams(
+    response: Response,
     teams_service: TeamsService = Depends(get_teams_service)
 ) -> List[Dict]:
     """Get user's teams"""
@@ -114,12 +133,19 @@ def get_teams(
         raise HTTPException(status_code=401, detail="Not authenticated with Teams")
     
     try:
-        return teams_service.get_user_teams(teams_tokens["teams_access_token"])
+        access_token = teams_tokens["teams_access_token"]
+        data, age = swr_cache.get(
+            swr_key("teams/teams", access_token),
+            lambda: teams_service.get_user_teams(access_token)
+        )
+        response.headers["Age"] = str(age)
+        return data
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get teams: {str(e)}")
 
 @router.get("/channels")
 def get_teams_channels(
+    response: Response,
     teams_service: TeamsService = Depends(get_teams_service)
 ) -> List[Dict]:
     """Get all channels from all teams"""
@@ -127,28 +153,34 @@ def get_teams_channels(
         raise HTTPException(status_code=401, detail="Not authenticated with Teams")
     
     try:
-        teams = teams_service.get_user_teams(teams_tokens["teams_access_token"])
-        all_channels = []
+        access_token = teams_tokens["teams_access_token"]
         
-        for team in teams:
-            try:
-                channels = teams_service.get_team_channels(
-                    teams_tokens["teams_access_token"], 
-                    team["id"]
-                )
-                for channel in channels:
-                    channel["team_name"] = team["displayName"]
-                    channel["team_id"] = team["id"]
-                all_channels.extend(channels)
-            except Exception as e:
-                print(f"Warning: Could not get channels for team {team['displayName']}: {e}")
+        def load() -> List[Dict]:
+            teams = teams_service.get_user_teams(access_token)
+            all_channels = []
+            
+            for team in teams:
+                try:
+                    channels = teams_service.get_team_channels(
+                        access_token, 
+                        team["id"],
+                        team
+                    )
+                    all_channels.extend(channels)
+                except Exception as e:
+                    print(f"Warning: Could not get channels for team {team['displayName']}: {e}")
+            
+            return all_channels
         
-        return all_channels
+        data, age = swr_cache.get(swr_key("teams/channels", access_token), load)
+        response.headers["Age"] = str(age)
+        return data
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get channels: {str(e)}")
 
 @router.get("/messages")
 def get_teams_messages(
+    response: Response,
     teams_service: TeamsService = Depends(get_teams_service)
 ) -> List[Dict]:
     """Get recent messages from all teams and chats"""
@@ -156,56 +188,81 @@ def get_teams_messages(
         raise HTTPException(status_code=401, detail="Not authenticated with Teams")
     
     try:
-        # Get all teams and their messages
-        teams = teams_service.get_user_teams(teams_tokens["teams_access_token"])
-        all_messages = []
+        access_token = teams_tokens["teams_access_token"]
         
-        for team in teams:
+        def load() -> List[Dict]:
+            # Get all teams and their messages
+            teams = teams_service.get_user_teams(access_token)
+            all_messages = []
+            
+            for team in teams:
+                try:
+                    channels = teams_service.get_team_channels(
+                        access_token, 
+                        team["id"],
+                        team
+                    )
+                    for channel in channels:
+                        try:
+                            messages = teams_service.get_channel_messages(
+                                access_token, 
+                                team["id"], 
+                                channel["id"],
+                                team=team,
+                                channel=channel
+                            )
+                            all_messages.extend(messages)
+                        except Exception as e:
+                            print(f"Warning: Could not get messages for channel {channel['displayName']}: {e}")
+                except Exception as e:
+                    print(f"Warning: Could not get channels for team {team['displayName']}: {e}")
+            
+            # Get personal chats
             try:
-                channels = teams_service.get_team_channels(
-                    teams_tokens["teams_access_token"], 
-                    team["id"]
-                )
-                for channel in channels:
+                chats = teams_service.get_chats(access_token)
+                for chat in chats:
                     try:
-                        messages = teams_service.get_channel_messages(
-                            teams_tokens["teams_access_token"], 
-                            team["id"], 
-                            channel["id"]
+                        chat_messages = teams_service.get_chat_messages(
+                            access_token, 
+                            chat["id"],
+                            chat=chat
                         )
-                        for message in messages:
-                            message["channel_name"] = channel["displayName"]
-                            message["team_name"] = team["displayName"]
-                        all_messages.extend(messages)
+                        all_messages.extend(chat_messages)
                     except Exception as e:
-                        print(f"Warning: Could not get messages for channel {channel['displayName']}: {e}")
+                        print(f"Warning: Could not get messages for chat {chat.get('topic', 'Unknown')}: {e}")
             except Exception as e:
-                print(f"Warning: Could not get channels for team {team['displayName']}: {e}")
+                print(f"Warning: Could not get personal chats: {e}")
+            
+            return all_messages
         
-        # Get personal chats
-        try:
-            chats = teams_service.get_chats(teams_tokens["teams_access_token"])
-            for chat in chats:
-                try:
-                    chat_messages = teams_service.get_chat_messages(
-                        teams_tokens["teams_access_token"], 
-                        chat["id"]
-                    )
-                    for message in chat_messages:
-                        message["chat_name"] = chat.get("topic", "Personal Chat")
-                        message["is_personal_chat"] = True
-                    all_messages.extend(chat_messages)
-                except Exception as e:
-                    print(f"Warning: Could not get messages for chat {chat.get('topic', 'Unknown')}: {e}")
-        except Exception as e:
-            print(f"Warning: Could not get personal chats: {e}")
-        
-        return all_messages
+        data, age = swr_cache.get(swr_key("teams/messages", access_token), load)
+        response.headers["Age"] = str(age)
+        return data
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get messages: {str(e)}")
 
+@router.get("/messages/{message_id}/body")
+def get_message_body(
+    message_id: str,
+    chat_id: Optional[str] = None,
+    team_id: Optional[str] = None,
+    channel_id: Optional[str] = None,
+    teams_service: TeamsService = Depends(get_teams_service)
+) -> Dict:
+    """Get the full plain-text body of a chat message (chat_id) or channel message (team_id and channel_id)"""
+    if not is_teams_authenticated():
+        raise HTTPException(status_code=401, detail="Not authenticated with Teams")
+    if not chat_id and not (team_id and channel_id):
+        raise HTTPException(status_code=400, detail="Pass chat_id, or team_id and channel_id")
+    
+    content = teams_service.get_message_body(teams_tokens["teams_access_token"], message_id, chat_id, team_id, channel_id)
+    if content is None:
+        raise HTTPException(status_code=404, detail="Message not found")
+    return {"id": message_id, "contentType": "text", "content": content}
+
 @router.get("/meetings")
 def get_teams_meetings(
+    response: Response,
     teams_service: TeamsService = Depends(get_teams_service)
 ) -> List[Dict]:
     """Get user's meetings"""
@@ -213,7 +270,13 @@ def get_teams_meetings(
         raise HTTPException(status_code=401, detail="Not authenticated with Teams")
     
     try:
-        return teams_service.get_user_meetings(teams_tokens["teams_access_token"])
+        access_token = teams_tokens["teams_access_token"]
+        data, age = swr_cache.get(
+            swr_key("teams/meetings", access_token),
+            lambda: teams_service.get_user_meetings(access_token)
+        )
+        response.headers["Age"] = str(age)
+        return data
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get meetings: {str(e)}")
 
@@ -234,6 +297,7 @@ def get_meeting_details(
 @router.get("/meetings/{meeting_id}/attendance")
 def get_meeting_attendance(
     meeting_id: str,
+    response: Response,
     teams_service: TeamsService = Depends(get_teams_service)
 ) -> List[Dict]:
     """Get attendance report for a meeting"""
@@ -241,12 +305,19 @@ def get_meeting_attendance(
         raise HTTPException(status_code=401, detail="Not authenticated with Teams")
     
     try:
-        return teams_service.get_meeting_attendance(teams_tokens["teams_access_token"], meeting_id)
+        access_token = teams_tokens["teams_access_token"]
+        data, age = swr_cache.get(
+            swr_key("teams/meetings/attendance", access_token, meeting_id),
+            lambda: teams_service.get_meeting_attendance(access_token, meeting_id)
+        )
+        response.headers["Age"] = str(age)
+        return data
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get meeting attendance: {str(e)}")
 
 @router.get("/ai-summary")
 def get_ai_teams_summary(
+    background_tasks: BackgroundTasks,
     teams_service: TeamsService = Depends(get_teams_service),
     ai_service: AIService = Depends(get_ai_service)
 ) -> Dict:
@@ -255,12 +326,14 @@ def get_ai_teams_summary(
         raise HTTPException(status_code=401, detail="Not authenticated with Teams")
     
     try:
-        teams_data = teams_service.get_all_teams_data(teams_tokens["teams_access_token"])
-        meetings = teams_service.get_user_meetings(teams_tokens["teams_access_token"])
-        teams_data["meetings"] = meetings
-        teams_data["total_meetings"] = len(meetings)
+        access_token = teams_tokens["teams_access_token"]
+        teams_data, _ = swr_cache.get(swr_key("teams/all", access_token), lambda: teams_service.get_teams_data_with_meetings(access_token))
+        ai_summary = summarize_cached("teams", teams_data, ai_service.summarize_teams_data)
         
-        ai_summary = ai_service.summarize_teams_data(teams_data)
+        # Refresh the precomputed suggestion answers if the data changed
+        if suggestion_cache.observe("teams", teams_data):
+            from .teams_chatbot import precompute_suggestion_answers
+            background_tasks.add_task(precompute_suggestion_answers, teams_tokens["teams_access_token"], teams_data)
         
         return {
             "summary": ai_summary,
@@ -269,6 +342,7 @@ def get_ai_teams_summary(
             "total_messages": teams_data["total_messages"],
             "total_chats": teams_data["total_chats"],
             "total_meetings": teams_data["total_meetings"],
+            **partial_info(),
             "status": "success"
         }
     except Exception as e:
@@ -1,7 +1,11 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict
-from ..services.teams_chatbot_service import TeamsChatbotService
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from typing import Dict, Optional
+from ..services.teams_chatbot_service import TeamsChatbotService, TEAMS_SUGGESTIONS
 from ..services.teams_service import TeamsService
+from ..services.chat_session_service import ChatSessionService, chat_sessions
+from ..services.suggestion_cache_service import SuggestionCacheService, suggestion_cache
+from ..services.service_container import container
+from ..services.deadline_service import no_deadline
 from ..models.chatbot import ChatMessage, ChatResponse
 from .teams import is_teams_authenticated, teams_tokens
 
@@ -9,57 +13,96 @@ router = APIRouter(prefix="/teams-chatbot", tags=["teams-chatbot"])
 
 def get_teams_chatbot_service() -> TeamsChatbotService:
     """Dependency to get Teams chatbot service"""
-    return TeamsChatbotService()
+    return container.teams_chatbot_service
 
 def get_teams_service() -> TeamsService:
     """Dependency to get Teams service"""
-    return TeamsService()
+    return container.teams_service
+
+def get_chat_session_service() -> ChatSessionService:
+    """Dependency to get the shared chat session store"""
+    return chat_sessions
+
+def get_suggestion_cache() -> SuggestionCacheService:
+    """Dependency to get the shared suggestion answer cache"""
+    return suggestion_cache
+
+def precompute_suggestion_answers(access_token: str, teams_data: Optional[Dict] = None):
+    """Pre-generate answers to the suggested questions against the current Teams snapshot"""
+    # Runs after the response, so it must not inherit the request deadline
+    with no_deadline():
+        try:
+            if teams_data is None:
+                teams_data = container.teams_service.get_teams_data_with_meetings(access_token)
+            
+            chatbot_service = container.teams_chatbot_service
+            generated = suggestion_cache.precompute(
+                "teams",
+                teams_data,
+                TEAMS_SUGGESTIONS,
+                lambda question, data: chatbot_service.chat_about_teams(question, data, raise_on_error=True)
+            )
+            print(f"Precomputed {generated} Teams suggestion answers")
+        except Exception as e:
+            print(f"Warning: Could not precompute Teams suggestion answers: {e}")
 
 @router.post("/chat")
 def chat_with_teams_assistant(
     message: ChatMessage,
+    background_tasks: BackgroundTasks,
     chatbot_service: TeamsChatbotService = Depends(get_teams_chatbot_service),
-    teams_service: TeamsService = Depends(get_teams_service)
+    teams_service: TeamsService = Depends(get_teams_service),
+    session_service: ChatSessionService = Depends(get_chat_session_service),
+    answer_cache: SuggestionCacheService = Depends(get_suggestion_cache)
 ) -> ChatResponse:
     """Chat with Teams assistant"""
     if not is_teams_authenticated():
         raise HTTPException(status_code=401, detail="Not authenticated with Teams")
     
     try:
-        # Get Teams data for context
-        teams_data = teams_service.get_all_teams_data(teams_tokens["teams_access_token"])
+        session = session_service.get_session(message.conversation_id, "teams")
+        
+        # Suggestion chips are answered from the precomputed cache when available
+        cached = answer_cache.get_answer("teams", message.message)
+        if cached is not None:
+            response, teams_data = cached
+            if session is None:
+                session = session_service.create_session("teams", teams_data)
+            session.add_turn(message.message, response)
+            
+            return ChatResponse(
+                response=response,
+                status="success",
+                message_count=len(session.data.get("teams", [])),
+                conversation_id=session.session_id
+            )
+        
+        # Follow-ups reuse the session's Teams snapshot instead of re-crawling
+        if session is None or session.is_snapshot_stale():
+            teams_data = teams_service.get_teams_data_with_meetings(teams_tokens["teams_access_token"])
+            if session is None:
+                session = session_service.create_session("teams", teams_data)
+            else:
+                session.update_snapshot(teams_data)
+            
+            if answer_cache.observe("teams", teams_data):
+                background_tasks.add_task(precompute_suggestion_answers, teams_tokens["teams_access_token"], teams_data)
         
         # Generate chatbot response
-        response = chatbot_service.chat_about_teams(message.message, teams_data)
+        response = chatbot_service.chat_about_teams(message.message, session.data, session)
+        session.add_turn(message.message, response)
         
         return ChatResponse(
             response=response,
             status="success",
-            message_count=len(teams_data.get("teams", []))
+            message_count=len(session.data.get("teams", [])),
+            conversation_id=session.session_id
         )
-        
+    
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate response: {str(e)}")
 
 @router.get("/suggestions")
 def get_teams_chat_suggestions() -> Dict:
     """Get suggested questions for the Teams chatbot"""
-    suggestions = [
-        "How many teams do I have?",
-        "What are my most active channels?",
-        "Show me recent messages from my teams",
-        "Which teams have the most activity?",
-        "What are my personal chat conversations?",
-        "How many channels do I have access to?",
-        "What's my Teams activity pattern?",
-        "Which channels are most active?",
-        "Show me messages from a specific team",
-        "What are my recent conversations?",
-        "What meetings do I have coming up?",
-        "Show me my recent meetings",
-        "How many online meetings do I have?",
-        "Who are the organizers of my meetings?",
-        "What's my meeting schedule like?"
-    ]
-    
-    return {"suggestions": suggestions} 
\ No newline at end of file
+    return {"suggestions": TEAMS_SUGGESTIONS}
@@ -0,0 +1,88 @@
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
+from typing import Optional
+import json
+import threading
+import time
+from ..services.update_service import UpdateBroker, update_broker
+from ..services.record_service import record_json
+from ..services.service_container import container
+from .auth import is_authenticated
+from .jobs import JOB_KINDS, submit_job
+
+router = APIRouter(prefix="/updates", tags=["updates"])
+
+# Constants
+KEEPALIVE_SECONDS = 15
+REFRESH_SECONDS = 300
+# Snapshot jobs and the Graph subscription source that makes polling them unnecessary
+SNAPSHOT_JOBS = {"email-summary": "email", "github-summary": None, "teams-summary": "teams"}
+
+_watcher_lock = threading.Lock()
+_watcher: Optional[threading.Thread] = None
+
+def get_update_broker() -> UpdateBroker:
+    """Dependency to get the shared update broker"""
+    return update_broker
+
+def watch_snapshots():
+    """Refresh the snapshots behind open dashboards, once per server rather than once per tab"""
+    while True:
+        # Idle while no dashboard is connected
+        update_broker.wait_for_subscribers()
+        time.sleep(REFRESH_SECONDS)
+        if not update_broker.subscribers:
+            continue
+        
+        for kind, push_source in SNAPSHOT_JOBS.items():
+            # One failing source must not stop the refreshes of the others, or end the watcher
+            try:
+                _, is_connected, _ = JOB_KINDS[kind]
+                # Sources with live change-notification subscriptions are kept fresh by their webhooks
+                if is_connected() and not container.graph_subscriptions.is_active(push_source):
+                    # Unchanged data reuses the cached summary, and unchanged results publish nothing
+                    submit_job(kind, refresh=True)
+            except Exception as e:
+                print(f"Warning: Could not refresh {kind} for open dashboards: {e}")
+
+def ensure_watcher():
+    """Start the snapshot watcher on first use"""
+    global _watcher
+    with _watcher_lock:
+        if _watcher is None:
+            _watcher = threading.Thread(target=watch_snapshots, name="snapshot-watcher", daemon=True)
+            _watcher.start()
+
+@router.get("/stream")
+def stream_updates(request: Request, since: Optional[int] = None, broker: UpdateBroker = Depends(get_update_broker)):
+    """Stream summary and count changes to the dashboard as server-sent events"""
+    if not is_authenticated():
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    # Resume after the last update the page has, whether rendered into it or seen before a reconnect
+    last_event_id = request.headers.get("last-event-id", "")
+    seq = int(last_event_id) if last_event_id.isdigit() else (since if since is not None else broker.seq)
+    ensure_watcher()
+    
+    # An async generator waits on the event loop, so an idle tab does not hold a worker thread
+    async def events():
+        nonlocal seq
+        broker.subscribe()
+        try:
+            while True:
+                updates = await broker.wait_for_updates(seq, KEEPALIVE_SECONDS)
+                if not updates:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+                    continue
+                for update in updates:
+                    seq = update["seq"]
+                    yield f"id: {seq}\nevent: update\ndata: {json.dumps(update, default=record_json)}\n\n"
+        finally:
+            broker.unsubscribe()
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,203 @@
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Request
+from fastapi.responses import PlainTextResponse, Response
+from typing import Dict, List, Optional
+import json
+import os
+from ..services.webhook_service import (
+    GraphSubscriptionManager,
+    graph_notification_source,
+    graph_resource_id,
+    graph_chat_id,
+    verify_github_signature,
+    upsert_by,
+    upsert_all,
+    remove_by,
+    github_issue_record,
+    github_commit_records,
+    is_default_branch_push
+)
+from ..services.swr_cache_service import swr_cache, swr_key
+from ..services.store_service import local_store
+from ..services.email_body_service import email_body_cache
+from ..services.rollup_service import activity_rollups
+from ..services.service_container import container
+from ..services.deadline_service import no_deadline
+from .auth import tokens, is_authenticated
+from .github import is_github_authenticated
+from .teams import is_teams_authenticated, teams_tokens
+from .jobs import submit_job
+
+router = APIRouter(prefix="/webhooks", tags=["webhooks"])
+
+# Constants
+GITHUB_EVENTS = ("push", "issues", "pull_request")
+
+def get_graph_subscriptions() -> GraphSubscriptionManager:
+    """Dependency to get the Graph subscription manager"""
+    return container.graph_subscriptions
+
+def apply_graph_notifications(notifications: List[Dict]):
+    """Patch or invalidate the cached snapshots a batch of Graph notifications touches"""
+    # Runs after the 202 is sent, so it must not inherit the request deadline
+    with no_deadline():
+        sources = set()
+        recrawl_teams = False
+        for notification in notifications:
+            source = graph_notification_source(notification.get("resource", ""))
+            if source == "email" and is_authenticated():
+                _patch_email(notification)
+            elif source == "teams" and is_teams_authenticated():
+                recrawl_teams = not _patch_chat_message(notification) or recrawl_teams
+            sources.add(source)
+        
+        if "email" in sources and is_authenticated():
+            submit_job("email-summary", refresh=True, from_cache=True)
+        if "teams" in sources and is_teams_authenticated():
+            # Meeting changes are spread across the crawl, so only they rebuild the snapshot; the
+            # stale copy keeps being served meanwhile, and a burst of them joins the one queued job
+            submit_job("teams-summary", refresh=True, from_cache=not recrawl_teams)
+
+def _patch_email(notification: Dict):
+    """Apply one mail notification to the cached email lists in place"""
+    email_id = graph_resource_id(notification)
+    if not email_id:
+        return
+    
+    if notification.get("changeType") == "deleted":
+        swr_cache.patch("emails/all", lambda emails: remove_by(emails, email_id))
+        swr_cache.patch("emails/unread", lambda emails: remove_by(emails, email_id))
+        local_store.delete_record("email", email_id)
+        email_body_cache.invalidate(email_id)
+        activity_rollups.remove("email", "email", email_id)
+        return
+    
+    email = container.email_service.get_email(tokens["access_token"], email_id)
+    if email is None:
+        return
+    swr_cache.patch("emails/all", lambda emails: upsert_by(emails, email))
+    if email.get("isRead", True):
+        swr_cache.patch("emails/unread", lambda emails: remove_by(emails, email_id))
+    else:
+        swr_cache.patch("emails/unread", lambda emails: upsert_by(emails, email))
+
+def _patch_chat_message(notification: Dict) -> bool:
+    """Apply one chat message notification to the cached Teams snapshot in place; False if it is not a chat message"""
+    chat_id = graph_chat_id(notification.get("resource", ""))
+    message_id = graph_resource_id(notification)
+    if not chat_id or not message_id:
+        return False
+    
+    if notification.get("changeType") == "deleted":
+        swr_cache.patch("teams/all", lambda data: _with_list(data, "messages", "total_messages", remove_by(data["messages"], message_id)))
+        # Stored message ids are only unique within their chat
+        local_store.delete_record("message", f"{chat_id}/{message_id}")
+        activity_rollups.remove("teams", "message", f"{chat_id}/{message_id}")
+        return True
+    
+    # Label the message like the crawl does, with the chat's name taken from its cached messages
+    chat = {"id": chat_id}
+    cached = swr_cache.peek(swr_key("teams/all", teams_tokens["teams_access_token"]))
+    if cached:
+        chat["topic"] = next((m.get("chat_name") for m in cached[0]["messages"] if m.get("chatId") == chat_id), None)
+    
+    message = container.teams_service.get_chat_message(teams_tokens["teams_access_token"], chat_id, message_id, chat)
+    if message is not None:
+        swr_cache.patch("teams/all", lambda data: _with_list(data, "messages", "total_messages", upsert_by(data["messages"], message)))
+    return True
+
+def apply_github_event(event: str, payload: Dict):
+    """Patch the cached GitHub snapshot for one webhook delivery"""
+    with no_deadline():
+        if event == "issues":
+            issue = github_issue_record(payload)
+            swr_cache.patch("github/issues", lambda issues: upsert_by(issues, issue))
+            swr_cache.patch("github/all", lambda data: _with_list(data, "issues", "total_issues", upsert_by(data["issues"], issue)))
+        elif event == "push":
+            if not is_default_branch_push(payload):
+                return
+            commits = github_commit_records(payload)
+            swr_cache.patch("github/commits", lambda cached: upsert_all(cached, commits, "sha"))
+            swr_cache.patch("github/all", lambda data: _with_list(data, "commits", "total_commits", upsert_all(data["commits"], commits, "sha")))
+        elif event == "pull_request":
+            # Search results and webhook payloads shape pull requests differently, so drop and reload them
+            swr_cache.invalidate("github/pull-requests")
+            swr_cache.invalidate("github/all")
+        
+        if is_github_authenticated():
+            submit_job("github-summary", refresh=True, from_cache=True)
+
+def _with_list(data: Dict, field: str, total_field: str, items: List[Dict]) -> Dict:
+    return {**data, field: items, total_field: len(items)}
+
+@router.post("/graph")
+async def receive_graph_notifications(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    validationToken: Optional[str] = None,
+    subscriptions: GraphSubscriptionManager = Depends(get_graph_subscriptions)
+):
+    """Receive Microsoft Graph change notifications (mail, chat messages, events)"""
+    # Subscription validation handshake: echo the token as plain text
+    if validationToken is not None:
+        return PlainTextResponse(validationToken)
+    
+    notifications = (await request.json()).get("value", [])
+    verified = [notification for notification in notifications if subscriptions.verify(notification)]
+    if len(verified) < len(notifications):
+        print(f"Warning: Dropped {len(notifications) - len(verified)} Graph notifications with a bad clientState")
+    
+    # Graph expects a quick 202; the cache work happens after the response
+    if verified:
+        background_tasks.add_task(apply_graph_notifications, verified)
+    return Response(status_code=202)
+
+@router.post("/graph/lifecycle")
+async def receive_graph_lifecycle_notifications(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    validationToken: Optional[str] = None,
+    subscriptions: GraphSubscriptionManager = Depends(get_graph_subscriptions)
+):
+    """Receive Graph lifecycle notifications: reauthorize, recreate removed subscriptions, resync after missed ones"""
+    if validationToken is not None:
+        return PlainTextResponse(validationToken)
+    
+    for notification in (await request.json()).get("value", []):
+        if not subscriptions.verify(notification):
+            continue
+        
+        event = notification.get("lifecycleEvent")
+        subscription_id = notification.get("subscriptionId")
+        if event == "reauthorizationRequired":
+            background_tasks.add_task(subscriptions.renew, subscription_id)
+        elif event == "subscriptionRemoved":
+            background_tasks.add_task(subscriptions.recreate, subscription_id)
+        elif event == "missed":
+            # Some notifications were dropped: rebuild the whole snapshot instead of patching it
+            background_tasks.add_task(_resync, graph_notification_source(notification.get("resource", "")))
+    return Response(status_code=202)
+
+def _resync(source: Optional[str]):
+    with no_deadline():
+        if source == "email" and is_authenticated():
+            swr_cache.invalidate("emails/")
+            submit_job("email-summary", refresh=True)
+        elif source == "teams" and is_teams_authenticated():
+            swr_cache.invalidate("teams/")
+            submit_job("teams-summary", refresh=True)
+
+@router.post("/github")
+async def receive_github_webhook(request: Request, background_tasks: BackgroundTasks) -> Dict:
+    """Receive GitHub webhooks (push, issues, pull_request)"""
+    body = await request.body()
+    if not verify_github_signature(os.getenv("GITHUB_WEBHOOK_SECRET"), body, request.headers.get("X-Hub-Signature-256")):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+    
+    event = request.headers.get("X-GitHub-Event", "")
+    if event == "ping":
+        return {"message": "pong"}
+    if event not in GITHUB_EVENTS:
+        return {"message": f"Ignored {event} event"}
+    
+    background_tasks.add_task(apply_github_event, event, json.loads(body))
+    return {"message": f"Accepted {event} event"}
@@ -8,4 +8,22 @@ from .github_service import GitHubService
 from .github_chatbot_service import GitHubChatbotService
 from .teams_auth_service import TeamsAuthService
 from .teams_service import TeamsService
-from .teams_chatbot_service import TeamsChatbotService 
\ No newline at end of file
+from .teams_chatbot_service import TeamsChatbotService
+from .chat_session_service import ChatSessionService
+from .suggestion_cache_service import SuggestionCacheService
+from .map_reduce_service import MapReduceSummarizer
+from .briefing_service import BriefingCache
+from .render_service import RenderService
+from .service_container import ServiceContainer
+from .circuit_breaker_service import CircuitBreaker
+from .single_flight_service import SingleFlight
+from .graph_client_service import GraphClient
+from .deadline_service import Deadline
+from .swr_cache_service import SWRCache
+from .job_service import JobService
+from .update_service import UpdateBroker
+from .webhook_service import GraphSubscriptionManager
+from .store_service import LocalStore 
+from .record_service import Record 
+from .email_body_service import EmailBodyCache 
+from .rollup_service import ActivityRollups 
\ No newline at end of file
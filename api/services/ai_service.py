@@ -1,7 +1,13 @@
 import google.generativeai as genai
 import os
-from typing import List, Dict
+import re
+from typing import List, Dict, Tuple, Optional
 from dotenv import load_dotenv
+from .map_reduce_service import MapReduceSummarizer
+from .circuit_breaker_service import GuardedModel, gemini_breaker
+from .render_service import SUMMARY_SCHEMA, briefing_schema, json_generation_config, parse_structured_response, renderer
+from .single_flight_service import coalesce
+from .record_service import ThreadRecord, email_conversations
 
 load_dotenv()
 
@@ -11,18 +17,40 @@ MAX_EMAILS_FOR_AI_PROCESSING = 30
 MAX_EMAILS_FOR_FALLBACK = 15
 MAX_REPOS_FOR_AI = 10
 MAX_ITEMS_FOR_AI = 10
+MAX_MESSAGE_PREVIEW_CHARS = 200
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+SUMMARY_TITLES = {
+    "email": "📧 Email Summary",
+    "github": "🐙 GitHub Summary",
+    "teams": "💬 Teams Summary"
+}
+
+STRUCTURED_SUMMARY_INSTRUCTIONS = """Respond only with JSON matching the response schema:
+- "overview": one or two sentences
+- "sections": a few sections, each with a short "heading" and concise "bullets"
+- each bullet has "text", an optional bold "label" (a sender, repository, team or channel) and an optional "ref" naming the source item
+- "action_items": follow-ups the user should act on, if any
+Keep every bullet to one short sentence. Do not write HTML or Markdown."""
+
+def create_gemini_model():
+    """Configure the Gemini client and create a model guarded by the shared circuit breaker"""
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        raise ValueError("GEMINI_API_KEY environment variable is required")
+    
+    genai.configure(api_key=api_key)
+    return GuardedModel(genai.GenerativeModel(GEMINI_MODEL_NAME), gemini_breaker)
 
 class AIService:
     """Service for AI-powered email and GitHub summarization"""
     
-    def __init__(self):
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY environment variable is required")
-        
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel(GEMINI_MODEL_NAME)
+    def __init__(self, model=None):
+        self.model = model or create_gemini_model()
+        self.map_reduce = MapReduceSummarizer(self.model)
     
+    @coalesce("ai.summarize_emails")
     def summarize_emails(self, emails: List[Dict]) -> str:
         """Generate AI summary of emails"""
         if not emails:
@@ -32,44 +60,59 @@ class AIService:
         unread_count = sum(1 for email in emails if not email.get("isRead", True))
         total_count = len(emails)
         
-        # Prepare email data for AI
-        email_texts = []
-        for email in emails[:MAX_EMAILS_FOR_AI_PROCESSING]:
-            email_text = self._format_email_for_ai(email)
-            email_texts.append(email_text)
-        
-        # Create prompt for AI
-        prompt = self._create_email_summary_prompt(email_texts, total_count, unread_count)
-        
         try:
-            response = self.model.generate_content(prompt)
-            return response.text
+            email_texts, condensed = self._prepare_email_texts(emails)
+            prompt = self._create_email_summary_prompt(email_texts, total_count, unread_count, condensed)
+            
+            response = self.model.generate_content(prompt, generation_config=json_generation_config(SUMMARY_SCHEMA))
+            return self._render_summary("email", response.text)
         except Exception as e:
             print(f"Error generating AI summary: {str(e)}")
             return self._fallback_summary(emails)
     
-    def _format_email_for_ai(self, email: Dict) -> str:
-        """Format email data for AI processing"""
-        from_info = email.get("from", {}).get("emailAddress", {}).get("name", "Unknown")
-        subject = email.get("subject", "No Subject")
-        body_preview = email.get("bodyPreview", "")
-        received = email.get("receivedDateTime", "Unknown")
-        is_read = email.get("isRead", True)
-        status = "UNREAD" if not is_read else "READ"
+    def _prepare_email_texts(self, emails: List[Dict]) -> Tuple[List[str], bool]:
+        """Format emails for AI processing, one text per conversation; returns the texts and whether they were condensed"""
+        threads = email_conversations(emails)
+        
+        # Small mailboxes go straight into the prompt; larger ones are condensed chunk by chunk
+        if len(threads) <= MAX_EMAILS_FOR_AI_PROCESSING:
+            return [self._format_thread_for_ai(thread) for thread in threads], False
+        
+        email_notes = self.map_reduce.condense(
+            "email conversations",
+            [((thread["latestReceivedDateTime"] or "")[:10], self._format_thread_for_ai(thread)) for thread in threads]
+        )
+        return email_notes, True
+    
+    def _format_thread_for_ai(self, thread: ThreadRecord) -> str:
+        """Format an email conversation for AI processing"""
+        unread = thread["unreadCount"]
+        status = f"{unread} UNREAD" if unread else "READ"
+        participants = ", ".join(thread["participants"])
+        folded = thread.get("foldedConversations")
+        folded_note = f" across {folded} near-identical conversations" if folded else ""
         
         return f"""
 Status: {status}
-From: {from_info}
-Subject: {subject}
-Received: {received}
-Preview: {body_preview}
+Subject: {thread["subject"]}
+Participants: {participants}
+Messages: {thread["messageCount"]}{folded_note}
+Latest: {thread["latestReceivedDateTime"] or "Unknown"} from {thread["latestFrom"]}
+Preview: {thread["preview"]}
 ---
 """
     
-    def _create_email_summary_prompt(self, email_texts: List[str], total_count: int, unread_count: int) -> str:
+    def _create_email_summary_prompt(self, email_texts: List[str], total_count: int, unread_count: int, condensed: bool = False) -> str:
         """Create prompt for email summary"""
+        if condensed:
+            scope = f"notes condensed from all {total_count} emails (with {unread_count} unread)"
+            email_block = "\n".join(email_texts)
+        else:
+            scope = f"{len(email_texts)} email conversations (covering all {total_count} emails, with {unread_count} unread)"
+            email_block = "".join(email_texts)
+        
         return f"""
-You are an AI assistant that summarizes emails. Please provide a comprehensive, well-organized summary of the following {len(email_texts)} emails (out of {total_count} total emails, with {unread_count} unread).
+You are an AI assistant that summarizes emails. Please provide a comprehensive, well-organized summary of the following {scope}.
 
 Focus on:
 1. Key themes and topics across all emails
@@ -81,18 +124,18 @@ Focus on:
 
 Here are the emails:
 
-{''.join(email_texts)}
-
-Please provide a clear, structured summary using HTML formatting. Use:
-- <h2> for main sections
-- <h3> for subsections
-- <strong> for emphasis
-- <ul> and <li> for lists
-- <p> for paragraphs
+{email_block}
 
-Format the response as clean HTML that will display nicely in a web browser.
+{STRUCTURED_SUMMARY_INSTRUCTIONS}
 """
     
+    def _render_summary(self, source: str, response_text: str) -> str:
+        """Render a structured JSON summary from the model as HTML"""
+        summary = parse_structured_response(response_text)
+        if summary is None:
+            raise ValueError("Model response was not valid JSON")
+        return renderer.render_summary(SUMMARY_TITLES[source], summary)
+    
     def _fallback_summary(self, emails: List[Dict]) -> str:
         """Fallback summary when AI fails"""
         unread_count = sum(1 for email in emails if not email.get("isRead", True))
@@ -119,6 +162,7 @@ Format the response as clean HTML that will display nicely in a web browser.
         
         return "".join(html_parts)
     
+    @coalesce("ai.summarize_github_data")
     def summarize_github_data(self, github_data: Dict) -> str:
         """Generate AI summary of GitHub data"""
         if not github_data:
@@ -130,15 +174,15 @@ Format the response as clean HTML that will display nicely in a web browser.
         issues = github_data.get("issues", [])
         pull_requests = github_data.get("pull_requests", [])
         
-        # Create detailed context for AI
-        context_parts = self._create_github_context_for_ai(repos, commits, issues, pull_requests)
-        
-        # Create prompt for AI
-        prompt = self._create_github_summary_prompt(context_parts, repos, commits, issues, pull_requests)
-        
         try:
-            response = self.model.generate_content(prompt)
-            return response.text
+            # Create detailed context for AI
+            context_parts = self._create_github_context_for_ai(repos, commits, issues, pull_requests)
+            
+            # Create prompt for AI
+            prompt = self._create_github_summary_prompt(context_parts, repos, commits, issues, pull_requests)
+            
+            response = self.model.generate_content(prompt, generation_config=json_generation_config(SUMMARY_SCHEMA))
+            return self._render_summary("github", response.text)
         except Exception as e:
             print(f"Error generating GitHub AI summary: {str(e)}")
             return self._fallback_github_summary(github_data)
@@ -150,35 +194,53 @@ Format the response as clean HTML that will display nicely in a web browser.
         # Repository information
         if repos:
             context_parts.append(f"Repositories ({len(repos)} total):")
-            for repo in repos[:MAX_REPOS_FOR_AI]:
-                context_parts.append(f"- {repo['full_name']}: {repo.get('description', 'No description')} ({repo['language'] or 'Unknown'}) - Stars: {repo['stargazers_count']}, Forks: {repo['forks_count']}")
+            repo_lines = [
+                ("", f"- {repo['full_name']}: {repo.get('description', 'No description')} ({repo['language'] or 'Unknown'}) - Stars: {repo['stargazers_count']}, Forks: {repo['forks_count']}")
+                for repo in sorted(repos, key=lambda r: r["full_name"])
+            ]
+            context_parts.extend(self._condense_if_large("repositories", repo_lines, MAX_REPOS_FOR_AI))
         
         # Commit information
         if commits:
             context_parts.append(f"\nRecent Commits ({len(commits)} total):")
-            for commit in commits[:MAX_ITEMS_FOR_AI]:
-                context_parts.append(f"- {commit['repository']}: {commit['commit']['message'][:100]}...")
+            commit_lines = [
+                ((commit["commit"].get("author") or {}).get("date", "")[:10], f"- {commit['repository']}: {commit['commit']['message'][:100]}...")
+                for commit in commits
+            ]
+            context_parts.extend(self._condense_if_large("commits", commit_lines, MAX_ITEMS_FOR_AI))
         
         # Issues information
         if issues:
             context_parts.append(f"\nIssues ({len(issues)} total):")
-            for issue in issues[:MAX_ITEMS_FOR_AI]:
-                context_parts.append(f"- {issue['repository']}: {issue['title']} (State: {issue['state']})")
+            issue_lines = [
+                (issue.get("created_at", "")[:10], f"- {issue['repository']}: {issue['title']} (State: {issue['state']})")
+                for issue in issues
+            ]
+            context_parts.extend(self._condense_if_large("issues", issue_lines, MAX_ITEMS_FOR_AI))
         
         # Pull requests information
         if pull_requests:
             context_parts.append(f"\nPull Requests ({len(pull_requests)} total):")
-            for pr in pull_requests[:MAX_ITEMS_FOR_AI]:
-                context_parts.append(f"- {pr['repository']}: {pr['title']} (State: {pr['state']})")
+            pr_lines = [
+                (pr.get("created_at", "")[:10], f"- {pr['repository']}: {pr['title']} (State: {pr['state']})")
+                for pr in pull_requests
+            ]
+            context_parts.extend(self._condense_if_large("pull requests", pr_lines, MAX_ITEMS_FOR_AI))
         
         return context_parts
     
+    def _condense_if_large(self, label: str, keyed_lines: List[Tuple[str, str]], limit: int) -> List[str]:
+        """Use lines as-is when they fit the limit, otherwise condense them with map-reduce"""
+        if len(keyed_lines) <= limit:
+            return [line for _, line in keyed_lines]
+        return self.map_reduce.condense(label, keyed_lines)
+    
     def _create_github_summary_prompt(self, context_parts: List[str], repos: List[Dict], commits: List[Dict], issues: List[Dict], pull_requests: List[Dict]) -> str:
         """Create prompt for GitHub summary"""
         return f"""
 You are an AI assistant that summarizes GitHub activity. Please provide a comprehensive, well-organized summary of the following GitHub data:
 
-{''.join(context_parts)}
+{chr(10).join(context_parts)}
 
 Summary Statistics:
 - Total Repositories: {len(repos)}
@@ -194,14 +256,7 @@ Focus on:
 5. Repository popularity (stars, forks)
 6. Development trends and insights
 
-Please provide a clear, structured summary using HTML formatting. Use:
-- <h2> for main sections
-- <h3> for subsections
-- <strong> for emphasis
-- <ul> and <li> for lists
-- <p> for paragraphs
-
-Format the response as clean HTML that will display nicely in a web browser.
+{STRUCTURED_SUMMARY_INSTRUCTIONS}
 """
     
     def _fallback_github_summary(self, github_data: Dict) -> str:
@@ -239,6 +294,7 @@ Format the response as clean HTML that will display nicely in a web browser.
         
         return "".join(html_parts)
     
+    @coalesce("ai.summarize_teams_data")
     def summarize_teams_data(self, teams_data: Dict) -> str:
         """Generate AI summary of Teams data"""
         if not teams_data:
@@ -250,15 +306,15 @@ Format the response as clean HTML that will display nicely in a web browser.
         messages = teams_data.get("messages", [])
         meetings = teams_data.get("meetings", [])
         
-        # Create detailed context for AI
-        context_parts = self._create_teams_context_for_ai(teams, channels, messages, meetings)
-        
-        # Create prompt for AI
-        prompt = self._create_teams_summary_prompt(context_parts, teams, channels, messages, meetings)
-        
         try:
-            response = self.model.generate_content(prompt)
-            return response.text
+            # Create detailed context for AI
+            context_parts = self._create_teams_context_for_ai(teams, channels, messages, meetings)
+            
+            # Create prompt for AI
+            prompt = self._create_teams_summary_prompt(context_parts, teams, channels, messages, meetings)
+            
+            response = self.model.generate_content(prompt, generation_config=json_generation_config(SUMMARY_SCHEMA))
+            return self._render_summary("teams", response.text)
         except Exception as e:
             print(f"Error generating Teams AI summary: {str(e)}")
             return self._fallback_teams_summary(teams_data)
@@ -270,7 +326,7 @@ Format the response as clean HTML that will display nicely in a web browser.
         # Teams information
         if teams:
             context_parts.append(f"Teams ({len(teams)} total):")
-            for team in teams[:MAX_ITEMS_FOR_AI]:
+            for team in teams:
                 context_parts.append(f"- {team.get('displayName', 'Unknown Team')} (ID: {team.get('id', 'N/A')})")
         
         # Channels information
@@ -290,7 +346,7 @@ Format the response as clean HTML that will display nicely in a web browser.
         if messages:
             context_parts.append(f"\nRecent Messages ({len(messages)} total):")
             message_summary = {}
-            for message in messages[:MAX_ITEMS_FOR_AI]:
+            for message in messages:
                 source = message.get("team_name", "Personal Chat")
                 if source not in message_summary:
                     message_summary[source] = 0
@@ -298,11 +354,19 @@ Format the response as clean HTML that will display nicely in a web browser.
             
             for source, count in message_summary.items():
                 context_parts.append(f"- {source}: {count} messages")
+            
+            context_parts.append("\nMessage Content:")
+            message_lines = [
+                (message.get("createdDateTime", "")[:10], self._format_teams_message_for_ai(message))
+                for message in messages
+            ]
+            context_parts.extend(self._condense_if_large("Teams messages", message_lines, MAX_ITEMS_FOR_AI))
         
         # Meetings information
         if meetings:
             context_parts.append(f"\nMeetings ({len(meetings)} total):")
-            for meeting in meetings[:MAX_ITEMS_FOR_AI]:
+            meeting_lines = []
+            for meeting in meetings:
                 start_time = meeting.get("start", "Unknown")
                 if start_time and "T" in start_time:
                     # Format the date for better readability
@@ -315,10 +379,22 @@ Format the response as clean HTML that will display nicely in a web browser.
                 else:
                     formatted_time = start_time
                 
-                context_parts.append(f"- {meeting.get('subject', 'No Subject')} (Start: {formatted_time}, Organizer: {meeting.get('organizer', 'Unknown')})")
+                meeting_lines.append((
+                    (start_time or "")[:10],
+                    f"- {meeting.get('subject', 'No Subject')} (Start: {formatted_time}, Organizer: {meeting.get('organizer', 'Unknown')})"
+                ))
+            context_parts.extend(self._condense_if_large("meetings", meeting_lines, MAX_ITEMS_FOR_AI))
         
         return context_parts
     
+    def _format_teams_message_for_ai(self, message: Dict) -> str:
+        """Format a Teams message as a single line for AI processing"""
+        source = message.get("chat_name") if message.get("is_personal_chat") else f"{message.get('team_name', 'Unknown Team')} / {message.get('channel_name', 'Unknown Channel')}"
+        sender = ((message.get("from") or {}).get("user") or {}).get("displayName", "Unknown")
+        # Bodies are plain text already; see record_service
+        text = WHITESPACE_PATTERN.sub(" ", (message.get("body") or {}).get("content", "")).strip()
+        return f"- [{source}] {sender}: {text[:MAX_MESSAGE_PREVIEW_CHARS]}"
+    
     def _create_teams_summary_prompt(self, context_parts: List[str], teams: List[Dict], channels: List[Dict], messages: List[Dict], meetings: List[Dict] = None) -> str:
         """Create prompt for Teams summary"""
         meetings_count = len(meetings) if meetings else 0
@@ -326,7 +402,7 @@ Format the response as clean HTML that will display nicely in a web browser.
         return f"""
 You are an AI assistant that summarizes Microsoft Teams activity. Please provide a comprehensive, well-organized summary of the following Teams data:
 
-{''.join(context_parts)}
+{chr(10).join(context_parts)}
 
 Summary Statistics:
 - Total Teams: {len(teams)}
@@ -344,14 +420,7 @@ Focus on:
 7. Meeting patterns and scheduling
 8. Online meeting participation
 
-Please provide a clear, structured summary using HTML formatting. Use:
-- <h2> for main sections
-- <h3> for subsections
-- <strong> for emphasis
-- <ul> and <li> for lists
-- <p> for paragraphs
-
-Format the response as clean HTML that will display nicely in a web browser.
+{STRUCTURED_SUMMARY_INSTRUCTIONS}
 """
     
     def _fallback_teams_summary(self, teams_data: Dict) -> str:
@@ -418,4 +487,76 @@ Format the response as clean HTML that will display nicely in a web browser.
                 html_parts.append(f'<li><strong>📅 {meeting.get("subject", "No Subject")}</strong> - {formatted_time} (Organizer: {meeting.get("organizer", "Unknown")})</li>')
             html_parts.append('</ul>')
         
-        return "".join(html_parts) 
\ No newline at end of file
+        return "".join(html_parts)
+    
+    @coalesce("ai.summarize_briefing")
+    def summarize_briefing(self, emails: Optional[List[Dict]] = None, github_data: Optional[Dict] = None, teams_data: Optional[Dict] = None) -> Dict[str, str]:
+        """Generate one combined summary for every provided source in a single model call"""
+        context_blocks = {}
+        sections = {}
+        
+        try:
+            if emails is not None:
+                unread_count = sum(1 for email in emails if not email.get("isRead", True))
+                email_texts, condensed = self._prepare_email_texts(emails)
+                joiner = "\n" if condensed else ""
+                context_blocks["email"] = f"=== EMAIL ({len(emails)} total, {unread_count} unread) ===\n{joiner.join(email_texts)}"
+            
+            if github_data is not None:
+                repos = github_data.get("repositories", [])
+                commits = github_data.get("commits", [])
+                issues = github_data.get("issues", [])
+                pull_requests = github_data.get("pull_requests", [])
+                context_parts = self._create_github_context_for_ai(repos, commits, issues, pull_requests)
+                context_blocks["github"] = f"=== GITHUB ({len(repos)} repositories, {len(commits)} commits, {len(issues)} issues, {len(pull_requests)} pull requests) ===\n" + "\n".join(context_parts)
+            
+            if teams_data is not None:
+                teams = teams_data.get("teams", [])
+                channels = teams_data.get("channels", [])
+                messages = teams_data.get("messages", [])
+                meetings = teams_data.get("meetings", [])
+                context_parts = self._create_teams_context_for_ai(teams, channels, messages, meetings)
+                context_blocks["teams"] = f"=== TEAMS ({len(teams)} teams, {len(channels)} channels, {len(messages)} messages, {len(meetings)} meetings) ===\n" + "\n".join(context_parts)
+            
+            if context_blocks:
+                prompt = self._create_briefing_prompt(context_blocks)
+                response = self.model.generate_content(
+                    prompt,
+                    generation_config=json_generation_config(briefing_schema(list(context_blocks.keys())))
+                )
+                briefing = parse_structured_response(response.text) or {}
+                for source, summary in briefing.items():
+                    if source in context_blocks and isinstance(summary, dict):
+                        sections[source] = renderer.render_summary(SUMMARY_TITLES[source], summary)
+        except Exception as e:
+            print(f"Error generating AI briefing: {str(e)}")
+        
+        # Fill in any section the model missed with the local fallback
+        if emails is not None and not sections.get("email"):
+            sections["email"] = self._fallback_summary(emails) if emails else "No emails to summarize."
+        if github_data is not None and not sections.get("github"):
+            sections["github"] = self._fallback_github_summary(github_data)
+        if teams_data is not None and not sections.get("teams"):
+            sections["teams"] = self._fallback_teams_summary(teams_data)
+        
+        return sections
+    
+    def _create_briefing_prompt(self, context_blocks: Dict[str, str]) -> str:
+        """Create one packed prompt covering every source"""
+        section_names = ", ".join(context_blocks.keys())
+        
+        return f"""
+You are an AI assistant that writes a combined briefing of the user's activity across these sources: {section_names}.
+
+For each source, write a clear, well-organized summary covering:
+1. Key themes and topics
+2. Important people, repositories, teams and channels
+3. Urgent or time-sensitive items (unread emails, open issues, upcoming meetings)
+4. Activity patterns and trends
+5. Action items or follow-ups needed
+
+Return one summary object per source, keyed by its name ({section_names}).
+{STRUCTURED_SUMMARY_INSTRUCTIONS}
+
+{chr(10).join(context_blocks.values())}
+"""
@@ -10,7 +10,8 @@ load_dotenv()
 class AuthService:
     """Service for handling Microsoft OAuth authentication"""
     
-    def __init__(self):
+    def __init__(self, http: Optional[requests.Session] = None):
+        self.http = http or requests
         self.client_id = os.getenv("CLIENT_ID")
         self.client_secret = os.getenv("CLIENT_SECRET")
         self.tenant_id = os.getenv("TENANT_ID")
@@ -58,7 +59,7 @@ class AuthService:
             data["client_secret"] = self.client_secret
         
         try:
-            response = requests.post(url, data=data)
+            response = self.http.post(url, data=data)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -80,7 +81,20 @@ class AuthService:
         try:
             # Make a simple API call to validate the token
             headers = {"Authorization": f"Bearer {token}"}
-            response = requests.get("https://graph.microsoft.com/v1.0/me", headers=headers)
+            response = self.http.get("https://graph.microsoft.com/v1.0/me", headers=headers)
             return response.status_code == 200
         except:
-            return False 
\ No newline at end of file
+            return False
+    
+    def get_user_info(self, token: str) -> Dict:
+        """Get Microsoft user information"""
+        try:
+            headers = {
+                "Authorization": f"Bearer {token}",
+                "Content-Type": "application/json"
+            }
+            response = self.http.get("https://graph.microsoft.com/v1.0/me", headers=headers)
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Failed to get user info: {str(e)}") 
\ No newline at end of file
@@ -0,0 +1,98 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+from .deadline_service import is_partial
+from .store_service import LocalStore, local_store
+from .suggestion_cache_service import compute_fingerprint
+
+# Constants
+MAX_BRIEFING_ENTRIES = 8
+MAX_SECTIONS_PER_ENTRY = 3
+
+
+class BriefingCache:
+    """Cache of combined briefings and per-source summaries keyed by data fingerprints"""
+
+    def __init__(self, max_entries: int = MAX_BRIEFING_ENTRIES, store: Optional[LocalStore] = None):
+        self.max_entries = max_entries
+        self.store = store
+        self._entries: Dict[str, Dict] = {}
+        self._sections: Dict[Tuple[str, str], Dict] = {}
+        self._lock = threading.Lock()
+
+    def get(self, fingerprint: str) -> Optional[Dict[str, str]]:
+        """Get the briefing sections for a combined fingerprint"""
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            return dict(entry["sections"]) if entry else None
+
+    def get_section(self, source: str, source_fingerprint: str) -> Optional[str]:
+        """Get the newest cached section generated from a given source snapshot"""
+        with self._lock:
+            section = self._sections.get((source, source_fingerprint))
+            if section is not None:
+                return section["text"]
+            for entry in sorted(self._entries.values(), key=lambda e: e["created_at"], reverse=True):
+                if entry["source_fingerprints"].get(source) == source_fingerprint and source in entry["sections"]:
+                    return entry["sections"][source]
+
+        # Summaries generated before a restart are still valid for unchanged data
+        if self.store is None:
+            return None
+        try:
+            section = self.store.get_summary(source, source_fingerprint)
+        except Exception as e:
+            print(f"Warning: Could not read the {source} summary from the local store: {e}")
+            return None
+        if section is not None:
+            self._cache_section(source, source_fingerprint, section)
+        return section
+
+    def get_sections(self, source_fingerprints: Dict[str, str]) -> Optional[Dict[str, str]]:
+        """Assemble a briefing from cached per-source sections, or None if any is missing"""
+        sections = {source: self.get_section(source, fingerprint) for source, fingerprint in source_fingerprints.items()}
+        return None if None in sections.values() else sections
+
+    def put_section(self, source: str, source_fingerprint: str, section: str):
+        """Store a single source's summary, evicting the oldest sections"""
+        self._cache_section(source, source_fingerprint, section)
+        if self.store is not None:
+            try:
+                self.store.put_summary(source, source_fingerprint, section)
+            except Exception as e:
+                print(f"Warning: Could not persist the {source} summary: {e}")
+
+    def _cache_section(self, source: str, source_fingerprint: str, section: str):
+        with self._lock:
+            self._sections[(source, source_fingerprint)] = {"text": section, "created_at": time.time()}
+            while len(self._sections) > self.max_entries * MAX_SECTIONS_PER_ENTRY:
+                oldest = min(self._sections, key=lambda key: self._sections[key]["created_at"])
+                del self._sections[oldest]
+
+    def put(self, fingerprint: str, source_fingerprints: Dict[str, str], sections: Dict[str, str]):
+        """Store a briefing, evicting the oldest entries"""
+        with self._lock:
+            self._entries[fingerprint] = {
+                "source_fingerprints": dict(source_fingerprints),
+                "sections": dict(sections),
+                "created_at": time.time()
+            }
+            while len(self._entries) > self.max_entries:
+                oldest = min(self._entries, key=lambda key: self._entries[key]["created_at"])
+                del self._entries[oldest]
+
+
+# Shared briefing cache (in production, use a proper cache store); per-source summaries survive restarts on disk
+briefing_cache = BriefingCache(store=local_store)
+
+
+def summarize_cached(source: str, data: Any, summarize: Callable[[Any], str]) -> str:
+    """Summarize one source's data, reusing the cached section while the data is unchanged"""
+    fingerprint = compute_fingerprint(data)
+    section = briefing_cache.get_section(source, fingerprint)
+    if section is None:
+        section = summarize(data)
+        # A summary cut short by the deadline is not worth keeping
+        if not is_partial():
+            briefing_cache.put_section(source, fingerprint, section)
+    return section
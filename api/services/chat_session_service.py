@@ -0,0 +1,133 @@
+import re
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+# Constants
+SESSION_TTL_SECONDS = 30 * 60
+SNAPSHOT_MAX_AGE_SECONDS = 10 * 60
+MAX_SESSIONS = 200
+MAX_RECENT_TURNS = 3
+MAX_TURN_SUMMARY_CHARS = 240
+MAX_SUMMARY_CHARS = 1500
+
+HTML_TAG_PATTERN = re.compile(r"<[^>]+>")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+class ChatSession:
+    """Server-side chat session holding a data snapshot and conversation memory"""
+
+    def __init__(self, session_id: str, source: str, data: Any):
+        self.session_id = session_id
+        self.source = source
+        self.data = data
+        self.context: Optional[str] = None
+        self.summary_lines: List[str] = []
+        self.recent_turns: List[Dict[str, str]] = []
+        self.turn_count = 0
+        self.snapshot_at = time.time()
+        self.last_used = self.snapshot_at
+
+    def is_snapshot_stale(self) -> bool:
+        """Check if the data snapshot should be re-fetched"""
+        return time.time() - self.snapshot_at > SNAPSHOT_MAX_AGE_SECONDS
+
+    def update_snapshot(self, data: Any):
+        """Replace the data snapshot, keeping the conversation memory"""
+        self.data = data
+        self.context = None
+        self.snapshot_at = time.time()
+
+    def add_turn(self, user_message: str, response: str):
+        """Record a turn, folding the oldest turns into the rolling summary"""
+        self.recent_turns.append({"user": user_message, "assistant": response})
+        self.turn_count += 1
+        self.last_used = time.time()
+
+        while len(self.recent_turns) > MAX_RECENT_TURNS:
+            oldest = self.recent_turns.pop(0)
+            self.summary_lines.append(
+                f"- Q: {_compact_text(oldest['user'])} A: {_compact_text(oldest['assistant'])}"
+            )
+
+        # Keep the rolling summary bounded by dropping the oldest lines
+        while self.summary_lines and sum(len(line) for line in self.summary_lines) > MAX_SUMMARY_CHARS:
+            self.summary_lines.pop(0)
+
+    def get_memory(self) -> str:
+        """Render compact conversation memory for the prompt"""
+        if not self.summary_lines and not self.recent_turns:
+            return ""
+
+        memory_parts = ["", "Conversation so far:"]
+        if self.summary_lines:
+            memory_parts.append("Summary of earlier turns:")
+            memory_parts.extend(self.summary_lines)
+
+        if self.recent_turns:
+            memory_parts.append("Most recent turns:")
+            for turn in self.recent_turns:
+                memory_parts.append(f"User: {turn['user']}")
+                memory_parts.append(f"Assistant: {_compact_text(turn['assistant'], MAX_TURN_SUMMARY_CHARS * 2)}")
+
+        return "\n".join(memory_parts) + "\n"
+
+
+class ChatSessionService:
+    """In-memory store of chat sessions keyed by conversation id"""
+
+    def __init__(self):
+        self._sessions: Dict[str, ChatSession] = {}
+        self._lock = threading.Lock()
+
+    def get_session(self, session_id: Optional[str], source: str) -> Optional[ChatSession]:
+        """Get an active session for a source, if it exists"""
+        if not session_id:
+            return None
+
+        with self._lock:
+            self._evict_expired()
+            session = self._sessions.get(session_id)
+            if session is None or session.source != source:
+                return None
+            session.last_used = time.time()
+            return session
+
+    def create_session(self, source: str, data: Any) -> ChatSession:
+        """Create a new session with a fresh data snapshot"""
+        session = ChatSession(uuid.uuid4().hex, source, data)
+
+        with self._lock:
+            self._evict_expired()
+            if len(self._sessions) >= MAX_SESSIONS:
+                least_recent = min(self._sessions.values(), key=lambda s: s.last_used)
+                del self._sessions[least_recent.session_id]
+            self._sessions[session.session_id] = session
+
+        return session
+
+    def delete_session(self, session_id: str) -> bool:
+        """Delete a session"""
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def _evict_expired(self):
+        """Drop sessions that have been idle longer than the TTL"""
+        cutoff = time.time() - SESSION_TTL_SECONDS
+        expired = [sid for sid, session in self._sessions.items() if session.last_used < cutoff]
+        for sid in expired:
+            del self._sessions[sid]
+
+
+def _compact_text(text: str, limit: int = MAX_TURN_SUMMARY_CHARS) -> str:
+    """Strip HTML and collapse whitespace, truncating to a character limit"""
+    plain = WHITESPACE_PATTERN.sub(" ", HTML_TAG_PATTERN.sub(" ", text or "")).strip()
+    if len(plain) > limit:
+        return plain[:limit].rstrip() + "..."
+    return plain
+
+
+# Shared session store (in production, use a proper database)
+chat_sessions = ChatSessionService()
@@ -1,60 +1,156 @@
-import google.generativeai as genai
-import os
-from typing import List, Dict
-from dotenv import load_dotenv
+import re
+from typing import Callable, List, Dict, Optional, Set
+from .chat_session_service import ChatSession
+from .email_body_service import EmailBodyCache, email_body_cache
+from .record_service import ThreadRecord, email_conversations
+from .rollup_service import ActivityRollups, activity_rollups
+from .ai_service import create_gemini_model
+from .render_service import CHAT_ANSWER_SCHEMA, CHAT_ANSWER_INSTRUCTIONS, json_generation_config, renderer
 
-load_dotenv()
+# Constants
+EMAIL_SUGGESTIONS = [
+    "How many unread emails do I have?",
+    "Show me emails from a specific sender",
+    "What are the most recent emails?",
+    "Are there any urgent emails?",
+    "Summarize my emails by topic",
+    "Find emails about meetings",
+    "What's my email activity pattern?",
+    "Which senders email me most often?"
+]
+MAX_THREADS_FOR_CONTEXT = 50
+MAX_FULL_BODY_EMAILS = 3
+MAX_PREFETCH_BODY_EMAILS = 3
+MAX_BODY_PROMPT_CHARS = 3000
+WORD_PATTERN = re.compile(r"\w+")
+STOP_WORDS = frozenset((
+    "about", "any", "are", "can", "did", "does", "email", "emails", "for", "from", "have", "how", "many", "mail",
+    "me", "most", "my", "show", "tell", "that", "the", "there", "this", "what", "when", "which", "who", "with", "you"
+))
+
+def _words(text: Optional[str]) -> Set[str]:
+    return set(WORD_PATTERN.findall((text or "").lower()))
+
+def rank_threads_for_question(question: str, threads: List[ThreadRecord]) -> List[ThreadRecord]:
+    """Conversations sharing words with the question, best match first; subject matches count most, then participants"""
+    terms = {word for word in _words(question) if len(word) > 2 and word not in STOP_WORDS}
+    if not terms:
+        return []
+    
+    scored = []
+    for index, thread in enumerate(threads):
+        score = (
+            3 * len(terms & _words(thread["subject"]))
+            + 2 * len(terms & _words(" ".join(thread["participants"])))
+            + len(terms & _words(thread["preview"]))
+        )
+        if score:
+            # Ties keep the list order, which is newest first
+            scored.append((-score, index, thread))
+    return [thread for _, _, thread in sorted(scored, key=lambda item: item[:2])]
 
 class ChatbotService:
     """Service for email-related chatbot functionality"""
     
-    def __init__(self):
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY environment variable is required")
-        
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
+    def __init__(self, model=None, body_cache: Optional[EmailBodyCache] = None, rollups: Optional[ActivityRollups] = None):
+        self.model = model or create_gemini_model()
+        self.body_cache = body_cache or email_body_cache
+        self.rollups = rollups or activity_rollups
     
     def get_email_context(self, emails: List[Dict]) -> str:
-        """Create context from emails for chatbot"""
+        """Create context from emails for chatbot, one entry per conversation"""
         if not emails:
             return "No emails available."
         
-        # Prepare email context
+        # Prepare conversation context; a long reply chain takes one slot instead of one per message
         email_contexts = []
-        for email in emails[:50]:  # Use up to 50 emails for context
-            from_info = email.get("from", {}).get("emailAddress", {}).get("name", "Unknown")
-            subject = email.get("subject", "No Subject")
-            body_preview = email.get("bodyPreview", "")
-            received = email.get("receivedDateTime", "Unknown")
-            is_read = email.get("isRead", True)
-            status = "UNREAD" if not is_read else "READ"
+        for thread in email_conversations(emails)[:MAX_THREADS_FOR_CONTEXT]:
+            unread = thread["unreadCount"]
+            status = f"{unread} UNREAD" if unread else "READ"
+            # Near-identical automated mail is folded into one entry with a count
+            folded = thread.get("foldedConversations")
+            folded_note = f" across {folded} near-identical conversations" if folded else ""
             
             email_context = f"""
-Email {len(email_contexts) + 1}:
+Conversation {len(email_contexts) + 1}:
 Status: {status}
-From: {from_info}
-Subject: {subject}
-Received: {received}
-Preview: {body_preview}
+Subject: {thread["subject"]}
+Participants: {", ".join(thread["participants"])}
+Messages: {thread["messageCount"]}{folded_note}
+Latest: {thread["latestReceivedDateTime"]} from {thread["latestFrom"]}
+Preview: {thread["preview"]}
 """
             email_contexts.append(email_context)
         
+        # Pattern questions are answered from precomputed counts over every email seen, not just those listed
+        self.rollups.observe("emails/all", emails)
+        activity_table = self.rollups.activity_table("email")
+        if activity_table:
+            email_contexts.append(activity_table)
+        
         return "\n".join(email_contexts)
     
-    def chat_about_emails(self, user_message: str, emails: List[Dict]) -> str:
-        """Generate chatbot response for email-related queries"""
+    def get_email_bodies_context(self, user_message: str, threads: List[ThreadRecord], fetch_body: Callable[[str], Optional[str]]) -> str:
+        """Full latest message of the few conversations most relevant to the question, loaded on demand"""
+        candidates = rank_threads_for_question(user_message, threads)
+        if not candidates:
+            return ""
+        
+        selected = candidates[:MAX_FULL_BODY_EMAILS]
+        bodies = self.body_cache.get_many([thread["emailIds"][0] for thread in selected], fetch_body)
+        
+        # Follow-up questions tend to dig into the next-best matches, so load those too; queued only
+        # now, as they share the fetch pool and would otherwise delay the bodies this answer needs
+        upcoming = candidates[MAX_FULL_BODY_EMAILS:MAX_FULL_BODY_EMAILS + MAX_PREFETCH_BODY_EMAILS]
+        self.body_cache.prefetch([thread["emailIds"][0] for thread in upcoming], fetch_body)
+        
+        body_contexts = []
+        for thread in selected:
+            body = bodies.get(thread["emailIds"][0])
+            if body is None:
+                continue
+            body_contexts.append(f"""
+Subject: {thread["subject"]}
+Latest message from: {thread["latestFrom"]}
+Body:
+{body[:MAX_BODY_PROMPT_CHARS]}
+""")
+        
+        if not body_contexts:
+            return ""
+        return "Latest message in full of the conversations most relevant to the question:\n" + "\n".join(body_contexts)
+    
+    def chat_about_emails(
+        self,
+        user_message: str,
+        emails: List[Dict],
+        session: Optional[ChatSession] = None,
+        raise_on_error: bool = False,
+        fetch_body: Optional[Callable[[str], Optional[str]]] = None
+    ) -> str:
+        """Generate chatbot response for email-related queries; fetch_body(email_id) lets it read the most relevant emails in full"""
         if not emails:
             return "I don't have access to any emails at the moment. Please check your email connection."
         
-        email_context = self.get_email_context(emails)
+        # Reuse the session's context so follow-ups don't rebuild it
+        if session is not None:
+            if session.context is None:
+                session.context = self.get_email_context(emails)
+            email_context = session.context
+            memory = session.get_memory()
+        else:
+            email_context = self.get_email_context(emails)
+            memory = ""
+        
+        threads = email_conversations(emails)
+        bodies_context = self.get_email_bodies_context(user_message, threads, fetch_body) if fetch_body is not None else ""
+        
         unread_count = sum(1 for email in emails if not email.get("isRead", True))
         total_count = len(emails)
         
         # Create system prompt for email chatbot
         system_prompt = f"""
-You are a helpful email assistant chatbot. You have access to {total_count} emails ({unread_count} unread) and can help users with email-related queries.
+You are a helpful email assistant chatbot. You have access to {total_count} emails ({unread_count} unread) in {len(threads)} conversations and can help users with email-related queries.
 
 Your capabilities include:
 - Answering questions about specific emails
@@ -66,22 +162,21 @@ Your capabilities include:
 
 Current email context:
 {email_context}
-
+{bodies_context}
+{memory}
 User's question: {user_message}
 
-Please provide a helpful, conversational response. Use HTML formatting for better readability:
-- Use <strong> for emphasis
-- Use <ul> and <li> for lists
-- Use <p> for paragraphs
-- Use <h3> for section headers if needed
+Please provide a helpful, conversational response. Keep responses concise but informative. If you can't find specific information, be honest about it.
 
-Keep responses concise but informative. If you can't find specific information, be honest about it.
+{CHAT_ANSWER_INSTRUCTIONS}
 """
         
         try:
-            response = self.model.generate_content(system_prompt)
-            return response.text
+            response = self.model.generate_content(system_prompt, generation_config=json_generation_config(CHAT_ANSWER_SCHEMA))
+            return renderer.render_chat_response(response.text)
         except Exception as e:
+            if raise_on_error:
+                raise
             print(f"Error generating chatbot response: {str(e)}")
             return self._fallback_response(user_message, emails)
     
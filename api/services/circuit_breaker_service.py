@@ -0,0 +1,155 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict
+from .deadline_service import MIN_LLM_CALL_SECONDS, upstream_timeout
+
+# Constants
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+DEFAULT_WINDOW_SIZE = 20
+DEFAULT_MIN_CALLS = 5
+DEFAULT_FAILURE_RATE_THRESHOLD = 0.5
+DEFAULT_SLOW_CALL_SECONDS = 20.0
+DEFAULT_SLOW_CALL_RATE_THRESHOLD = 0.5
+DEFAULT_OPEN_SECONDS = 30.0
+DEFAULT_HALF_OPEN_MAX_CALLS = 1
+DEFAULT_LLM_TIMEOUT_SECONDS = 60.0
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency while its circuit is open"""
+
+
+class CircuitBreaker:
+    """Trips on error rate or slow-call rate over a sliding window, then probes with half-open calls"""
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int = DEFAULT_WINDOW_SIZE,
+        min_calls: int = DEFAULT_MIN_CALLS,
+        failure_rate_threshold: float = DEFAULT_FAILURE_RATE_THRESHOLD,
+        slow_call_seconds: float = DEFAULT_SLOW_CALL_SECONDS,
+        slow_call_rate_threshold: float = DEFAULT_SLOW_CALL_RATE_THRESHOLD,
+        open_seconds: float = DEFAULT_OPEN_SECONDS,
+        half_open_max_calls: int = DEFAULT_HALF_OPEN_MAX_CALLS
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+
+        self._outcomes = deque(maxlen=window_size)  # (failed, slow) per call
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._rejected_calls = 0
+        self._times_opened = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        """Current state, moving an expired open circuit to half-open (lock must be held)"""
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._half_open_calls = 0
+        return self._state
+
+    def call(self, fn: Callable, *args, **kwargs):
+        """Call fn through the breaker, failing fast while the circuit is open"""
+        self._acquire()
+
+        start = time.monotonic()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self._record(failed=True, duration=time.monotonic() - start)
+            raise
+
+        self._record(failed=False, duration=time.monotonic() - start)
+        return result
+
+    def _acquire(self):
+        """Admit a call or raise CircuitOpenError"""
+        with self._lock:
+            state = self._current_state()
+            if state == OPEN or (state == HALF_OPEN and self._half_open_calls >= self.half_open_max_calls):
+                self._rejected_calls += 1
+                raise CircuitOpenError(f"{self.name} is temporarily unavailable (circuit {state})")
+            if state == HALF_OPEN:
+                self._half_open_calls += 1
+
+    def _record(self, failed: bool, duration: float):
+        """Record a call outcome and trip or reset the circuit"""
+        slow = duration >= self.slow_call_seconds
+
+        with self._lock:
+            if self._state == HALF_OPEN:
+                # A single probe decides: healthy closes the circuit, anything else re-opens it
+                if failed or slow:
+                    self._trip()
+                else:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                return
+
+            self._outcomes.append((failed, slow))
+            if self._state == CLOSED and len(self._outcomes) >= self.min_calls:
+                failure_rate = sum(1 for f, _ in self._outcomes if f) / len(self._outcomes)
+                slow_rate = sum(1 for _, s in self._outcomes if s) / len(self._outcomes)
+                if failure_rate >= self.failure_rate_threshold or slow_rate >= self.slow_call_rate_threshold:
+                    self._trip()
+
+    def _trip(self):
+        """Open the circuit (lock must be held)"""
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self._times_opened += 1
+        print(f"Circuit breaker '{self.name}' opened")
+
+    def snapshot(self) -> Dict:
+        """Breaker state for health reporting"""
+        with self._lock:
+            state = self._current_state()
+            calls = len(self._outcomes)
+            return {
+                "state": state,
+                "window_calls": calls,
+                "failure_rate": round(sum(1 for f, _ in self._outcomes if f) / calls, 3) if calls else 0.0,
+                "slow_call_rate": round(sum(1 for _, s in self._outcomes if s) / calls, 3) if calls else 0.0,
+                "retry_in_seconds": round(max(0.0, self.open_seconds - (time.monotonic() - self._opened_at)), 1) if state == OPEN else 0.0,
+                "times_opened": self._times_opened,
+                "rejected_calls": self._rejected_calls
+            }
+
+
+class GuardedModel:
+    """Gemini model wrapper that routes generate_content through a circuit breaker"""
+
+    def __init__(self, model, breaker: CircuitBreaker):
+        self.model = model
+        self.breaker = breaker
+
+    def generate_content(self, *args, **kwargs):
+        # Calls the request budget cannot cover are skipped before they count against the breaker
+        timeout = upstream_timeout("gemini", MIN_LLM_CALL_SECONDS, DEFAULT_LLM_TIMEOUT_SECONDS)
+        kwargs.setdefault("request_options", {"timeout": timeout})
+        return self.breaker.call(self.model.generate_content, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+
+# Shared breaker for every Gemini call in the process
+gemini_breaker = CircuitBreaker("gemini")
@@ -0,0 +1,148 @@
+import contextvars
+import threading
+import time
+import requests
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+# Constants
+DEFAULT_REQUEST_BUDGET_SECONDS = 20.0
+DEFAULT_UPSTREAM_TIMEOUT_SECONDS = 15.0
+MIN_HTTP_CALL_SECONDS = 1.0
+MIN_LLM_CALL_SECONDS = 3.0
+
+# Per-endpoint budgets; long crawls plus an LLM call get more room
+ENDPOINT_BUDGETS_SECONDS = {
+    "/briefing": 60.0,
+    "/emails/ai-summary": 45.0,
+    "/github/ai-summary": 45.0,
+    "/teams/ai-summary": 45.0,
+    "/chatbot/chat": 30.0,
+    "/github-chatbot/chat": 30.0,
+    "/teams-chatbot/chat": 30.0
+}
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """Raised instead of starting an upstream call the remaining budget cannot cover"""
+
+
+class Deadline:
+    """Request-scoped time budget shared by every upstream call made for the request"""
+
+    def __init__(self, budget_seconds: float):
+        self.budget_seconds = budget_seconds
+        self.expires_at = time.monotonic() + budget_seconds
+        self._skipped: List[str] = []
+        self._lock = threading.Lock()
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def mark_skipped(self, call: str):
+        """Record an upstream call that was skipped or cut short"""
+        with self._lock:
+            if call not in self._skipped:
+                self._skipped.append(call)
+
+    @property
+    def skipped(self) -> List[str]:
+        with self._lock:
+            return list(self._skipped)
+
+    @property
+    def partial(self) -> bool:
+        with self._lock:
+            return bool(self._skipped)
+
+
+_current_deadline: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar("deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current_deadline.get()
+
+
+@contextmanager
+def request_deadline(budget_seconds: float = DEFAULT_REQUEST_BUDGET_SECONDS):
+    """Run the block under a fresh deadline"""
+    deadline = Deadline(budget_seconds)
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+@contextmanager
+def no_deadline():
+    """Run the block without a deadline, e.g. background work scheduled by a request"""
+    token = _current_deadline.set(None)
+    try:
+        yield
+    finally:
+        _current_deadline.reset(token)
+
+
+@contextmanager
+def failure_tracking():
+    """Run background work without a time budget, still recording the upstream calls that failed or were cut short"""
+    with request_deadline(float("inf")) as deadline:
+        yield deadline
+
+
+def budget_for_path(path: str) -> float:
+    return ENDPOINT_BUDGETS_SECONDS.get(path.rstrip("/") or "/", DEFAULT_REQUEST_BUDGET_SECONDS)
+
+
+def upstream_timeout(call: str, min_seconds: float = MIN_HTTP_CALL_SECONDS, cap: float = DEFAULT_UPSTREAM_TIMEOUT_SECONDS) -> float:
+    """Timeout for the next upstream call, or DeadlineExceeded if the budget cannot cover it"""
+    deadline = current_deadline()
+    if deadline is None:
+        return cap
+
+    remaining = deadline.remaining()
+    if remaining < min_seconds:
+        deadline.mark_skipped(call)
+        raise DeadlineExceeded(f"Skipped {call}: {remaining:.1f}s left of the {deadline.budget_seconds:.0f}s request budget")
+    return min(cap, remaining)
+
+
+def is_partial() -> bool:
+    """Whether the current request skipped any upstream call"""
+    deadline = current_deadline()
+    return deadline is not None and deadline.partial
+
+
+def partial_info() -> Dict:
+    """Partial-result marker fields for JSON responses"""
+    deadline = current_deadline()
+    return {
+        "partial": deadline is not None and deadline.partial,
+        "skipped": deadline.skipped if deadline is not None else []
+    }
+
+
+def with_current_context(fn: Callable) -> Callable:
+    """Wrap fn so worker threads run it with the caller's deadline"""
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.copy().run(fn, *args, **kwargs)
+
+
+class DeadlineSession(requests.Session):
+    """HTTP session whose requests always carry a timeout bounded by the request deadline"""
+
+    def request(self, method, url, *args, **kwargs):
+        from .graph_client_service import endpoint_label
+
+        timeout = upstream_timeout(f"{method.upper()} {endpoint_label(url)}")
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = timeout
+        try:
+            return super().request(method, url, *args, **kwargs)
+        except requests.exceptions.RequestException:
+            # Services often swallow the error and return an empty list; this keeps the result marked partial
+            deadline = current_deadline()
+            if deadline is not None:
+                deadline.mark_skipped(f"{method.upper()} {endpoint_label(url)}")
+            raise
@@ -0,0 +1,94 @@
+import hashlib
+import re
+import struct
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+# Constants
+SIMHASH_BITS = 64
+# Per-bit counters are packed side by side into one integer, LANE_BITS wide each
+LANE_BITS = 16
+MAX_SHINGLES = 256
+# Shorter texts ("Thanks!", "OK") look alike without being duplicates, so they are never folded
+MIN_SHINGLES = 4
+MAX_HAMMING_DISTANCE = 3
+# Fingerprints within MAX_HAMMING_DISTANCE bits agree on at least one of BANDS > MAX_HAMMING_DISTANCE bands
+BANDS = 4
+SPREAD_CACHE_SIZE = 65536
+# Most mail is unchanged between refreshes, so fingerprints are reused rather than recomputed
+FINGERPRINT_CACHE_SIZE = 16384
+TOKEN_PATTERN = re.compile(r"\w+")
+
+_LANES = struct.Struct(f"<{SIMHASH_BITS}H")
+_BAND_BITS = SIMHASH_BITS // BANDS
+_BAND_MASK = (1 << _BAND_BITS) - 1
+
+
+@lru_cache(maxsize=SPREAD_CACHE_SIZE)
+def _spread(shingle: str) -> int:
+    """A shingle's 64-bit hash with bit i moved to the bottom of lane i, so adding spreads counts every bit at once"""
+    digest = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=SIMHASH_BITS // 8).digest(), "big")
+    spread = 0
+    for bit in range(SIMHASH_BITS):
+        if digest >> bit & 1:
+            spread |= 1 << (bit * LANE_BITS)
+    return spread
+
+
+def shingles(text: str) -> List[str]:
+    """Distinct word pairs of a text, with every token that is not all letters folded to 0"""
+    # Ids, counts, hashes and times are what differ between otherwise identical notifications
+    tokens = [token if token.isalpha() else "0" for token in TOKEN_PATTERN.findall(text.lower())]
+    pairs = (f"{first} {second}" for first, second in zip(tokens, tokens[1:]))
+    return list(dict.fromkeys(pairs))[:MAX_SHINGLES]
+
+
+@lru_cache(maxsize=FINGERPRINT_CACHE_SIZE)
+def simhash(text: str) -> Tuple[int, int]:
+    """64-bit SimHash of a text and the number of shingles it was built from"""
+    text_shingles = shingles(text)
+    # One big-integer addition per shingle sums all 64 bit columns together
+    columns = sum(map(_spread, text_shingles))
+    half = len(text_shingles) / 2
+    bits = "".join("1" if count > half else "0" for count in reversed(_LANES.unpack(columns.to_bytes(_LANES.size, "little"))))
+    return int(bits, 2), len(text_shingles)
+
+
+def cluster_near_duplicates(texts: List[str], max_distance: int = MAX_HAMMING_DISTANCE) -> List[List[int]]:
+    """Group the indexes of near-identical texts, keeping input order; each group's first index is its representative.
+
+    Candidates are found through band buckets, so each text is only compared
+    with representatives that share a band with it, not with every other text.
+    """
+    buckets: Dict[Tuple[int, int], List[int]] = {}
+    fingerprints: Dict[int, int] = {}
+    cluster_of: Dict[int, int] = {}
+    clusters: List[List[int]] = []
+
+    for index, text in enumerate(texts):
+        fingerprint, size = simhash(text)
+        if size < MIN_SHINGLES:
+            clusters.append([index])
+            continue
+
+        keys = [(band, fingerprint >> (band * _BAND_BITS) & _BAND_MASK) for band in range(BANDS)]
+        match = next(
+            (
+                representative
+                for key in keys
+                for representative in buckets.get(key, ())
+                if bin(fingerprint ^ fingerprints[representative]).count("1") <= max_distance
+            ),
+            None
+        )
+        if match is not None:
+            clusters[cluster_of[match]].append(index)
+            continue
+
+        fingerprints[index] = fingerprint
+        cluster_of[index] = len(clusters)
+        clusters.append([index])
+        for key in keys:
+            buckets.setdefault(key, []).append(index)
+
+    return clusters
@@ -0,0 +1,94 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional
+from .deadline_service import no_deadline, with_current_context
+from .single_flight_service import single_flight
+
+# Constants
+MAX_BODY_CACHE_CHARS = 2_000_000
+MAX_BODY_FETCH_WORKERS = 4
+
+
+class EmailBodyCache:
+    """Size-bounded LRU cache of normalized email bodies, loaded from Graph only when asked for"""
+
+    def __init__(self, max_chars: int = MAX_BODY_CACHE_CHARS, max_workers: int = MAX_BODY_FETCH_WORKERS):
+        self.max_chars = max_chars
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="email-body")
+
+    def get(self, email_id: str, loader: Callable[[str], Optional[str]]) -> Optional[str]:
+        """Return an email's body, loading it with loader(email_id) on a miss; None if it could not be loaded"""
+        with self._lock:
+            body = self._entries.get(email_id)
+            if body is not None:
+                self._entries.move_to_end(email_id)
+                return body
+
+        body = single_flight.do("email.body", email_id, lambda: loader(email_id))
+        if body is not None:
+            self._put(email_id, body)
+        return body
+
+    def get_many(self, email_ids: Iterable[str], loader: Callable[[str], Optional[str]]) -> Dict[str, str]:
+        """Bodies of several emails, loading the missing ones concurrently under the caller's deadline"""
+        email_ids = list(dict.fromkeys(email_ids))
+        get = with_current_context(lambda email_id: self.get(email_id, loader))
+        bodies = {}
+        for email_id, future in [(email_id, self._pool.submit(get, email_id)) for email_id in email_ids]:
+            try:
+                body = future.result()
+            except Exception as e:
+                print(f"Warning: Could not load body of email {email_id}: {e}")
+                continue
+            if body is not None:
+                bodies[email_id] = body
+        return bodies
+
+    def prefetch(self, email_ids: Iterable[str], loader: Callable[[str], Optional[str]]):
+        """Start loading bodies that are likely to be asked for next, without waiting for them"""
+        for email_id in email_ids:
+            with self._lock:
+                if email_id in self._entries:
+                    continue
+            self._pool.submit(self._prefetch_one, email_id, loader)
+
+    def invalidate(self, email_id: str):
+        """Drop one email's body, e.g. after the email was deleted"""
+        with self._lock:
+            body = self._entries.pop(email_id, None)
+            if body is not None:
+                self._size -= len(body)
+
+    def clear(self):
+        """Drop every cached body, e.g. on sign-out"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _put(self, email_id: str, body: str):
+        """Store a body, evicting the least recently used ones until the cache fits its size bound"""
+        with self._lock:
+            previous = self._entries.pop(email_id, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[email_id] = body
+            self._size += len(body)
+            while self._size > self.max_chars and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def _prefetch_one(self, email_id: str, loader: Callable[[str], Optional[str]]):
+        # Outlives the request that scheduled it, so it must not inherit that request's deadline
+        with no_deadline():
+            try:
+                self.get(email_id, loader)
+            except Exception as e:
+                print(f"Warning: Could not prefetch body of email {email_id}: {e}")
+
+
+# Shared email body cache (in production, use a proper cache store)
+email_body_cache = EmailBodyCache()
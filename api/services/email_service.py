@@ -1,6 +1,10 @@
 import requests
 from typing import List, Dict, Optional
 from ..models.auth import EmailSummary
+from .single_flight_service import coalesce
+from .graph_client_service import GraphClient
+from .record_service import EmailRecord
+from .text_service import normalize_body
 
 # Constants
 GRAPH_API_BASE_URL = "https://graph.microsoft.com/v1.0"
@@ -8,12 +12,15 @@ DEFAULT_EMAIL_LIMIT = 100
 DEFAULT_UNREAD_LIMIT = 50
 MAX_EMAILS_FOR_SUMMARY = 10
 MAX_EMAILS_FOR_AI = 30
+MAX_EMAIL_BODY_CHARS = 20000
 
 class EmailService:
     """Service for handling Microsoft Graph email operations"""
     
-    def __init__(self):
+    def __init__(self, http: Optional[requests.Session] = None):
         self.base_url = GRAPH_API_BASE_URL
+        self.http = http or requests
+        self.graph = GraphClient(self.http)
     
     def _get_headers(self, access_token: str) -> Dict[str, str]:
         """Get headers with authentication token"""
@@ -25,14 +32,15 @@ class EmailService:
     def _make_request(self, url: str, headers: Dict[str, str], params: Optional[Dict] = None) -> Dict:
         """Make HTTP request with error handling"""
         try:
-            response = requests.get(url, headers=headers, params=params)
+            response = self.graph.get(url, headers=headers, params=params)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
             print(f"Error making request to {url}: {str(e)}")
             return {"value": []}
     
-    def get_all_emails(self, access_token: str) -> List[Dict]:
+    @coalesce("emails.get_all_emails")
+    def get_all_emails(self, access_token: str) -> List[EmailRecord]:
         """Get all emails from Microsoft Graph API"""
         headers = self._get_headers(access_token)
         
@@ -40,7 +48,7 @@ class EmailService:
         params = {
             "$top": DEFAULT_EMAIL_LIMIT,
             "$orderby": "receivedDateTime desc",
-            "$select": "subject,from,receivedDateTime,bodyPreview,id,isRead"
+            "$select": "subject,from,receivedDateTime,bodyPreview,id,isRead,conversationId"
         }
         
         data = self._make_request(
@@ -49,8 +57,9 @@ class EmailService:
             params=params
         )
         
-        return data.get("value", [])
+        return [EmailRecord.from_graph(message) for message in data.get("value", [])]
     
+    @coalesce("emails.get_email_summary")
     def get_email_summary(self, access_token: str) -> EmailSummary:
         """Get a summary of all emails"""
         emails = self.get_all_emails(access_token)
@@ -88,7 +97,34 @@ class EmailService:
             email_count=len(emails)
         )
     
-    def get_unread_emails(self, access_token: str) -> List[Dict]:
+    def get_email(self, access_token: str, email_id: str) -> Optional[EmailRecord]:
+        """Get a single email with the same fields as the email list"""
+        headers = self._get_headers(access_token)
+        
+        data = self._make_request(
+            f"{self.base_url}/me/messages/{email_id}",
+            headers=headers,
+            params={"$select": "subject,from,receivedDateTime,bodyPreview,id,isRead,conversationId"}
+        )
+        
+        return EmailRecord.from_graph(data) if "id" in data else None
+    
+    def get_email_body(self, access_token: str, email_id: str) -> Optional[str]:
+        """Get an email's full body as plain text, without quoted replies or signature"""
+        headers = self._get_headers(access_token)
+        
+        data = self._make_request(
+            f"{self.base_url}/me/messages/{email_id}",
+            headers=headers,
+            params={"$select": "body"}
+        )
+        
+        if "body" not in data:
+            return None
+        text, _ = normalize_body(data["body"].get("content"), data["body"].get("contentType", "html"), MAX_EMAIL_BODY_CHARS)
+        return text
+    
+    def get_unread_emails(self, access_token: str) -> List[EmailRecord]:
         """Get unread emails from Microsoft Graph API"""
         headers = self._get_headers(access_token)
         
@@ -97,7 +133,7 @@ class EmailService:
             "$filter": "isRead eq false",
             "$top": DEFAULT_UNREAD_LIMIT,
             "$orderby": "receivedDateTime desc",
-            "$select": "subject,from,receivedDateTime,bodyPreview,id"
+            "$select": "subject,from,receivedDateTime,bodyPreview,id,conversationId"
         }
         
         data = self._make_request(
@@ -106,7 +142,8 @@ class EmailService:
             params=params
         )
         
-        return data.get("value", [])
+        # The filter guarantees these are unread, so isRead is not selected
+        return [EmailRecord.from_graph(message, is_read=False) for message in data.get("value", [])]
     
     def mark_as_read(self, access_token: str, email_id: str) -> bool:
         """Mark an email as read"""
@@ -117,7 +154,7 @@ class EmailService:
         }
         
         try:
-            response = requests.patch(
+            response = self.graph.patch(
                 f"{self.base_url}/me/messages/{email_id}",
                 headers=headers,
                 json=data
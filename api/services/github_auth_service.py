@@ -10,7 +10,8 @@ load_dotenv()
 class GitHubAuthService:
     """Service for handling GitHub OAuth authentication"""
     
-    def __init__(self):
+    def __init__(self, http: Optional[requests.Session] = None):
+        self.http = http or requests
         self.client_id = os.getenv("GITHUB_CLIENT_ID")
         self.client_secret = os.getenv("GITHUB_CLIENT_SECRET")
         self.redirect_uri = os.getenv("GITHUB_REDIRECT_URI", "http://localhost:8000/auth/github/callback")
@@ -47,7 +48,7 @@ class GitHubAuthService:
         }
         
         try:
-            response = requests.post(url, json=data, headers=headers)
+            response = self.http.post(url, json=data, headers=headers)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -71,7 +72,7 @@ class GitHubAuthService:
                 "Authorization": f"token {token}",
                 "Accept": "application/vnd.github.v3+json"
             }
-            response = requests.get("https://api.github.com/user", headers=headers)
+            response = self.http.get("https://api.github.com/user", headers=headers)
             return response.status_code == 200
         except:
             return False
@@ -83,7 +84,7 @@ class GitHubAuthService:
                 "Authorization": f"token {token}",
                 "Accept": "application/vnd.github.v3+json"
             }
-            response = requests.get("https://api.github.com/user", headers=headers)
+            response = self.http.get("https://api.github.com/user", headers=headers)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -1,46 +1,65 @@
-import google.generativeai as genai
-import os
-from typing import Dict, List
-from dotenv import load_dotenv
+from typing import Dict, List, Optional
+from .chat_session_service import ChatSession
+from .ai_service import create_gemini_model
+from .rollup_service import ActivityRollups, activity_rollups
+from .render_service import CHAT_ANSWER_SCHEMA, CHAT_ANSWER_INSTRUCTIONS, json_generation_config, renderer
 
-load_dotenv()
+# Constants
+GITHUB_SUGGESTIONS = [
+    "How many repositories do I have?",
+    "What are my most recent commits?",
+    "Show me my open issues",
+    "What languages do I use most?",
+    "Which repositories are most active?",
+    "How many pull requests do I have?",
+    "What's my GitHub activity pattern?",
+    "Which repositories have the most stars?",
+    "What are my most popular repositories?",
+    "Show me my recent contributions"
+]
 
 class GitHubChatbotService:
     """Service for GitHub chatbot functionality"""
     
-    def __init__(self):
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY environment variable is required")
-        
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
+    def __init__(self, model=None, rollups: Optional[ActivityRollups] = None):
+        self.model = model or create_gemini_model()
+        self.rollups = rollups or activity_rollups
     
-    def chat_about_github(self, message: str, github_data: Dict) -> str:
+    def chat_about_github(self, message: str, github_data: Dict, session: Optional[ChatSession] = None, raise_on_error: bool = False) -> str:
         """Generate a response about GitHub data"""
         try:
-            # Create context from GitHub data
-            context = self._create_github_context(github_data)
+            # Create context from GitHub data, reusing the session's copy on follow-ups
+            if session is not None:
+                if session.context is None:
+                    session.context = self._create_github_context(github_data)
+                context = session.context
+                memory = session.get_memory()
+            else:
+                context = self._create_github_context(github_data)
+                memory = ""
             
             # Create the prompt
             prompt = f"""
 You are a helpful GitHub assistant. You have access to the following GitHub data:
 
 {context}
-
+{memory}
 User Question: {message}
 
 Please provide a helpful and informative response about the user's GitHub activity. 
 Be specific and reference the actual data when possible. If the user asks about something 
 not available in the data, politely explain what information is available.
 
-Response:"""
+{CHAT_ANSWER_INSTRUCTIONS}
+"""
 
             # Generate response
-            response = self.model.generate_content(prompt)
-            return response.text
+            response = self.model.generate_content(prompt, generation_config=json_generation_config(CHAT_ANSWER_SCHEMA))
+            return renderer.render_chat_response(response.text)
             
         except Exception as e:
+            if raise_on_error:
+                raise
             return f"Sorry, I encountered an error while processing your request: {str(e)}"
     
     def _create_github_context(self, github_data: Dict) -> str:
@@ -90,17 +109,14 @@ Response:"""
         context_parts.append(f"- Total Issues: {github_data.get('total_issues', 0)}")
         context_parts.append(f"- Total Pull Requests: {github_data.get('total_pull_requests', 0)}")
         
+        # Precomputed counts answer activity pattern questions without eyeballing the lists above
+        self.rollups.observe("github/all", github_data)
+        activity_table = self.rollups.activity_table("github")
+        if activity_table:
+            context_parts.append("\n" + activity_table)
+        
         return "\n".join(context_parts)
     
     def get_github_suggestions(self) -> List[str]:
         """Get suggested questions for GitHub chatbot"""
-        return [
-            "How many repositories do I have?",
-            "What are my most recent commits?",
-            "Show me my open issues",
-            "What languages do I use most?",
-            "Which repositories are most active?",
-            "How many pull requests do I have?",
-            "What's my GitHub activity pattern?",
-            "Which repositories have the most stars?"
-        ] 
\ No newline at end of file
+        return list(GITHUB_SUGGESTIONS) 
\ No newline at end of file
@@ -1,12 +1,16 @@
 import requests
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
+from .single_flight_service import coalesce
+from .job_service import report_progress
+from .record_service import CommitRecord, IssueRecord, RepositoryRecord
 
 class GitHubService:
     """Service for fetching GitHub data"""
     
-    def __init__(self):
+    def __init__(self, http: Optional[requests.Session] = None):
         self.base_url = "https://api.github.com"
+        self.http = http or requests
         self.headers = {
             "Accept": "application/vnd.github.v3+json"
         }
@@ -17,7 +21,7 @@ class GitHubService:
         headers["Authorization"] = f"token {token}"
         return headers
     
-    def get_user_repositories(self, token: str, per_page: int = 100) -> List[Dict]:
+    def get_user_repositories(self, token: str, per_page: int = 100) -> List[RepositoryRecord]:
         """Get user's repositories"""
         try:
             headers = self._get_headers(token)
@@ -28,13 +32,13 @@ class GitHubService:
                 "direction": "desc"
             }
             
-            response = requests.get(url, headers=headers, params=params)
+            response = self.http.get(url, headers=headers, params=params)
             response.raise_for_status()
-            return response.json()
+            return [RepositoryRecord.from_github(repository) for repository in response.json()]
         except requests.exceptions.RequestException as e:
             raise Exception(f"Failed to get repositories: {str(e)}")
     
-    def get_repository_commits(self, token: str, repo_name: str, since_days: int = 30) -> List[Dict]:
+    def get_repository_commits(self, token: str, repo_name: str, since_days: int = 30) -> List[CommitRecord]:
         """Get commits for a specific repository"""
         try:
             headers = self._get_headers(token)
@@ -47,19 +51,13 @@ class GitHubService:
                 "per_page": 100
             }
             
-            response = requests.get(url, headers=headers, params=params)
+            response = self.http.get(url, headers=headers, params=params)
             response.raise_for_status()
-            commits = response.json()
-            
-            # Add repository name to each commit
-            for commit in commits:
-                commit["repository"] = repo_name
-            
-            return commits
+            return [CommitRecord.from_github(commit, repo_name) for commit in response.json()]
         except requests.exceptions.RequestException as e:
             raise Exception(f"Failed to get commits for {repo_name}: {str(e)}")
     
-    def get_user_issues(self, token: str, state: str = "all") -> List[Dict]:
+    def get_user_issues(self, token: str, state: str = "all") -> List[IssueRecord]:
         """Get user's issues"""
         try:
             headers = self._get_headers(token)
@@ -72,22 +70,13 @@ class GitHubService:
                 "direction": "desc"
             }
             
-            response = requests.get(url, headers=headers, params=params)
+            response = self.http.get(url, headers=headers, params=params)
             response.raise_for_status()
-            issues = response.json()
-            
-            # Add repository name to each issue
-            for issue in issues:
-                if "repository" in issue:
-                    issue["repository"] = issue["repository"]["full_name"]
-                else:
-                    issue["repository"] = "Unknown"
-            
-            return issues
+            return [IssueRecord.from_github(issue) for issue in response.json()]
         except requests.exceptions.RequestException as e:
             raise Exception(f"Failed to get issues: {str(e)}")
     
-    def get_user_pull_requests(self, token: str, state: str = "all") -> List[Dict]:
+    def get_user_pull_requests(self, token: str, state: str = "all") -> List[IssueRecord]:
         """Get user's pull requests"""
         try:
             headers = self._get_headers(token)
@@ -103,20 +92,11 @@ class GitHubService:
                 "order": "desc"
             }
             
-            response = requests.get(url, headers=headers, params=params)
+            response = self.http.get(url, headers=headers, params=params)
             response.raise_for_status()
             data = response.json()
             
-            pull_requests = data.get("items", [])
-            
-            # Add repository name to each PR
-            for pr in pull_requests:
-                if "repository" in pr:
-                    pr["repository"] = pr["repository"]["full_name"]
-                else:
-                    pr["repository"] = "Unknown"
-            
-            return pull_requests
+            return [IssueRecord.from_github(pr) for pr in data.get("items", [])]
         except requests.exceptions.RequestException as e:
             raise Exception(f"Failed to get pull requests: {str(e)}")
     
@@ -124,12 +104,13 @@ class GitHubService:
         """Get GitHub username from token"""
         try:
             headers = self._get_headers(token)
-            response = requests.get(f"{self.base_url}/user", headers=headers)
+            response = self.http.get(f"{self.base_url}/user", headers=headers)
             response.raise_for_status()
             return response.json()["login"]
         except:
             return "unknown"
     
+    @coalesce("github.get_all_github_data")
     def get_all_github_data(self, token: str) -> Dict:
         """Get all GitHub data for the user"""
         try:
@@ -138,17 +119,22 @@ class GitHubService:
             
             # Get commits for each repository
             all_commits = []
-            for repo in repositories[:10]:  # Limit to first 10 repos to avoid rate limits
+            crawled_repos = repositories[:10]  # Limit to first 10 repos to avoid rate limits
+            report_progress(stage="commits", repos_done=0, repos_total=len(crawled_repos))
+            for repos_done, repo in enumerate(crawled_repos, start=1):
                 try:
                     commits = self.get_repository_commits(token, repo["full_name"])
                     all_commits.extend(commits)
                 except Exception as e:
                     print(f"Warning: Could not get commits for {repo['full_name']}: {e}")
+                report_progress(repos_done=repos_done)
             
             # Get issues
+            report_progress(stage="issues")
             issues = self.get_user_issues(token)
             
             # Get pull requests
+            report_progress(stage="pull_requests")
             pull_requests = self.get_user_pull_requests(token)
             
             return {
@@ -164,6 +150,7 @@ class GitHubService:
         except Exception as e:
             raise Exception(f"Failed to get GitHub data: {str(e)}")
     
+    @coalesce("github.get_github_summary")
     def get_github_summary(self, token: str) -> Dict:
         """Get a summary of GitHub activity"""
         try:
@@ -0,0 +1,167 @@
+import base64
+import json
+import random
+import re
+import threading
+import time
+import requests
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+from .deadline_service import current_deadline
+
+# Constants
+GRAPH_API_BASE_URL = "https://graph.microsoft.com/v1.0"
+RETRYABLE_STATUS_CODES = {429, 503, 504}
+# Final responses that mean the data is missing rather than empty: an expired token or a server failure
+FAILED_STATUS_CODES = {401, 500, 502}
+MAX_RETRIES = 4
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 30.0
+MAX_RETRY_AFTER_SECONDS = 60.0
+MAX_CONCURRENT_REQUESTS_PER_TENANT = 4
+UNKNOWN_TENANT = "unknown"
+
+ID_SEGMENT_PATTERN = re.compile(r"^(?=.*\d)[^/]{16,}$|[:@=!]")
+
+
+class GraphThrottlePolicy:
+    """Per-tenant concurrency governor and throttle counters shared by every Graph client"""
+
+    def __init__(self, max_concurrent_per_tenant: int = MAX_CONCURRENT_REQUESTS_PER_TENANT):
+        self.max_concurrent_per_tenant = max_concurrent_per_tenant
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def governor(self, tenant_id: str) -> threading.BoundedSemaphore:
+        """Semaphore limiting concurrent in-flight requests for one tenant"""
+        with self._lock:
+            semaphore = self._semaphores.get(tenant_id)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.max_concurrent_per_tenant)
+                self._semaphores[tenant_id] = semaphore
+            return semaphore
+
+    def record(self, endpoint: str, event: str):
+        """Count a request, throttle, retry or give-up for an endpoint"""
+        with self._lock:
+            stats = self._stats.setdefault(endpoint, {"requests": 0, "throttled": 0, "retries": 0, "gave_up": 0})
+            stats[event] += 1
+
+    def snapshot(self) -> Dict:
+        """Throttle counters for health reporting"""
+        with self._lock:
+            return {
+                "max_concurrent_per_tenant": self.max_concurrent_per_tenant,
+                "tenants": len(self._semaphores),
+                "endpoints": {endpoint: dict(stats) for endpoint, stats in self._stats.items()}
+            }
+
+
+class GraphClient:
+    """Microsoft Graph HTTP client that honours Retry-After and backs off with jitter"""
+
+    def __init__(self, http=None, policy: Optional["GraphThrottlePolicy"] = None):
+        self.http = http or requests
+        self.policy = policy or graph_throttle_policy
+
+    def get(self, url: str, headers: Dict[str, str], params: Optional[Dict] = None) -> requests.Response:
+        """GET with throttling-aware retries"""
+        return self.request("GET", url, headers=headers, params=params)
+
+    def patch(self, url: str, headers: Dict[str, str], json: Optional[Dict] = None) -> requests.Response:
+        """PATCH with throttling-aware retries"""
+        return self.request("PATCH", url, headers=headers, json=json)
+
+    def request(self, method: str, url: str, headers: Dict[str, str], **kwargs) -> requests.Response:
+        """Send a request, retrying 429/503/504 responses; the final response is returned unraised"""
+        endpoint = endpoint_label(url)
+        governor = self.policy.governor(tenant_from_headers(headers))
+
+        attempt = 0
+        while True:
+            self.policy.record(endpoint, "requests")
+
+            # Only the request itself holds a tenant slot; waiting out a backoff does not
+            with governor:
+                response = self.http.request(method, url, headers=headers, **kwargs)
+
+            if response.status_code not in RETRYABLE_STATUS_CODES:
+                if response.status_code in FAILED_STATUS_CODES:
+                    _mark_failed(f"{method} {endpoint}")
+                return response
+
+            self.policy.record(endpoint, "throttled")
+            if attempt >= MAX_RETRIES:
+                self.policy.record(endpoint, "gave_up")
+                _mark_failed(f"{method} {endpoint}")
+                print(f"Graph throttling: giving up on {endpoint} after {attempt + 1} attempts")
+                return response
+
+            delay = retry_delay(response, attempt)
+            deadline = current_deadline()
+            if deadline is not None and delay >= deadline.remaining():
+                # Waiting would blow the request budget; hand back the throttled response
+                self.policy.record(endpoint, "gave_up")
+                deadline.mark_skipped(f"{method} {endpoint}")
+                return response
+
+            print(f"Graph throttling: {response.status_code} on {endpoint}, retrying in {delay:.1f}s")
+            self.policy.record(endpoint, "retries")
+            time.sleep(delay)
+            attempt += 1
+
+
+def _mark_failed(call: str):
+    """Mark the current request's result partial: callers turn failed responses into empty lists"""
+    deadline = current_deadline()
+    if deadline is not None:
+        deadline.mark_skipped(call)
+
+
+def retry_delay(response: requests.Response, attempt: int) -> float:
+    """Seconds to wait: Retry-After when the server sends one, otherwise full-jitter exponential backoff"""
+    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+    if retry_after is not None:
+        return min(retry_after, MAX_RETRY_AFTER_SECONDS)
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt)))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given as delta-seconds or an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def tenant_from_headers(headers: Dict[str, str]) -> str:
+    """Tenant id (tid claim) of the bearer token, without verifying it"""
+    token = headers.get("Authorization", "").replace("Bearer ", "", 1)
+    parts = token.split(".")
+    if len(parts) != 3:
+        return UNKNOWN_TENANT
+    try:
+        payload = parts[1] + "=" * (-len(parts[1]) % 4)
+        return json.loads(base64.urlsafe_b64decode(payload)).get("tid") or UNKNOWN_TENANT
+    except (ValueError, AttributeError):
+        return UNKNOWN_TENANT
+
+
+def endpoint_label(url: str) -> str:
+    """Graph path with ids replaced, e.g. /teams/{id}/channels/{id}/messages"""
+    path = urlparse(url).path
+    if path.startswith("/v1.0"):
+        path = path[len("/v1.0"):]
+    return "/".join("{id}" if ID_SEGMENT_PATTERN.search(segment) else segment for segment in path.split("/"))
+
+
+# Shared throttle policy for the process (in production, coordinate across workers)
+graph_throttle_policy = GraphThrottlePolicy()
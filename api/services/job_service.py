@@ -0,0 +1,217 @@
+import contextvars
+import queue
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional
+from .deadline_service import failure_tracking
+from .suggestion_cache_service import compute_fingerprint
+
+# Constants
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+TERMINAL_STATES = (SUCCEEDED, FAILED)
+
+DEFAULT_WORKERS = 3  # one per provider, so a dashboard's summary jobs run side by side
+RESULT_TTL_SECONDS = 300
+JOB_RETENTION_SECONDS = 3600
+WORKER_POLL_SECONDS = 1.0
+
+
+class Job:
+    """A queued crawl or summary and its progress"""
+
+    def __init__(self, kind: str, params: Dict, dedupe_key: str):
+        self.job_id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.dedupe_key = dedupe_key
+        self.status = QUEUED
+        self.progress: Dict = {}
+        self.result = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.version = 0
+        self._changed = threading.Condition()
+
+    def update(self, **fields):
+        """Apply changes and wake anyone streaming this job"""
+        with self._changed:
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self.version += 1
+            self._changed.notify_all()
+
+    def report(self, **progress):
+        """Merge progress counters (e.g. channels_done) into the job"""
+        with self._changed:
+            self.progress.update(progress)
+            self.version += 1
+            self._changed.notify_all()
+
+    def wait_for_change(self, seen_version: int, timeout: float) -> int:
+        """Block until the job changes past seen_version or the timeout elapses"""
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != seen_version, timeout=timeout)
+            return self.version
+
+    @property
+    def done(self) -> bool:
+        return self.status in TERMINAL_STATES
+
+    def to_dict(self, include_result: bool = True) -> Dict:
+        data = {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": dict(self.progress),
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at
+        }
+        if include_result and self.status == SUCCEEDED:
+            data["result"] = self.result
+        return data
+
+
+class QueueBackend(ABC):
+    """Transport for job ids between the API and the workers; swap in a broker-backed one as needed"""
+
+    @abstractmethod
+    def put(self, job_id: str):
+        """Hand a job id to the workers"""
+
+    @abstractmethod
+    def get(self, timeout: float) -> Optional[str]:
+        """Next job id, or None if nothing arrived within the timeout"""
+
+    def close(self):
+        pass
+
+
+class InMemoryQueueBackend(QueueBackend):
+    """Process-local FIFO queue"""
+
+    def __init__(self):
+        self._queue: "queue.Queue[str]" = queue.Queue()
+
+    def put(self, job_id: str):
+        self._queue.put(job_id)
+
+    def get(self, timeout: float) -> Optional[str]:
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+_current_job: contextvars.ContextVar[Optional[Job]] = contextvars.ContextVar("job", default=None)
+
+
+def report_progress(**progress):
+    """Report progress for the job running in this thread; a no-op outside jobs"""
+    job = _current_job.get()
+    if job is not None:
+        job.report(**progress)
+
+
+class JobService:
+    """In-process workers running registered job kinds from a pluggable queue backend"""
+
+    def __init__(self, backend: Optional[QueueBackend] = None, workers: int = DEFAULT_WORKERS):
+        self.backend = backend or InMemoryQueueBackend()
+        self.worker_count = workers
+        self._handlers: Dict[str, Callable[[Dict], object]] = {}
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._workers: List[threading.Thread] = []
+
+    def register(self, kind: str, handler: Callable[[Dict], object]):
+        """Register the function that runs a job kind; it receives the job params"""
+        self._handlers[kind] = handler
+
+    def submit(self, kind: str, params: Dict, refresh: bool = False) -> Job:
+        """Queue a job, reusing an identical queued/running job or a recent result"""
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        # Params may hold access tokens, so jobs are matched by hash
+        dedupe_key = compute_fingerprint([kind, params])
+        with self._lock:
+            self._evict_expired()
+            for job in self._jobs.values():
+                if job.dedupe_key != dedupe_key:
+                    continue
+                # A refresh must reflect state after submission, so it cannot join a job already running
+                if job.status == QUEUED or (job.status == RUNNING and not refresh):
+                    return job
+                if not refresh and job.status == SUCCEEDED and time.time() - job.finished_at < RESULT_TTL_SECONDS:
+                    return job
+
+            job = Job(kind, params, dedupe_key)
+            self._jobs[job.job_id] = job
+
+        self.start()
+        self.backend.put(job.job_id)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def start(self):
+        """Start the worker threads if they are not running"""
+        with self._lock:
+            if self._workers:
+                return
+            self._stopping.clear()
+            for index in range(self.worker_count):
+                worker = threading.Thread(target=self._work, name=f"job-worker-{index}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def stop(self):
+        """Stop the workers after their current job"""
+        self._stopping.set()
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.join(timeout=WORKER_POLL_SECONDS * 2)
+        self.backend.close()
+
+    def _work(self):
+        while not self._stopping.is_set():
+            job_id = self.backend.get(timeout=WORKER_POLL_SECONDS)
+            job = self.get_job(job_id) if job_id else None
+            if job is not None:
+                self._run(job)
+
+    def _run(self, job: Job):
+        job.update(status=RUNNING)
+        token = _current_job.set(job)
+        try:
+            # Lets the caches tell a failed crawl from an empty one
+            with failure_tracking():
+                result = self._handlers[job.kind](job.params)
+            job.update(status=SUCCEEDED, result=result, finished_at=time.time())
+        except Exception as e:
+            print(f"Job {job.kind} ({job.job_id}) failed: {e}")
+            job.update(status=FAILED, error=str(e), finished_at=time.time())
+        finally:
+            _current_job.reset(token)
+
+    def _evict_expired(self):
+        """Drop finished jobs past retention (lock must be held)"""
+        now = time.time()
+        expired = [job_id for job_id, job in self._jobs.items() if job.done and now - job.finished_at > JOB_RETENTION_SECONDS]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+# Shared job service for the process
+job_queue = JobService()
@@ -0,0 +1,132 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+from .deadline_service import with_current_context
+
+# Constants
+MAP_CHUNK_SIZE = 20
+MIN_CHUNK_FILL = 0.5
+MAX_MAP_WORKERS = 4
+MAX_NOTES_PER_CHUNK = 6
+REDUCE_FAN_IN = 6
+MAX_REDUCE_INPUT_CHARS = 12000
+MAX_FALLBACK_LINES_PER_CHUNK = 5
+MAX_CHUNK_CACHE_ENTRIES = 2000
+MAP_PROMPT_VERSION = "1"
+
+
+class ChunkSummaryCache:
+    """Size-bounded LRU cache of chunk summaries keyed by content hash"""
+
+    def __init__(self, max_entries: int = MAX_CHUNK_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached summary, marking it as recently used"""
+        with self._lock:
+            summary = self._entries.get(key)
+            if summary is not None:
+                self._entries.move_to_end(key)
+            return summary
+
+    def put(self, key: str, summary: str):
+        """Store a summary, evicting the least recently used entries"""
+        with self._lock:
+            self._entries[key] = summary
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class MapReduceSummarizer:
+    """Condenses large datasets by summarizing chunks in parallel and reducing the notes"""
+
+    def __init__(self, model, chunk_size: int = MAP_CHUNK_SIZE, max_workers: int = MAX_MAP_WORKERS):
+        self.model = model
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+
+    def condense(self, label: str, items: List[Tuple[str, str]]) -> List[str]:
+        """Condense (group key, text) items into notes small enough for one reduce prompt"""
+        notes = self._map(label, build_chunks(items, self.chunk_size))
+
+        # Collapse the notes level by level until they fit the reduce budget
+        level = 1
+        while len(notes) > 1 and sum(len(note) for note in notes) > MAX_REDUCE_INPUT_CHARS:
+            grouped = [(str(index // REDUCE_FAN_IN), note) for index, note in enumerate(notes)]
+            notes = self._map(f"{label} notes (level {level})", build_chunks(grouped, REDUCE_FAN_IN))
+            level += 1
+
+        return notes
+
+    def _map(self, label: str, chunks: List[List[str]]) -> List[str]:
+        """Summarize each chunk, reusing cached summaries for unchanged chunks"""
+        keys = [chunk_key(label, chunk) for chunk in chunks]
+        notes = [chunk_summary_cache.get(key) for key in keys]
+        missing = [index for index, note in enumerate(notes) if note is None]
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(missing))) as pool:
+                summarize = with_current_context(lambda index: self._summarize_chunk(label, chunks[index]))
+                results = pool.map(summarize, missing)
+                for index, (note, succeeded) in zip(missing, results):
+                    notes[index] = note
+                    if succeeded:
+                        chunk_summary_cache.put(keys[index], note)
+
+        return notes
+
+    def _summarize_chunk(self, label: str, chunk: List[str]) -> Tuple[str, bool]:
+        """Summarize a single chunk; falls back to its first lines if the model fails"""
+        prompt = f"""
+You are condensing one part of a larger set of {label} so it can be summarized later.
+Rewrite the following {len(chunk)} {label} as at most {MAX_NOTES_PER_CHUNK} short bullet notes.
+Keep names, dates, counts, repository/team/channel names and anything urgent, unread or open.
+Use plain text only, one note per line, each starting with "- ".
+
+{chr(10).join(chunk)}
+"""
+        try:
+            response = self.model.generate_content(prompt)
+            return response.text.strip(), True
+        except Exception as e:
+            print(f"Error summarizing {label} chunk: {str(e)}")
+            return "\n".join(line.strip() for line in chunk[:MAX_FALLBACK_LINES_PER_CHUNK]), False
+
+
+def build_chunks(items: List[Tuple[str, str]], chunk_size: int) -> List[List[str]]:
+    """Pack consecutive items into chunks of up to chunk_size, closing a chunk early only at a key boundary once it is reasonably full"""
+    chunks: List[List[str]] = []
+    min_fill = max(1, int(chunk_size * MIN_CHUNK_FILL))
+    current_key = None
+    current: List[str] = []
+
+    for key, text in items:
+        if current and (len(current) >= chunk_size or (key != current_key and len(current) >= min_fill)):
+            chunks.append(current)
+            current = []
+        current_key = key
+        current.append(text)
+
+    if current:
+        chunks.append(current)
+
+    return chunks
+
+
+def chunk_key(label: str, chunk: List[str]) -> str:
+    """Content hash identifying a chunk summary"""
+    digest = hashlib.sha256()
+    digest.update(f"{MAP_PROMPT_VERSION}\0{label}\0".encode("utf-8"))
+    for line in chunk:
+        digest.update(line.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+# Shared chunk summary cache (in production, use a proper cache store)
+chunk_summary_cache = ChunkSummaryCache()
@@ -0,0 +1,556 @@
+import re
+import sys
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from .dedup_service import cluster_near_duplicates
+from .text_service import normalize_body
+
+# Constants
+# Plain-text body kept per record; the full body is fetched when it is needed
+MESSAGE_PREVIEW_CHARS = 1000
+MEETING_PREVIEW_CHARS = 1500
+THREAD_PREVIEW_CHARS = 400
+REPLY_PREFIX_PATTERN = re.compile(r"^(?:(?:re|fw|fwd|aw|wg|sv)\s*:\s*)+", re.IGNORECASE)
+# Where a reply's preview runs into the quoted message ("... From: Bob Sent: Monday ...")
+QUOTED_HEADER_PATTERN = re.compile(r"\s(?:From|De|Von):\s.{0,200}?\s(?:Sent|Date|Envoy\u00e9|Gesendet):\s", re.IGNORECASE)
+_ABSENT = object()
+
+
+def intern_str(value: Optional[str]) -> Optional[str]:
+    """One shared copy of strings that repeat across records (names, states, languages)"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _optional(attribute: str) -> Callable[[Any], Any]:
+    """View getter for a field that raw payloads only carried some of the time"""
+    return lambda record: _ABSENT if getattr(record, attribute) is None else getattr(record, attribute)
+
+
+class Record(Mapping):
+    """Compact, read-only item kept in caches in place of a raw Graph or GitHub dict.
+
+    Only the fields the services use are stored, in __slots__, with repeated
+    strings interned. Reads go through a view with the raw payload's keys and
+    nesting, so code written against the raw dicts (and JSON responses) is unchanged.
+    """
+
+    __slots__ = ()
+    # Raw payload key -> getter building that key's value from the slots; _ABSENT hides the key
+    _VIEW: Dict[str, Callable[[Any], Any]] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        getter = self._VIEW.get(key)
+        value = _ABSENT if getter is None else getter(self)
+        if value is _ABSENT:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        # Mapping.get goes through a raised KeyError for every absent key, which dominates hot loops over records
+        getter = self._VIEW.get(key)
+        value = _ABSENT if getter is None else getter(self)
+        return default if value is _ABSENT else value
+
+    def __iter__(self) -> Iterator[str]:
+        return (key for key, getter in self._VIEW.items() if getter(self) is not _ABSENT)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def __reduce__(self):
+        return type(self), tuple(getattr(self, slot) for slot in self.__slots__)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict with the raw payload's shape, for JSON"""
+        return {key: self[key] for key in self}
+
+
+class EmailRecord(Record):
+    """An Outlook message from the email list"""
+
+    __slots__ = ("id", "subject", "body_preview", "sender_name", "sender_address", "received", "is_read", "conversation_id")
+
+    def __init__(self, id, subject, body_preview, sender_name, sender_address, received, is_read, conversation_id=None):
+        self.id = id
+        self.subject = subject
+        self.body_preview = body_preview
+        self.sender_name = intern_str(sender_name)
+        self.sender_address = intern_str(sender_address)
+        self.received = received
+        self.is_read = is_read
+        self.conversation_id = conversation_id
+
+    @classmethod
+    def from_graph(cls, message: Dict, is_read: Optional[bool] = None) -> "EmailRecord":
+        sender = (message.get("from") or {}).get("emailAddress") or {}
+        return cls(
+            message["id"],
+            message.get("subject"),
+            message.get("bodyPreview"),
+            sender.get("name"),
+            sender.get("address"),
+            message.get("receivedDateTime"),
+            message.get("isRead", is_read),
+            message.get("conversationId")
+        )
+
+    _VIEW = {
+        "id": lambda r: r.id,
+        "subject": lambda r: r.subject,
+        "bodyPreview": lambda r: r.body_preview,
+        "from": lambda r: {"emailAddress": {"name": r.sender_name, "address": r.sender_address}},
+        "receivedDateTime": lambda r: r.received,
+        "isRead": _optional("is_read"),
+        "conversationId": _optional("conversation_id")
+    }
+
+
+class ThreadRecord(Record):
+    """An email conversation: every fetched message sharing a conversationId, collapsed into one item"""
+
+    __slots__ = (
+        "id", "subject", "participants", "message_count", "unread_count",
+        "latest_received", "latest_sender", "preview", "email_ids", "folded"
+    )
+
+    def __init__(self, id, subject, participants, message_count, unread_count, latest_received, latest_sender, preview, email_ids, folded=1):
+        self.id = id
+        self.subject = subject
+        self.participants = tuple(intern_str(participant) for participant in participants)
+        self.message_count = message_count
+        self.unread_count = unread_count
+        self.latest_received = latest_received
+        self.latest_sender = intern_str(latest_sender)
+        self.preview = preview
+        self.email_ids = tuple(email_ids)
+        self.folded = folded
+
+    @classmethod
+    def from_emails(cls, emails: List[Dict]) -> "ThreadRecord":
+        """Collapse one conversation's emails, given newest first"""
+        latest = emails[0]
+        senders = [email.get("from", {}).get("emailAddress", {}).get("name") or "Unknown" for email in emails]
+        return cls(
+            latest.get("conversationId") or latest["id"],
+            REPLY_PREFIX_PATTERN.sub("", latest.get("subject") or "").strip() or "No Subject",
+            dict.fromkeys(senders),
+            len(emails),
+            sum(1 for email in emails if not email.get("isRead", True)),
+            latest.get("receivedDateTime"),
+            senders[0],
+            _thread_preview(email.get("bodyPreview") for email in emails),
+            [email["id"] for email in emails]
+        )
+
+    @classmethod
+    def fold(cls, threads: List["ThreadRecord"]) -> "ThreadRecord":
+        """One item standing for near-identical conversations, shown as the first (newest) of them"""
+        representative = threads[0]
+        return cls(
+            representative.id,
+            representative.subject,
+            dict.fromkeys(participant for thread in threads for participant in thread.participants),
+            sum(thread.message_count for thread in threads),
+            sum(thread.unread_count for thread in threads),
+            representative.latest_received,
+            representative.latest_sender,
+            representative.preview,
+            [email_id for thread in threads for email_id in thread.email_ids],
+            sum(thread.folded for thread in threads)
+        )
+
+    _VIEW = {
+        "id": lambda r: r.id,
+        "subject": lambda r: r.subject,
+        "participants": lambda r: list(r.participants),
+        "messageCount": lambda r: r.message_count,
+        "unreadCount": lambda r: r.unread_count,
+        "latestReceivedDateTime": lambda r: r.latest_received,
+        "latestFrom": lambda r: r.latest_sender,
+        "preview": lambda r: r.preview,
+        "emailIds": lambda r: list(r.email_ids),
+        "foldedConversations": lambda r: r.folded if r.folded > 1 else _ABSENT
+    }
+
+
+def _thread_preview(previews: Iterable[Optional[str]]) -> str:
+    """Each message's own new text, newest first, skipping text an earlier message already showed"""
+    kept: List[str] = []
+    length = 0
+    for preview in previews:
+        text, _ = normalize_body(preview, "text")
+        text = QUOTED_HEADER_PATTERN.split(" ".join(text.split()), maxsplit=1)[0].strip()
+        if not text or any(text in seen for seen in kept):
+            continue
+        remaining = THREAD_PREVIEW_CHARS - length
+        if len(text) > remaining:
+            if remaining > 0:
+                kept.append(text[:remaining].rstrip() + "...")
+            break
+        kept.append(text)
+        length += len(text)
+    return " | ".join(kept)
+
+
+def group_threads(emails: List[Dict]) -> List[ThreadRecord]:
+    """Collapse emails into conversations, ordered by each conversation's newest message"""
+    conversations: Dict[str, List[Dict]] = {}
+    for email in sorted(emails, key=lambda email: email.get("receivedDateTime") or "", reverse=True):
+        conversations.setdefault(email.get("conversationId") or email["id"], []).append(email)
+    return [ThreadRecord.from_emails(conversation) for conversation in conversations.values()]
+
+
+def fold_near_duplicates(threads: List[ThreadRecord]) -> List[ThreadRecord]:
+    """Fold near-identical conversations (CI runs, notification mail, calendar updates) into one item each"""
+    texts = [f"{thread.latest_sender} {thread.subject} {thread.preview}" for thread in threads]
+    return [
+        threads[cluster[0]] if len(cluster) == 1 else ThreadRecord.fold([threads[index] for index in cluster])
+        for cluster in cluster_near_duplicates(texts)
+    ]
+
+
+def email_conversations(emails: List[Dict]) -> List[ThreadRecord]:
+    """Emails as prompts should see them: reply chains collapsed, then near-duplicate conversations folded"""
+    return fold_near_duplicates(group_threads(emails))
+
+
+class TeamRecord(Record):
+    """A joined team"""
+
+    __slots__ = ("id", "display_name", "description")
+
+    def __init__(self, id, display_name, description):
+        self.id = id
+        self.display_name = intern_str(display_name)
+        self.description = description
+
+    @classmethod
+    def from_graph(cls, team: Dict) -> "TeamRecord":
+        return cls(team["id"], team.get("displayName"), team.get("description"))
+
+    _VIEW = {
+        "id": lambda r: r.id,
+        "displayName": lambda r: r.display_name,
+        "description": lambda r: r.description
+    }
+
+
+class ChannelRecord(Record):
+    """A team channel, labelled with its team"""
+
+    __slots__ = ("id", "display_name", "description", "team_name", "team_id")
+
+    def __init__(self, id, display_name, description, team_name=None, team_id=None):
+        self.id = id
+        self.display_name = intern_str(display_name)
+        self.description = description
+        self.team_name = intern_str(team_name)
+        self.team_id = intern_str(team_id)
+
+    @classmethod
+    def from_graph(cls, channel: Dict, team: Optional[Dict] = None) -> "ChannelRecord":
+        return cls(
+            channel["id"],
+            channel.get("displayName"),
+            channel.get("description"),
+            team["displayName"] if team else None,
+            team["id"] if team else None
+        )
+
+    _VIEW = {
+        "id": lambda r: r.id,
+        "displayName": lambda r: r.display_name,
+        "description": lambda r: r.description,
+        "team_name": _optional("team_name"),
+        "team_id": _optional("team_id")
+    }
+
+
+class MessageRecord(Record):
+    """A Teams channel or chat message, labelled with where it was posted"""
+
+    __slots__ = (
+        "id", "created", "subject", "content", "truncated", "sender",
+        "chat_id", "team_id", "channel_id", "team_name", "channel_name", "chat_name"
+    )
+
+    def __init__(self, id, created, subject, content, truncated, sender,
+                 chat_id=None, team_id=None, channel_id=None, team_name=None, channel_name=None, chat_name=None):
+        self.id = id
+        self.created = created
+        self.subject = subject
+        self.content = content
+        self.truncated = truncated
+        self.sender = intern_str(sender)
+        self.chat_id = intern_str(chat_id)
+        self.team_id = intern_str(team_id)
+        self.channel_id = intern_str(channel_id)
+        self.team_name = intern_str(team_name)
+        self.channel_name = intern_str(channel_name)
+        self.chat_name = intern_str(chat_name)
+
+    @classmethod
+    def from_graph(
+        cls,
+        message: Dict,
+        team: Optional[Dict] = None,
+        channel: Optional[Dict] = None,
+        chat: Optional[Dict] = None
+    ) -> "MessageRecord":
+        body = message.get("body") or {}
+        user = (message.get("from") or {}).get("user") or {}
+        channel_identity = message.get("channelIdentity") or {}
+        content, truncated = normalize_body(body.get("content"), body.get("contentType"), MESSAGE_PREVIEW_CHARS)
+        return cls(
+            message["id"],
+            message.get("createdDateTime"),
+            message.get("subject"),
+            content,
+            truncated,
+            user.get("displayName"),
+            message.get("chatId") or (chat["id"] if chat else None),
+            channel_identity.get("teamId") or (team["id"] if team else None),
+            channel_identity.get("channelId") or (channel["id"] if channel else None),
+            team["displayName"] if team else None,
+            channel["displayName"] if channel else None,
+            (chat.get("topic") or "Personal Chat") if chat else None
+        )
+
+    _VIEW = {
+        "id": lambda r: r.id,
+        "createdDateTime": lambda r: r.created,
+        "subject": lambda r: r.subject,
+        # Bodies are normalized to plain text at ingest
+        "body": lambda r: {"contentType": "text", "content": r.content},
+        "bodyTruncated": lambda r: True if r.truncated else _ABSENT,
+        # System messages have no sender
+        "from": lambda r: {"user": {"displayName": r.sender}} if r.sender is not None else None,
+        "chatId": _optional("chat_id"),
+        "channelIdentity": lambda r: {"teamId": r.team_id, "channelId": r.channel_id} if r.channel_id is not None else _ABSENT,
+        "team_name": _optional("team_name"),
+        "channel_name": _optional("channel_name"),
+        "chat_name": _optional("chat_name"),
+        "is_personal_chat": lambda r: True if r.chat_name is not None else _ABSENT
+    }
+
+
+class MeetingRecord(Record):
+    """A calendar event that is an online meeting"""
+
+    __slots__ = ("id", "subject", "start", "end", "organizer", "attendees", "is_online_meeting", "join_url", "body", "truncated")
+
+    def __init__(self, id, subject, start, end, organizer, attendees, is_online_meeting, join_url, body, truncated=False):
+        self.id = id
+        self.subject = subject
+        self.start = start
+        self.end = end
+        self.organizer = intern_str(organizer)
+        self.attendees = tuple(intern_str(attendee) for attendee in attendees)
+        self.is_online_meeting = is_online_meeting
+        self.join_url = join_url
+        self.body = body
+        self.truncated = truncated
+
+    @classmethod
+    def from_graph(cls, event: Dict) -> "MeetingRecord":
+        body = event.get("body") or {}
+        return cls(
+            event.get("id"),
+            event.get("subject", "No Subject"),
+            event.get("start", {}).get("dateTime"),
+            event.get("end", {}).get("dateTime"),
+            event.get("organizer", {}).get("emailAddress", {}).get("name"),
+            [attendee.get("emailAddress", {}).get("name") for attendee in event.get("attendees", [])],
+            event.get("isOnlineMeeting", False),
+            (event.get("onlineMeeting") or {}).get("joinUrl"),
+            *normalize_body(body.get("content"), body.get("contentType", "html"), MEETING_PREVIEW_CHARS)
+        )
+
+    _VIEW = {
+        "id": lambda r: r.id,
+        "subject": lambda r: r.subject,
+        "start": lambda r: r.start,
+        "end": lambda r: r.end,
+        "organizer": lambda r: r.organizer,
+        "attendees": lambda r: list(r.attendees),
+        "isOnlineMeeting": lambda r: r.is_online_meeting,
+        "joinUrl": lambda r: r.join_url,
+        "body": lambda r: r.body,
+        "bodyTruncated": lambda r: True if r.truncated else _ABSENT
+    }
+
+
+class RepositoryRecord(Record):
+    """A GitHub repository from /user/repos"""
+
+    __slots__ = (
+        "id", "name", "full_name", "description", "language", "stargazers_count",
+        "forks_count", "open_issues_count", "private", "html_url", "default_branch", "updated_at"
+    )
+
+    def __init__(self, id, name, full_name, description, language, stargazers_count,
+                 forks_count, open_issues_count, private, html_url, default_branch, updated_at):
+        self.id = id
+        self.name = name
+        self.full_name = intern_str(full_name)
+        self.description = description
+        self.language = intern_str(language)
+        self.stargazers_count = stargazers_count
+        self.forks_count = forks_count
+        self.open_issues_count = open_issues_count
+        self.private = private
+        self.html_url = html_url
+        self.default_branch = intern_str(default_branch)
+        self.updated_at = updated_at
+
+    @classmethod
+    def from_github(cls, repository: Dict) -> "RepositoryRecord":
+        return cls(*(repository.get(field) for field in cls.__slots__))
+
+    _VIEW = {field: (lambda field: lambda r: getattr(r, field))(field) for field in __slots__}
+
+
+class CommitRecord(Record):
+    """A commit, labelled with its repository"""
+
+    __slots__ = ("sha", "html_url", "message", "author_name", "author_email", "date", "repository")
+
+    def __init__(self, sha, html_url, message, author_name, author_email, date, repository):
+        self.sha = sha
+        self.html_url = html_url
+        self.message = message
+        self.author_name = intern_str(author_name)
+        self.author_email = intern_str(author_email)
+        self.date = date
+        self.repository = intern_str(repository)
+
+    @classmethod
+    def from_github(cls, commit: Dict, repository: str) -> "CommitRecord":
+        details = commit.get("commit") or {}
+        author = details.get("author") or {}
+        return cls(
+            commit["sha"],
+            commit.get("html_url"),
+            details.get("message", ""),
+            author.get("name"),
+            author.get("email"),
+            author.get("date"),
+            repository
+        )
+
+    _VIEW = {
+        "sha": lambda r: r.sha,
+        "html_url": lambda r: r.html_url,
+        "commit": lambda r: {"message": r.message, "author": {"name": r.author_name, "email": r.author_email, "date": r.date}},
+        "repository": lambda r: r.repository
+    }
+
+
+class IssueRecord(Record):
+    """An issue or pull request, labelled with its repository"""
+
+    __slots__ = ("id", "number", "title", "state", "html_url", "user_login", "created_at", "updated_at", "closed_at", "repository")
+
+    def __init__(self, id, number, title, state, html_url, user_login, created_at, updated_at, closed_at, repository):
+        self.id = id
+        self.number = number
+        self.title = title
+        self.state = intern_str(state)
+        self.html_url = html_url
+        self.user_login = intern_str(user_login)
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.closed_at = closed_at
+        self.repository = intern_str(repository)
+
+    @classmethod
+    def from_github(cls, issue: Dict, repository: Optional[str] = None) -> "IssueRecord":
+        if repository is None:
+            # Issue listings embed the repository; search results only link to it
+            repository = (issue.get("repository") or {}).get("full_name") or _repository_from_url(issue.get("repository_url")) or "Unknown"
+        return cls(
+            issue.get("id"),
+            issue.get("number"),
+            issue.get("title"),
+            issue.get("state"),
+            issue.get("html_url"),
+            (issue.get("user") or {}).get("login"),
+            issue.get("created_at"),
+            issue.get("updated_at"),
+            issue.get("closed_at"),
+            repository
+        )
+
+    _VIEW = {
+        "id": lambda r: r.id,
+        "number": lambda r: r.number,
+        "title": lambda r: r.title,
+        "state": lambda r: r.state,
+        "html_url": lambda r: r.html_url,
+        "user": lambda r: {"login": r.user_login},
+        "created_at": lambda r: r.created_at,
+        "updated_at": lambda r: r.updated_at,
+        "closed_at": lambda r: r.closed_at,
+        "repository": lambda r: r.repository
+    }
+
+
+def _repository_from_url(url: Optional[str]) -> Optional[str]:
+    """owner/name from an API repository URL"""
+    if not url or "/repos/" not in url:
+        return None
+    return url.split("/repos/", 1)[1]
+
+
+def record_json(value: Any) -> Any:
+    """json.dumps default: records as their raw-shaped dicts, anything else as a string"""
+    if isinstance(value, Record):
+        return value.to_dict()
+    return str(value)
+
+
+def compact_snapshot(endpoint: str, data: Any) -> Any:
+    """Rebuild records in a snapshot that was read back from JSON (e.g. the local store)"""
+    if endpoint == "emails/all":
+        return [EmailRecord.from_graph(email) for email in data]
+    if endpoint == "github/all":
+        return {
+            **data,
+            "repositories": [RepositoryRecord.from_github(repository) for repository in data.get("repositories", [])],
+            "commits": [CommitRecord.from_github(commit, commit.get("repository")) for commit in data.get("commits", [])],
+            "issues": [IssueRecord.from_github(issue, issue.get("repository")) for issue in data.get("issues", [])],
+            "pull_requests": [IssueRecord.from_github(pr, pr.get("repository")) for pr in data.get("pull_requests", [])]
+        }
+    if endpoint == "teams/all":
+        return {
+            **data,
+            "teams": [TeamRecord.from_graph(team) for team in data.get("teams", [])],
+            "channels": [_restored_channel(channel) for channel in data.get("channels", [])],
+            "messages": [_restored_message(message) for message in data.get("messages", [])],
+            "meetings": [_restored_meeting(meeting) for meeting in data.get("meetings", [])]
+        }
+    return data
+
+
+def _restored_channel(channel: Dict) -> ChannelRecord:
+    return ChannelRecord(channel["id"], channel.get("displayName"), channel.get("description"), channel.get("team_name"), channel.get("team_id"))
+
+
+def _restored_message(message: Dict) -> MessageRecord:
+    record = MessageRecord.from_graph(message)
+    record.truncated = record.truncated or message.get("bodyTruncated", False)
+    record.team_name = intern_str(message.get("team_name"))
+    record.channel_name = intern_str(message.get("channel_name"))
+    record.chat_name = intern_str(message.get("chat_name"))
+    return record
+
+
+def _restored_meeting(meeting: Dict) -> MeetingRecord:
+    return MeetingRecord(
+        meeting.get("id"), meeting.get("subject"), meeting.get("start"), meeting.get("end"), meeting.get("organizer"),
+        meeting.get("attendees") or [], meeting.get("isOnlineMeeting", False), meeting.get("joinUrl"), meeting.get("body", ""),
+        meeting.get("bodyTruncated", False)
+    )
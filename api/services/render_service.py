@@ -0,0 +1,107 @@
+import json
+from typing import Dict, Optional
+from jinja2 import Environment, FileSystemLoader
+
+# Constants
+PARTIALS_DIR = "frontend/templates/partials"
+
+# Response schemas for Gemini structured output (OpenAPI subset)
+BULLET_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "label": {"type": "STRING", "description": "Short bold lead-in, e.g. a sender, repository or channel"},
+        "text": {"type": "STRING"},
+        "ref": {"type": "STRING", "description": "Source item this bullet refers to, e.g. an email subject or issue title"}
+    },
+    "required": ["text"]
+}
+
+SUMMARY_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "overview": {"type": "STRING", "description": "One or two sentence overview"},
+        "sections": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "heading": {"type": "STRING"},
+                    "bullets": {"type": "ARRAY", "items": BULLET_SCHEMA}
+                },
+                "required": ["heading", "bullets"]
+            }
+        },
+        "action_items": {"type": "ARRAY", "items": {"type": "STRING"}}
+    },
+    "required": ["overview", "sections"]
+}
+
+CHAT_ANSWER_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "paragraphs": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "bullets": {"type": "ARRAY", "items": BULLET_SCHEMA}
+    },
+    "required": ["paragraphs"]
+}
+
+CHAT_ANSWER_INSTRUCTIONS = """Respond only with JSON matching the response schema:
+- "paragraphs": one to three short plain-text paragraphs
+- "bullets": optional list items, each with "text", an optional bold "label" and an optional "ref" naming the source item
+Do not write HTML or Markdown."""
+
+
+def json_generation_config(schema: Dict) -> Dict:
+    """Generation config asking Gemini for JSON that matches a response schema"""
+    return {
+        "response_mime_type": "application/json",
+        "response_schema": schema
+    }
+
+
+def briefing_schema(sources) -> Dict:
+    """Response schema with one summary object per briefing source"""
+    return {
+        "type": "OBJECT",
+        "properties": {source: SUMMARY_SCHEMA for source in sources},
+        "required": list(sources)
+    }
+
+
+def parse_structured_response(text: str) -> Optional[Dict]:
+    """Parse a JSON model response, returning None if it is not a JSON object"""
+    try:
+        data = json.loads(text)
+    except (TypeError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+class RenderService:
+    """Renders structured model output to HTML with cached Jinja partials"""
+
+    def __init__(self, partials_dir: str = PARTIALS_DIR):
+        # The environment compiles each partial once and keeps it in its template cache
+        self.env = Environment(
+            loader=FileSystemLoader(partials_dir),
+            autoescape=True,
+            trim_blocks=True,
+            lstrip_blocks=True
+        )
+
+    def render_summary(self, title: str, summary: Dict) -> str:
+        """Render a structured summary as HTML"""
+        return self.env.get_template("summary.html").render(title=title, summary=summary).strip()
+
+    def render_chat_answer(self, answer: Dict) -> str:
+        """Render a structured chat answer as HTML"""
+        return self.env.get_template("chat_answer.html").render(answer=answer).strip()
+
+    def render_chat_response(self, response_text: str) -> str:
+        """Render a JSON chat answer, treating unparsable output as a single paragraph"""
+        answer = parse_structured_response(response_text) or {"paragraphs": [response_text]}
+        return self.render_chat_answer(answer)
+
+
+# Shared renderer (templates are compiled once per process)
+renderer = RenderService()
@@ -0,0 +1,308 @@
+import threading
+import time
+from array import array
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from .store_service import LocalStore, SNAPSHOT_RECORDS
+
+# Constants
+ROLLUP_DAYS = 28
+ROLLUP_HOURS = ROLLUP_DAYS * 24
+TOP_KEYS = 5
+PROMPT_DAILY_DAYS = 14
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+# 1970-01-01, day 0 of the hour buckets, was a Thursday
+EPOCH_WEEKDAY = 3
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+# Series holding every item of a source, next to the per-dimension ones
+TOTAL = ("total", "")
+SOURCE_NOUNS = {"email": "emails", "github": "commits, issues and pull requests", "teams": "messages"}
+DIMENSION_LABELS = {
+    "sender": "senders", "repo": "repositories", "author": "authors", "type": "activity types",
+    "team": "teams", "channel": "channels", "chat": "chats"
+}
+
+SeriesKey = Tuple[str, str]
+
+
+def _email_activity(email: Dict) -> Tuple[Optional[str], Dict[str, Optional[str]]]:
+    sender = email.get("from", {}).get("emailAddress", {})
+    return email.get("receivedDateTime"), {"sender": sender.get("name") or sender.get("address")}
+
+
+def _commit_activity(commit: Dict) -> Tuple[Optional[str], Dict[str, Optional[str]]]:
+    author = commit.get("commit", {}).get("author", {})
+    return author.get("date"), {"repo": commit.get("repository"), "author": author.get("name"), "type": "commits"}
+
+
+def _issue_activity(activity_type: str) -> Callable[[Dict], Tuple[Optional[str], Dict[str, Optional[str]]]]:
+    # Counted when opened: updated_at moves with every comment and label change
+    return lambda issue: (
+        issue.get("created_at"),
+        {"repo": issue.get("repository"), "author": (issue.get("user") or {}).get("login"), "type": activity_type}
+    )
+
+
+def _message_activity(message: Dict) -> Tuple[Optional[str], Dict[str, Optional[str]]]:
+    channel_name = message.get("channel_name")
+    return message.get("createdDateTime"), {
+        "sender": ((message.get("from") or {}).get("user") or {}).get("displayName"),
+        "team": message.get("team_name") or "Personal Chat",
+        "channel": f"{message.get('team_name', 'Unknown')} - {channel_name}" if channel_name else None,
+        "chat": message.get("chat_name")
+    }
+
+
+# Record kinds that count as activity: when each happened and the dimension keys it is counted under
+ACTIVITY_KINDS: Dict[str, Callable[[Dict], Tuple[Optional[str], Dict[str, Optional[str]]]]] = {
+    "email": _email_activity,
+    "commit": _commit_activity,
+    "issue": _issue_activity("issues"),
+    "pull_request": _issue_activity("pull requests"),
+    "message": _message_activity
+}
+
+
+def _hour(timestamp: Optional[str]) -> Optional[int]:
+    """Hours since the epoch of an ISO timestamp; Graph and GitHub send UTC, so naive ones are read as UTC"""
+    if not timestamp:
+        return None
+    # Before Python 3.11, fromisoformat rejects a "Z" suffix and fractions other than 3 or 6 digits,
+    # and Graph sends 7, so the fraction (never needed for an hour) is dropped before parsing
+    offset = timestamp[19:].lstrip(".0123456789")
+    try:
+        moment = datetime.fromisoformat(timestamp[:19] + ("+00:00" if offset == "Z" else offset))
+    except ValueError:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp() // 3600)
+
+
+def _utc_offset_hours() -> int:
+    """Whole-hour offset of the machine's local time; the app runs on the user's own machine"""
+    return round(time.localtime().tm_gmtoff / 3600)
+
+
+class _SourceRollup:
+    """Hourly counts over the last ROLLUP_DAYS for one source, overall and per dimension key.
+
+    Each series is an array with one counter per hour slot, used as a ring:
+    hours[slot] says which hour the slot currently counts, and a slot is
+    zeroed in every series when that hour falls out of the window.
+    """
+
+    def __init__(self):
+        self.hours = array("q", [-1]) * ROLLUP_HOURS
+        self.series: Dict[SeriesKey, array] = {}
+        self.totals: Dict[SeriesKey, int] = {}
+        # (kind, id) -> (hour, series keys) it was counted under, so re-observed items count once
+        self.seen: Dict[Tuple[str, str], Tuple[int, Tuple[SeriesKey, ...]]] = {}
+
+    def expire(self, now_hour: int):
+        """Zero the slots of hours that have left the window"""
+        cutoff = now_hour - ROLLUP_HOURS
+        expired = [slot for slot, hour in enumerate(self.hours) if 0 <= hour <= cutoff]
+        if not expired:
+            return
+        for key, series in self.series.items():
+            for slot in expired:
+                if series[slot]:
+                    self.totals[key] -= series[slot]
+                    series[slot] = 0
+        for slot in expired:
+            self.hours[slot] = -1
+        for key in [key for key, total in self.totals.items() if total <= 0 and key != TOTAL]:
+            del self.series[key], self.totals[key]
+        self.seen = {item: entry for item, entry in self.seen.items() if entry[0] > cutoff}
+
+    def add(self, item: Tuple[str, str], hour: int, keys: Tuple[SeriesKey, ...], now_hour: int) -> bool:
+        """Count an item once, moving it if its hour or keys changed; returns whether anything changed"""
+        previous = self.seen.get(item)
+        if previous == (hour, keys):
+            return False
+        if previous is not None:
+            self.remove(item)
+        if hour <= now_hour - ROLLUP_HOURS:
+            return previous is not None
+
+        slot = hour % ROLLUP_HOURS
+        self.hours[slot] = hour
+        for key in keys:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = array("I", [0]) * ROLLUP_HOURS
+                self.totals[key] = 0
+            series[slot] += 1
+            self.totals[key] += 1
+        self.seen[item] = (hour, keys)
+        return True
+
+    def remove(self, item: Tuple[str, str]):
+        """Uncount an item, e.g. one the source reported as deleted"""
+        previous = self.seen.pop(item, None)
+        if previous is None:
+            return
+        hour, keys = previous
+        slot = hour % ROLLUP_HOURS
+        if self.hours[slot] != hour:
+            return
+        for key in keys:
+            series = self.series.get(key)
+            if series is not None and series[slot]:
+                series[slot] -= 1
+                self.totals[key] -= 1
+
+    def summary(self, now_hour: int, days: int, top: int, offset: int) -> Dict[str, Any]:
+        """Totals, hour-of-day and weekday profiles, daily counts and the most active keys per dimension"""
+        first_hour = now_hour - days * 24 + 1
+        slots = [(slot, hour + offset) for slot, hour in enumerate(self.hours) if hour >= first_hour]
+        first_day = (first_hour + offset) // 24
+
+        by_hour = [0] * 24
+        by_weekday = [0] * 7
+        daily = [0] * ((now_hour + offset) // 24 - first_day + 1)
+        total = self.series.get(TOTAL)
+        for slot, local_hour in slots:
+            count = total[slot] if total is not None else 0
+            if count:
+                by_hour[local_hour % 24] += count
+                by_weekday[(local_hour // 24 + EPOCH_WEEKDAY) % 7] += count
+                daily[local_hour // 24 - first_day] += count
+
+        whole_window = days >= ROLLUP_DAYS
+        counts: Dict[str, List[Tuple[int, str]]] = {}
+        for key, series in self.series.items():
+            if key == TOTAL:
+                continue
+            # Running totals cover the whole window; shorter windows are summed from their slots
+            count = self.totals[key] if whole_window else sum(series[slot] for slot, _ in slots)
+            if count:
+                counts.setdefault(key[0], []).append((count, key[1]))
+
+        top_keys = {}
+        for dimension, entries in counts.items():
+            top_keys[dimension] = []
+            for count, name in sorted(entries, key=lambda entry: (-entry[0], entry[1]))[:top]:
+                series = self.series[(dimension, name)]
+                profile = [0] * 24
+                for slot, local_hour in slots:
+                    profile[local_hour % 24] += series[slot]
+                top_keys[dimension].append({"name": name, "count": count, "busiest_hour": profile.index(max(profile))})
+
+        total_count = sum(by_hour)
+        return {
+            "days": days,
+            "total": total_count,
+            "by_hour": by_hour,
+            "by_weekday": dict(zip(WEEKDAYS, by_weekday)),
+            "daily": [
+                {"date": date.fromordinal(EPOCH_ORDINAL + first_day + index).isoformat(), "count": count}
+                for index, count in enumerate(daily)
+            ],
+            "busiest_hour": by_hour.index(max(by_hour)) if total_count else None,
+            "busiest_weekday": WEEKDAYS[by_weekday.index(max(by_weekday))] if total_count else None,
+            "top": top_keys
+        }
+
+
+class ActivityRollups:
+    """Hourly activity counts per source, sender, repository and channel, kept up to date as snapshots change.
+
+    Observing a snapshot only touches items that are new or changed since the
+    last one, and items stay counted after they scroll out of the fetched
+    lists, so the rollups cover the whole window rather than the latest page.
+    """
+
+    def __init__(self):
+        self._sources: Dict[str, _SourceRollup] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, endpoint: str, data: Any) -> int:
+        """Count a snapshot's (emails/all, github/all, teams/all) new and changed items; returns how many there were"""
+        if endpoint not in SNAPSHOT_RECORDS:
+            return 0
+        source, split = SNAPSHOT_RECORDS[endpoint]
+        return self._apply(source, ((kind, record_id, record) for kind, record_id, _, record in split(data)))
+
+    def load(self, store: LocalStore) -> int:
+        """Count the records mirrored in the local store, so the rollups survive a restart"""
+        since = datetime.fromtimestamp(time.time() - ROLLUP_DAYS * 86400, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+        counted = 0
+        for source in dict.fromkeys(source for source, _ in SNAPSHOT_RECORDS.values()):
+            try:
+                counted += self._apply(source, store.scan_records(source, ACTIVITY_KINDS, since))
+            except Exception as e:
+                print(f"Warning: Could not load {source} activity from the local store: {e}")
+        return counted
+
+    def remove(self, source: str, kind: str, record_id: str):
+        """Uncount an item the source reported as deleted"""
+        with self._lock:
+            rollup = self._sources.get(source)
+            if rollup is not None:
+                rollup.remove((kind, record_id))
+
+    def clear(self, source: str):
+        """Forget a source's activity, e.g. on logout"""
+        with self._lock:
+            self._sources.pop(source, None)
+
+    def insights(self, source: str, days: int = ROLLUP_DAYS, top: int = TOP_KEYS) -> Dict[str, Any]:
+        """A source's activity over the last days (at most ROLLUP_DAYS), in the machine's local time"""
+        days = max(1, min(days, ROLLUP_DAYS))
+        now_hour = int(time.time() // 3600)
+        offset = _utc_offset_hours()
+        with self._lock:
+            rollup = self._sources.get(source) or _SourceRollup()
+            rollup.expire(now_hour)
+            summary = rollup.summary(now_hour, days, top, offset)
+        return {"source": source, "utc_offset_hours": offset, **summary}
+
+    def activity_table(self, source: str, days: int = ROLLUP_DAYS) -> str:
+        """Compact text tables of a source's activity pattern for prompts; empty when nothing was counted"""
+        insights = self.insights(source, days)
+        if not insights["total"]:
+            return ""
+
+        offset = insights["utc_offset_hours"]
+        lines = [
+            f"**Activity Pattern** (last {insights['days']} days, {insights['total']} {SOURCE_NOUNS.get(source, 'items')}, "
+            f"local time UTC{offset:+03d}:00):",
+            "By hour: " + " ".join(f"{hour:02d}h:{count}" for hour, count in enumerate(insights["by_hour"]) if count),
+            "By weekday: " + " ".join(f"{day}:{count}" for day, count in insights["by_weekday"].items()),
+            "By day: " + " ".join(f"{day['date'][5:]}:{day['count']}" for day in insights["daily"][-PROMPT_DAILY_DAYS:]),
+            f"Busiest: {insights['busiest_weekday']}, {insights['busiest_hour']:02d}:00-{(insights['busiest_hour'] + 1) % 24:02d}:00"
+        ]
+        for dimension, entries in insights["top"].items():
+            lines.append(f"Top {DIMENSION_LABELS.get(dimension, dimension)}: " + ", ".join(
+                f"{entry['name']} {entry['count']} (mostly {entry['busiest_hour']:02d}h)" for entry in entries
+            ))
+        return "\n".join(lines)
+
+    def _apply(self, source: str, records: Iterable[Tuple[str, str, Dict]]) -> int:
+        # Timestamps are parsed before taking the lock, so readers only wait for the counter updates
+        now_hour = int(time.time() // 3600)
+        items = []
+        for kind, record_id, record in records:
+            activity = ACTIVITY_KINDS.get(kind)
+            if activity is None:
+                continue
+            timestamp, dimensions = activity(record)
+            hour = _hour(timestamp)
+            if hour is None:
+                continue
+            keys = (TOTAL,) + tuple((dimension, name) for dimension, name in dimensions.items() if name)
+            # Clock skew can put an item slightly in the future
+            items.append(((kind, record_id), min(hour, now_hour), keys))
+
+        with self._lock:
+            rollup = self._sources.get(source)
+            if rollup is None:
+                rollup = self._sources[source] = _SourceRollup()
+            rollup.expire(now_hour)
+            return sum(1 for item, hour, keys in items if rollup.add(item, hour, keys, now_hour))
+
+
+# Shared activity rollups (in production, use a proper time-series store)
+activity_rollups = ActivityRollups()
@@ -0,0 +1,110 @@
+import threading
+from requests.adapters import HTTPAdapter
+from typing import Callable, Dict
+from .ai_service import AIService, create_gemini_model
+from .auth_service import AuthService
+from .chatbot_service import ChatbotService
+from .deadline_service import DeadlineSession
+from .email_service import EmailService
+from .github_auth_service import GitHubAuthService
+from .github_chatbot_service import GitHubChatbotService
+from .github_service import GitHubService
+from .teams_auth_service import TeamsAuthService
+from .teams_chatbot_service import TeamsChatbotService
+from .teams_service import TeamsService
+from .webhook_service import GraphSubscriptionManager
+
+# Constants
+HTTP_POOL_CONNECTIONS = 10
+HTTP_POOL_MAXSIZE = 20
+
+
+class ServiceContainer:
+    """Configured clients and services shared for the lifetime of the app"""
+
+    def __init__(self):
+        self._instances: Dict[str, object] = {}
+        # Reentrant, as factories build the services they depend on (e.g. self.model) under the lock
+        self._lock = threading.RLock()
+        self.http = self._create_http_session()
+
+    def _create_http_session(self) -> DeadlineSession:
+        """Create a pooled HTTP session for Graph, GitHub and OAuth calls, bounded by request deadlines"""
+        session = DeadlineSession()
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _get(self, name: str, factory: Callable[[], object]):
+        """Build a service on first use and reuse it afterwards"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                # Construction errors (e.g. missing env vars) propagate and are retried on the next call
+                instance = factory()
+                self._instances[name] = instance
+            return instance
+
+    @property
+    def model(self):
+        """Shared Gemini model, configured once"""
+        return self._get("model", create_gemini_model)
+
+    @property
+    def ai_service(self) -> AIService:
+        return self._get("ai_service", lambda: AIService(self.model))
+
+    @property
+    def chatbot_service(self) -> ChatbotService:
+        return self._get("chatbot_service", lambda: ChatbotService(self.model))
+
+    @property
+    def github_chatbot_service(self) -> GitHubChatbotService:
+        return self._get("github_chatbot_service", lambda: GitHubChatbotService(self.model))
+
+    @property
+    def teams_chatbot_service(self) -> TeamsChatbotService:
+        return self._get("teams_chatbot_service", lambda: TeamsChatbotService(self.model))
+
+    @property
+    def email_service(self) -> EmailService:
+        return self._get("email_service", lambda: EmailService(self.http))
+
+    @property
+    def github_service(self) -> GitHubService:
+        return self._get("github_service", lambda: GitHubService(self.http))
+
+    @property
+    def teams_service(self) -> TeamsService:
+        return self._get("teams_service", lambda: TeamsService(self.http))
+
+    @property
+    def auth_service(self) -> AuthService:
+        return self._get("auth_service", lambda: AuthService(self.http))
+
+    @property
+    def github_auth_service(self) -> GitHubAuthService:
+        return self._get("github_auth_service", lambda: GitHubAuthService(self.http))
+
+    @property
+    def teams_auth_service(self) -> TeamsAuthService:
+        return self._get("teams_auth_service", lambda: TeamsAuthService(self.http))
+
+    @property
+    def graph_subscriptions(self) -> GraphSubscriptionManager:
+        return self._get("graph_subscriptions", lambda: GraphSubscriptionManager(self.http))
+
+    def close(self):
+        """Release pooled connections and drop the built services"""
+        with self._lock:
+            self._instances.clear()
+        self.http.close()
+
+
+# Shared service container, opened and closed by the app lifespan
+container = ServiceContainer()
@@ -0,0 +1,96 @@
+import functools
+import threading
+from typing import Callable, Dict, Hashable
+from .suggestion_cache_service import compute_fingerprint
+from .deadline_service import current_deadline
+
+
+class _Call:
+    """One in-flight computation that identical callers wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.skipped = []
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls so they share one execution"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def do(self, name: str, key: Hashable, fn: Callable):
+        """Run fn, or wait for the identical call already in flight and share its outcome"""
+        with self._lock:
+            counters = self._counters.setdefault(name, {"calls": 0, "executions": 0, "coalesced": 0})
+            counters["calls"] += 1
+            call = self._calls.get((name, key))
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[(name, key)] = call
+                counters["executions"] += 1
+            else:
+                counters["coalesced"] += 1
+
+        if not leader:
+            call.done.wait()
+
+            # A result cut short by the leader's deadline is partial for every caller
+            deadline = current_deadline()
+            if deadline is not None:
+                for skipped in call.skipped:
+                    deadline.mark_skipped(skipped)
+
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            deadline = current_deadline()
+            if deadline is not None:
+                call.skipped = deadline.skipped
+
+            # Later callers start a fresh execution; only concurrent ones share this one
+            with self._lock:
+                del self._calls[(name, key)]
+            call.done.set()
+
+    def snapshot(self) -> Dict:
+        """Coalescing counters for health reporting"""
+        with self._lock:
+            totals = {"calls": 0, "executions": 0, "coalesced": 0}
+            for counters in self._counters.values():
+                for field in totals:
+                    totals[field] += counters[field]
+            return {
+                "in_flight": len(self._calls),
+                **totals,
+                "by_operation": {name: dict(counters) for name, counters in self._counters.items()}
+            }
+
+
+def coalesce(name: str):
+    """Decorator for service methods: concurrent calls with identical arguments share one execution"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            # Arguments (access tokens, fetched data) are keyed by hash, never stored
+            key = compute_fingerprint([args, kwargs])
+            return single_flight.do(name, key, lambda: method(self, *args, **kwargs))
+        return wrapper
+    return decorator
+
+
+# Shared single-flight group for the process
+single_flight = SingleFlight()
@@ -0,0 +1,533 @@
+import hashlib
+import html
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from dotenv import load_dotenv
+from .record_service import record_json
+from .text_service import normalize_body
+
+# Load environment variables
+load_dotenv()
+
+# Constants
+DEFAULT_STORE_PATH = "data/local_store.db"
+BUSY_TIMEOUT_MS = 5000
+RECORD_TTL_SECONDS = 30 * 24 * 3600
+SNAPSHOT_TTL_SECONDS = 7 * 24 * 3600
+SUMMARY_TTL_SECONDS = 7 * 24 * 3600
+COMPACT_INTERVAL_SECONDS = 3600
+DEFAULT_SEARCH_LIMIT = 25
+SNIPPET_TOKENS = 16
+HIGHLIGHT_OPEN = "<mark>"
+HIGHLIGHT_CLOSE = "</mark>"
+# Private-use markers FTS5 wraps matches in, swapped for the tags once the text is escaped
+MATCH_OPEN = "\ue000"
+MATCH_CLOSE = "\ue001"
+SEARCH_KINDS = ("email", "message")
+
+# Schema migrations, applied in order; PRAGMA user_version records how many have run.
+# Append new migrations here, never edit one that has shipped.
+MIGRATIONS = [
+    [
+        # Items mirrored from Graph and GitHub, one row per email, message, event, repository, commit, issue or PR
+        """CREATE TABLE records (
+            kind TEXT NOT NULL,
+            id TEXT NOT NULL,
+            source TEXT NOT NULL,
+            sort_key TEXT,
+            data TEXT NOT NULL,
+            fetched_at REAL NOT NULL,
+            PRIMARY KEY (kind, id)
+        )""",
+        "CREATE INDEX records_by_source ON records (source, kind, sort_key DESC)",
+        "CREATE INDEX records_by_fetched_at ON records (fetched_at)",
+        # Whole endpoint payloads (emails/all, github/all, teams/all) served as-is after a restart
+        """CREATE TABLE snapshots (
+            endpoint TEXT PRIMARY KEY,
+            data TEXT NOT NULL,
+            fetched_at REAL NOT NULL
+        )""",
+        # Newest item seen per source and when it was last synced
+        """CREATE TABLE sync_cursors (
+            source TEXT PRIMARY KEY,
+            cursor TEXT,
+            synced_at REAL NOT NULL
+        )""",
+        # Per-source AI summaries keyed by the fingerprint of the data they were generated from
+        """CREATE TABLE summaries (
+            source TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            text TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            PRIMARY KEY (source, fingerprint)
+        )"""
+    ],
+    [
+        # Searchable fields of emails and Teams messages, with the columns the search filters use
+        """CREATE TABLE search_items (
+            rowid INTEGER PRIMARY KEY,
+            kind TEXT NOT NULL,
+            record_id TEXT NOT NULL,
+            title TEXT,
+            body TEXT,
+            sender TEXT,
+            sent_at TEXT,
+            team TEXT,
+            channel TEXT,
+            chat TEXT,
+            is_read INTEGER,
+            UNIQUE (kind, record_id)
+        )""",
+        "CREATE INDEX search_items_by_sent_at ON search_items (kind, sent_at)",
+        # Full-text index over search_items; the triggers keep the two in step
+        """CREATE VIRTUAL TABLE search_fts USING fts5(
+            title, body, sender,
+            content='search_items', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2'
+        )""",
+        """CREATE TRIGGER search_items_ai AFTER INSERT ON search_items BEGIN
+            INSERT INTO search_fts (rowid, title, body, sender) VALUES (new.rowid, new.title, new.body, new.sender);
+        END""",
+        """CREATE TRIGGER search_items_ad AFTER DELETE ON search_items BEGIN
+            INSERT INTO search_fts (search_fts, rowid, title, body, sender) VALUES ('delete', old.rowid, old.title, old.body, old.sender);
+        END""",
+        """CREATE TRIGGER search_items_au AFTER UPDATE ON search_items BEGIN
+            INSERT INTO search_fts (search_fts, rowid, title, body, sender) VALUES ('delete', old.rowid, old.title, old.body, old.sender);
+            INSERT INTO search_fts (rowid, title, body, sender) VALUES (new.rowid, new.title, new.body, new.sender);
+        END""",
+        # Records leave the index when they are deleted or compacted away
+        """CREATE TRIGGER records_ad AFTER DELETE ON records BEGIN
+            DELETE FROM search_items WHERE kind = old.kind AND record_id = old.id;
+        END""",
+        lambda connection: _index_records(connection, connection.execute(
+            "SELECT kind, id, data FROM records WHERE kind IN (?, ?)", SEARCH_KINDS
+        ).fetchall())
+    ],
+    [
+        # The account each source's mirrored data belongs to, as a fingerprint; snapshots carry theirs
+        """CREATE TABLE accounts (
+            source TEXT PRIMARY KEY,
+            account TEXT NOT NULL,
+            claimed_at REAL NOT NULL
+        )""",
+        "ALTER TABLE snapshots ADD COLUMN account TEXT",
+        # Data stored before accounts were tracked has no known owner
+        "DELETE FROM snapshots"
+    ]
+]
+
+
+def _email_records(emails: List[Dict]) -> Iterable[Tuple[str, str, Optional[str], Dict]]:
+    for email in emails:
+        yield "email", email["id"], email.get("receivedDateTime"), email
+
+
+def _github_records(github_data: Dict) -> Iterable[Tuple[str, str, Optional[str], Dict]]:
+    for repository in github_data.get("repositories", []):
+        yield "repository", repository["full_name"], repository.get("updated_at"), repository
+    for commit in github_data.get("commits", []):
+        yield "commit", commit["sha"], commit.get("commit", {}).get("author", {}).get("date"), commit
+    for issue in github_data.get("issues", []):
+        yield "issue", str(issue.get("html_url") or issue["id"]), issue.get("updated_at"), issue
+    for pull_request in github_data.get("pull_requests", []):
+        yield "pull_request", str(pull_request.get("html_url") or pull_request["id"]), pull_request.get("updated_at"), pull_request
+
+
+def _teams_records(teams_data: Dict) -> Iterable[Tuple[str, str, Optional[str], Dict]]:
+    for message in teams_data.get("messages", []):
+        # Message ids are only unique within their chat or channel
+        container_id = message.get("chatId") or (message.get("channelIdentity") or {}).get("channelId", "")
+        yield "message", f"{container_id}/{message['id']}", message.get("createdDateTime"), message
+    for meeting in teams_data.get("meetings", []):
+        yield "event", meeting["id"], meeting.get("start"), meeting
+
+
+def _search_document(kind: str, record_id: str, record: Dict) -> Optional[Tuple]:
+    """search_items row for a record, or None for kinds that are not searchable"""
+    if kind == "email":
+        sender = record.get("from", {}).get("emailAddress", {})
+        return (
+            kind, record_id, record.get("subject"), record.get("bodyPreview"),
+            " ".join(filter(None, [sender.get("name"), sender.get("address")])),
+            record.get("receivedDateTime"), None, None, None, int(record.get("isRead", True))
+        )
+    if kind == "message":
+        body = record.get("body") or {}
+        return (
+            kind, record_id, record.get("subject"), normalize_body(body.get("content"), body.get("contentType"))[0],
+            ((record.get("from") or {}).get("user") or {}).get("displayName"),
+            record.get("createdDateTime"), record.get("team_name"), record.get("channel_name"), record.get("chat_name"), None
+        )
+    return None
+
+
+def _index_records(connection: sqlite3.Connection, records: Iterable[Tuple[str, str, str]]):
+    """Upsert the search rows for (kind, id, JSON data) records, skipping rows whose text is unchanged"""
+    documents = [
+        document for kind, record_id, data in records
+        if (document := _search_document(kind, record_id, json.loads(data))) is not None
+    ]
+    # An upsert rather than INSERT OR REPLACE, whose implicit delete would bypass the index triggers
+    connection.executemany(
+        """INSERT INTO search_items (kind, record_id, title, body, sender, sent_at, team, channel, chat, is_read)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (kind, record_id) DO UPDATE SET
+            title = excluded.title, body = excluded.body, sender = excluded.sender, sent_at = excluded.sent_at,
+            team = excluded.team, channel = excluded.channel, chat = excluded.chat, is_read = excluded.is_read
+        WHERE (title, body, sender, sent_at, team, channel, chat, is_read)
+            IS NOT (excluded.title, excluded.body, excluded.sender, excluded.sent_at,
+                    excluded.team, excluded.channel, excluded.chat, excluded.is_read)""",
+        documents
+    )
+
+
+def _fts_query(text: str) -> str:
+    """Quote each term so user input is never parsed as FTS5 syntax; a trailing * keeps prefix matching"""
+    terms = []
+    for term in text.split():
+        prefix = term.endswith("*") and len(term) > 1
+        quoted = '"' + term.rstrip("*").replace('"', '""') + '"'
+        terms.append(quoted + "*" if prefix else quoted)
+    return " ".join(terms)
+
+
+def _highlighted(text: Optional[str]) -> Optional[str]:
+    """HTML-escape indexed text and mark up the matched terms, so results are safe to insert as HTML"""
+    if text is None:
+        return None
+    return html.escape(text).replace(MATCH_OPEN, HIGHLIGHT_OPEN).replace(MATCH_CLOSE, HIGHLIGHT_CLOSE)
+
+
+def _account_fingerprint(source: str, account_id: str) -> str:
+    """Stored in place of the account id itself"""
+    return hashlib.sha256(f"{source}\0{account_id}".encode("utf-8")).hexdigest()
+
+
+# Persisted snapshot endpoints: the source they belong to and how they split into records
+SNAPSHOT_RECORDS: Dict[str, Tuple[str, Callable[[Any], Iterable[Tuple[str, str, Optional[str], Dict]]]]] = {
+    "emails/all": ("email", _email_records),
+    "github/all": ("github", _github_records),
+    "teams/all": ("teams", _teams_records)
+}
+
+
+class LocalStore:
+    """SQLite (WAL) mirror of fetched records, snapshots, sync cursors and summaries for warm restarts"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("LOCAL_STORE_PATH", DEFAULT_STORE_PATH)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._migrated = False
+        self._stopping = threading.Event()
+        self._compactor: Optional[threading.Thread] = None
+        # Signed-in sessions (hashed tokens) and the (source, account fingerprint) they read and write as
+        self._sessions: Dict[str, Tuple[str, str]] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        """This thread's connection; WAL lets readers on other threads and processes run alongside a writer"""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            return connection
+
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None, check_same_thread=False)
+        # Only takes effect on a new database, so it must come first; lets compaction hand freed pages back
+        connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        with self._lock:
+            if not self._migrated:
+                self._migrate(connection)
+                self._migrated = True
+            self._connections.append(connection)
+        self._local.connection = connection
+        return connection
+
+    def _migrate(self, connection: sqlite3.Connection):
+        """Bring the schema up to date; the write lock keeps a reloading worker from migrating twice"""
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            for number, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+                for statement in statements:
+                    if callable(statement):
+                        statement(connection)
+                    else:
+                        connection.execute(statement)
+                connection.execute(f"PRAGMA user_version={number}")
+                print(f"Local store migrated to schema version {number}")
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _write(self, statements: Callable[[sqlite3.Connection], None]):
+        """Run writes in one transaction"""
+        connection = self._connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            statements(connection)
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+    def claim_account(self, source: str, account_id: Optional[str], session: str) -> bool:
+        """Bind a signed-in session to its account, clearing the source first if it held another account's data.
+        An unidentified account (account_id None) is never assumed to be the previous one. Returns whether it was cleared."""
+        account = _account_fingerprint(source, account_id) if account_id else secrets.token_hex(16)
+        row = self._connect().execute("SELECT account FROM accounts WHERE source = ?", (source,)).fetchone()
+        switched = row is None or row[0] != account
+        if switched:
+            self.clear(source)
+        self._write(lambda connection: connection.execute(
+            "INSERT OR REPLACE INTO accounts (source, account, claimed_at) VALUES (?, ?, ?)", (source, account, time.time())
+        ))
+        with self._lock:
+            self._sessions[session] = (source, account)
+        return switched
+
+    def _session_account(self, source: str, session: Optional[str]) -> Optional[str]:
+        with self._lock:
+            owner = self._sessions.get(session)
+        return owner[1] if owner is not None and owner[0] == source else None
+
+    def save_snapshot(self, endpoint: str, data: Any, fetched_at: Optional[float] = None, session: Optional[str] = None) -> bool:
+        """Store an endpoint payload, mirror its items as records and advance the source's sync cursor.
+        With a session, nothing is written (and False returned) unless it is still signed in, so a late
+        refresh for a signed-out token is dropped."""
+        fetched_at = fetched_at or time.time()
+        source, split = SNAPSHOT_RECORDS[endpoint]
+        account = self._session_account(source, session)
+        if session is not None and account is None:
+            return False
+        records = [
+            (kind, record_id, source, sort_key, json.dumps(record, default=record_json), fetched_at)
+            for kind, record_id, sort_key, record in split(data)
+        ]
+        cursor = max((record[3] for record in records if record[3]), default=None)
+
+        def statements(connection: sqlite3.Connection):
+            connection.execute(
+                "INSERT OR REPLACE INTO snapshots (endpoint, data, fetched_at, account) VALUES (?, ?, ?, ?)",
+                (endpoint, json.dumps(data, default=record_json), fetched_at, account)
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO records (kind, id, source, sort_key, data, fetched_at) VALUES (?, ?, ?, ?, ?, ?)",
+                records
+            )
+            connection.execute(
+                "INSERT OR REPLACE INTO sync_cursors (source, cursor, synced_at) VALUES (?, ?, ?)",
+                (source, cursor, fetched_at)
+            )
+            _index_records(connection, [(record[0], record[1], record[4]) for record in records if record[0] in SEARCH_KINDS])
+
+        self._write(statements)
+        return True
+
+    def get_snapshot(self, endpoint: str, session: Optional[str] = None) -> Optional[Tuple[Any, float]]:
+        """Return (payload, fetched_at) for an endpoint if one is stored and within its TTL; with a session,
+        only if it belongs to that session's account"""
+        if session is None:
+            row = self._connect().execute(
+                "SELECT data, fetched_at FROM snapshots WHERE endpoint = ? AND fetched_at > ?",
+                (endpoint, time.time() - SNAPSHOT_TTL_SECONDS)
+            ).fetchone()
+        else:
+            account = self._session_account(SNAPSHOT_RECORDS[endpoint][0], session)
+            if account is None:
+                return None
+            row = self._connect().execute(
+                "SELECT data, fetched_at FROM snapshots WHERE endpoint = ? AND account = ? AND fetched_at > ?",
+                (endpoint, account, time.time() - SNAPSHOT_TTL_SECONDS)
+            ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def delete_snapshots(self, endpoint_prefix: str):
+        """Drop stored payloads for endpoints starting with a prefix; their records stay until they expire"""
+        self._write(lambda connection: connection.execute(
+            "DELETE FROM snapshots WHERE substr(endpoint, 1, ?) = ?", (len(endpoint_prefix), endpoint_prefix)
+        ))
+
+    def delete_record(self, kind: str, record_id: str):
+        """Drop a record the source reported as deleted"""
+        self._write(lambda connection: connection.execute("DELETE FROM records WHERE kind = ? AND id = ?", (kind, record_id)))
+
+    def get_records(self, source: str, kind: str, limit: int = 100) -> List[Dict]:
+        """Newest records of a kind for a source"""
+        rows = self._connect().execute(
+            "SELECT data FROM records WHERE source = ? AND kind = ? ORDER BY sort_key DESC LIMIT ?",
+            (source, kind, limit)
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def scan_records(self, source: str, kinds: Iterable[str], since: Optional[str] = None) -> List[Tuple[str, str, Dict]]:
+        """(kind, id, record) for every record of the given kinds for a source, optionally only those sorted at or after since"""
+        kinds = list(kinds)
+        sql = f"SELECT kind, id, data FROM records WHERE source = ? AND kind IN ({', '.join('?' * len(kinds))})"
+        params: List[Any] = [source] + kinds
+        if since:
+            sql += " AND sort_key >= ?"
+            params.append(since)
+        return [(kind, record_id, json.loads(data)) for kind, record_id, data in self._connect().execute(sql, params).fetchall()]
+
+    def get_cursor(self, source: str) -> Optional[Tuple[Optional[str], float]]:
+        """Return (newest item timestamp, last sync time) for a source"""
+        row = self._connect().execute("SELECT cursor, synced_at FROM sync_cursors WHERE source = ?", (source,)).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        kinds: Iterable[str] = SEARCH_KINDS,
+        sender: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        team: Optional[str] = None,
+        channel: Optional[str] = None,
+        unread: Optional[bool] = None,
+        limit: int = DEFAULT_SEARCH_LIMIT
+    ) -> List[Dict]:
+        """Full-text search over mirrored emails and Teams messages, newest first without a query and best match first with one"""
+        kinds = [kind for kind in kinds if kind in SEARCH_KINDS]
+        if not kinds:
+            return []
+
+        conditions = [f"i.kind IN ({', '.join('?' * len(kinds))})"]
+        params: List[Any] = list(kinds)
+        if sender:
+            conditions.append("i.sender LIKE ?")
+            params.append(f"%{sender}%")
+        if since:
+            conditions.append("i.sent_at >= ?")
+            params.append(since)
+        if until:
+            # Inclusive, so a bare date takes in the whole day
+            conditions.append("substr(i.sent_at, 1, ?) <= ?")
+            params.extend([len(until), until])
+        if team:
+            conditions.append("i.team = ? COLLATE NOCASE")
+            params.append(team)
+        if channel:
+            conditions.append("i.channel = ? COLLATE NOCASE")
+            params.append(channel)
+        if unread is not None:
+            conditions.append("i.is_read = ?")
+            params.append(0 if unread else 1)
+
+        if query and query.strip():
+            sql = f"""SELECT i.kind, i.record_id, i.sent_at,
+                    highlight(search_fts, 0, '{MATCH_OPEN}', '{MATCH_CLOSE}'),
+                    snippet(search_fts, 1, '{MATCH_OPEN}', '{MATCH_CLOSE}', '…', {SNIPPET_TOKENS}),
+                    i.sender, i.team, i.channel, i.chat, i.is_read
+                FROM search_fts JOIN search_items i ON i.rowid = search_fts.rowid
+                WHERE search_fts MATCH ? AND {' AND '.join(conditions)}
+                ORDER BY bm25(search_fts, 5.0, 1.0, 2.0) LIMIT ?"""
+            params = [_fts_query(query)] + params
+        else:
+            sql = f"""SELECT i.kind, i.record_id, i.sent_at, i.title, substr(i.body, 1, 200),
+                    i.sender, i.team, i.channel, i.chat, i.is_read
+                FROM search_items i
+                WHERE {' AND '.join(conditions)}
+                ORDER BY i.sent_at DESC LIMIT ?"""
+        params.append(limit)
+
+        return [
+            {
+                # Message records are keyed "<chat or channel id>/<message id>"
+                "kind": kind, "id": record_id.split("/", 1)[-1] if kind == "message" else record_id, "sent_at": sent_at,
+                "title": _highlighted(title), "snippet": _highlighted(snippet),
+                "sender": sender_name, "team": team_name, "channel": channel_name, "chat": chat_name,
+                "is_read": None if is_read is None else bool(is_read)
+            }
+            for kind, record_id, sent_at, title, snippet, sender_name, team_name, channel_name, chat_name, is_read
+            in self._connect().execute(sql, params).fetchall()
+        ]
+
+    def put_summary(self, source: str, fingerprint: str, text: str):
+        """Store a per-source summary"""
+        self._write(lambda connection: connection.execute(
+            "INSERT OR REPLACE INTO summaries (source, fingerprint, text, created_at) VALUES (?, ?, ?, ?)",
+            (source, fingerprint, text, time.time())
+        ))
+
+    def get_summary(self, source: str, fingerprint: str) -> Optional[str]:
+        """Get a stored summary generated from a given data fingerprint"""
+        row = self._connect().execute(
+            "SELECT text FROM summaries WHERE source = ? AND fingerprint = ?", (source, fingerprint)
+        ).fetchone()
+        return row[0] if row else None
+
+    def clear(self, source: str):
+        """Forget everything mirrored for a source, e.g. on logout, and stop accepting its sessions' writes"""
+        endpoints = [endpoint for endpoint, (owner, _) in SNAPSHOT_RECORDS.items() if owner == source]
+        with self._lock:
+            for session in [session for session, (owner, _) in self._sessions.items() if owner == source]:
+                del self._sessions[session]
+
+        def statements(connection: sqlite3.Connection):
+            connection.executemany("DELETE FROM snapshots WHERE endpoint = ?", [(endpoint,) for endpoint in endpoints])
+            for table in ("records", "sync_cursors", "summaries", "accounts"):
+                connection.execute(f"DELETE FROM {table} WHERE source = ?", (source,))
+
+        self._write(statements)
+
+    def compact(self) -> Dict[str, int]:
+        """Delete rows past their TTL, then checkpoint the WAL and release freed pages"""
+        now = time.time()
+        removed = {}
+
+        def statements(connection: sqlite3.Connection):
+            removed["records"] = connection.execute("DELETE FROM records WHERE fetched_at < ?", (now - RECORD_TTL_SECONDS,)).rowcount
+            removed["snapshots"] = connection.execute("DELETE FROM snapshots WHERE fetched_at < ?", (now - SNAPSHOT_TTL_SECONDS,)).rowcount
+            removed["summaries"] = connection.execute("DELETE FROM summaries WHERE created_at < ?", (now - SUMMARY_TTL_SECONDS,)).rowcount
+
+        self._write(statements)
+        connection = self._connect()
+        connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        connection.execute("PRAGMA incremental_vacuum")
+        return removed
+
+    def start(self):
+        """Compact once now and then periodically in the background"""
+        with self._lock:
+            if self._compactor is not None:
+                return
+            self._stopping.clear()
+            self._compactor = threading.Thread(target=self._compact_forever, name="local-store-compactor", daemon=True)
+            self._compactor.start()
+
+    def stop(self):
+        """Stop compacting and close every connection"""
+        self._stopping.set()
+        with self._lock:
+            compactor, self._compactor = self._compactor, None
+            connections, self._connections = self._connections, []
+        if compactor is not None:
+            compactor.join(timeout=5)
+        for connection in connections:
+            connection.close()
+        # Threads that still hold a closed connection reconnect on their next call
+        self._local = threading.local()
+
+    def _compact_forever(self):
+        while not self._stopping.is_set():
+            try:
+                removed = self.compact()
+                if any(removed.values()):
+                    print(f"Local store compacted: {removed}")
+            except sqlite3.Error as e:
+                print(f"Warning: Local store compaction failed: {e}")
+            self._stopping.wait(COMPACT_INTERVAL_SECONDS)
+
+
+# Shared on-disk store (in production, use a proper database server for multi-user deployments)
+local_store = LocalStore()
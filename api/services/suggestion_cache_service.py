@@ -0,0 +1,101 @@
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from .record_service import record_json
+
+
+def compute_fingerprint(data: Any) -> str:
+    """Compute a stable fingerprint of a data snapshot"""
+    payload = json.dumps(data, sort_keys=True, default=record_json)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SuggestionCacheService:
+    """Cache of precomputed answers to the suggested chatbot questions, keyed by data fingerprint"""
+
+    def __init__(self):
+        self._entries: Dict[str, Dict] = {}
+        self._running: Set[Tuple[str, str]] = set()
+        self._lock = threading.Lock()
+
+    def observe(self, source: str, data: Any) -> bool:
+        """Record the latest snapshot for a source; returns True if its fingerprint changed"""
+        fingerprint = compute_fingerprint(data)
+
+        with self._lock:
+            entry = self._entries.get(source)
+            if entry is not None and entry["fingerprint"] == fingerprint:
+                return False
+
+            # New data invalidates every answer computed against the old snapshot
+            self._entries[source] = {
+                "fingerprint": fingerprint,
+                "data": data,
+                "answers": {},
+                "updated_at": time.time()
+            }
+            return True
+
+    def get_answer(self, source: str, question: str) -> Optional[Tuple[str, Any]]:
+        """Get a cached answer and the snapshot it was computed against"""
+        with self._lock:
+            entry = self._entries.get(source)
+            if entry is None or question not in entry["answers"]:
+                return None
+            return entry["answers"][question], entry["data"]
+
+    def invalidate(self, source: str):
+        """Drop the snapshot and answers for a source"""
+        with self._lock:
+            self._entries.pop(source, None)
+
+    def precompute(
+        self,
+        source: str,
+        data: Any,
+        questions: List[str],
+        answer_fn: Callable[[str, Any], str]
+    ) -> int:
+        """Generate and cache answers for the questions; returns how many were generated"""
+        self.observe(source, data)
+
+        with self._lock:
+            fingerprint = self._entries[source]["fingerprint"]
+            run_key = (source, fingerprint)
+            if run_key in self._running:
+                return 0
+            self._running.add(run_key)
+
+        generated = 0
+        try:
+            for question in questions:
+                with self._lock:
+                    entry = self._entries.get(source)
+                    if entry is None or entry["fingerprint"] != fingerprint:
+                        # Snapshot changed mid-run; a newer job owns this source now
+                        return generated
+                    if question in entry["answers"]:
+                        continue
+
+                try:
+                    answer = answer_fn(question, data)
+                except Exception as e:
+                    print(f"Warning: Could not precompute answer for '{question}': {e}")
+                    continue
+
+                with self._lock:
+                    entry = self._entries.get(source)
+                    if entry is not None and entry["fingerprint"] == fingerprint:
+                        entry["answers"][question] = answer
+                        generated += 1
+        finally:
+            with self._lock:
+                self._running.discard(run_key)
+
+        return generated
+
+
+# Shared answer cache (in production, use a proper database)
+suggestion_cache = SuggestionCacheService()
@@ -0,0 +1,198 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Iterable, Optional, Tuple
+from .deadline_service import failure_tracking, is_partial
+from .record_service import compact_snapshot
+from .rollup_service import ActivityRollups, activity_rollups
+from .single_flight_service import single_flight
+from .store_service import LocalStore, SNAPSHOT_RECORDS, local_store
+from .suggestion_cache_service import compute_fingerprint
+
+# Constants
+FRESH_SECONDS = 30
+MAX_AGE_SECONDS = 900
+MAX_SWR_ENTRIES = 256
+MAX_REFRESH_WORKERS = 4
+
+
+class SWRCache:
+    """Stale-while-revalidate cache for list endpoints"""
+
+    def __init__(
+        self,
+        fresh_seconds: float = FRESH_SECONDS,
+        max_age_seconds: float = MAX_AGE_SECONDS,
+        max_entries: int = MAX_SWR_ENTRIES,
+        store: Optional[LocalStore] = None,
+        persisted: Iterable[str] = (),
+        rollups: Optional[ActivityRollups] = None
+    ):
+        self.fresh_seconds = fresh_seconds
+        self.max_age_seconds = max_age_seconds
+        self.max_entries = max_entries
+        self.store = store
+        self.persisted = frozenset(persisted) if store is not None else frozenset()
+        self.rollups = rollups
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._refresh_pool = ThreadPoolExecutor(max_workers=MAX_REFRESH_WORKERS, thread_name_prefix="swr-refresh")
+        # One writer keeps disk writes in the order the values were cached, and off the request path
+        self._persist_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="swr-persist")
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Tuple[Any, int]:
+        """Return (value, age in seconds), serving stale copies while a background refresh runs"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is not None:
+            value, fetched_at = entry
+            age = time.time() - fetched_at
+            if age < self.max_age_seconds:
+                if age >= self.fresh_seconds:
+                    self._schedule_refresh(key, loader)
+                return value, int(age)
+        else:
+            # After a restart, serve a copy on disk that is not past the max age and refresh it in the background
+            restored = self._restore(key)
+            if restored is not None:
+                if restored[1] >= self.fresh_seconds:
+                    self._schedule_refresh(key, loader)
+                return restored
+
+        # No usable copy: block, sharing the load with identical concurrent requests
+        value = single_flight.do("swr.load", key, loader)
+        self.put(key, value)
+        return value, 0
+
+    def peek(self, key: Hashable) -> Optional[Tuple[Any, int]]:
+        """Return (value, age) if a usable copy is cached, without ever loading"""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return self._restore(key)
+
+        value, fetched_at = entry
+        age = time.time() - fetched_at
+        return (value, int(age)) if age < self.max_age_seconds else None
+
+    def patch(self, endpoint: str, update: Callable[[Any], Any]):
+        """Replace every entry for an endpoint with update(value), keeping its age; update must not mutate value"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == endpoint]:
+                value, fetched_at = self._entries[key]
+                self._entries[key] = (update(value), fetched_at)
+                self._persist(key, self._entries[key][0], fetched_at)
+
+    def invalidate(self, endpoint_prefix: str):
+        """Drop every entry for endpoints starting with a prefix"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0].startswith(endpoint_prefix)]:
+                del self._entries[key]
+        if any(endpoint.startswith(endpoint_prefix) for endpoint in self.persisted):
+            self._persist_pool.submit(self.store.delete_snapshots, endpoint_prefix)
+
+    def put(self, key: Hashable, value: Any):
+        """Store a freshly loaded value, e.g. from a background prefetch; partial values are never stored"""
+        # A throttled or failed upstream call comes back as an empty list, which must not replace a good copy
+        if is_partial():
+            return
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._persist(key, value, self._entries[key][1])
+
+    def _persist(self, key: Hashable, value: Any, fetched_at: float):
+        """Write a persisted endpoint's value through to disk; called with the lock held to keep write order"""
+        if key[0] in self.persisted:
+            self._persist_pool.submit(self._save, key, value, fetched_at)
+
+    def _save(self, key: Hashable, value: Any, fetched_at: float):
+        endpoint = key[0]
+        try:
+            if not self.store.save_snapshot(endpoint, value, fetched_at, session=key[1]):
+                # The token was signed out (or replaced by another account's) since this was loaded
+                return
+        except Exception as e:
+            print(f"Warning: Could not persist {endpoint}: {e}")
+
+        # Counted on the same writer, so the rollups see snapshots in the order they were cached
+        if self.rollups is not None:
+            try:
+                self.rollups.observe(endpoint, value)
+            except Exception as e:
+                print(f"Warning: Could not update activity rollups for {endpoint}: {e}")
+
+    def claim_account(self, source: str, access_token: str, identify: Callable[[], str]) -> bool:
+        """Let a newly signed-in token read and write the source's data on disk, which is cleared first if it
+        belonged to another account; identify() returns the account id. Returns whether it was cleared."""
+        if self.store is None:
+            return False
+        try:
+            account_id = identify()
+        except Exception as e:
+            print(f"Warning: Could not identify the {source} account, starting from empty local data: {e}")
+            account_id = None
+
+        switched = self.store.claim_account(source, account_id, swr_key("", access_token)[1])
+        if switched and self.rollups is not None:
+            self.rollups.clear(source)
+        return switched
+
+    def _restore(self, key: Hashable) -> Optional[Tuple[Any, int]]:
+        """Load a persisted endpoint's last value from disk into memory, unless it is past the max age"""
+        if key[0] not in self.persisted:
+            return None
+        try:
+            stored = self.store.get_snapshot(key[0], session=key[1])
+        except Exception as e:
+            print(f"Warning: Could not read {key[0]} from the local store: {e}")
+            return None
+        if stored is None:
+            return None
+
+        value, fetched_at = stored
+        if time.time() - fetched_at >= self.max_age_seconds:
+            return None
+        value = compact_snapshot(key[0], value)
+        with self._lock:
+            # Keeps its real age, so the max age applies to it like any other entry
+            value, fetched_at = self._entries.setdefault(key, (value, fetched_at))
+        return value, int(time.time() - fetched_at)
+
+    def _schedule_refresh(self, key: Hashable, loader: Callable[[], Any]):
+        """Refresh an entry in the background, at most once at a time per key"""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        self._refresh_pool.submit(self._refresh, key, loader)
+
+    def _refresh(self, key: Hashable, loader: Callable[[], Any]):
+        # Pool threads start with an empty context, so the refresh runs without the request deadline
+        try:
+            with failure_tracking() as tracked:
+                self.put(key, loader())
+            if tracked.partial:
+                print(f"Warning: Background refresh of {key[0]} had failed upstream calls ({', '.join(tracked.skipped)}), keeping the last good copy")
+        except Exception as e:
+            print(f"Warning: Background refresh failed for {key[0]}, keeping the last good copy: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+
+def swr_key(endpoint: str, access_token: str, *params) -> Tuple[str, str]:
+    """Cache key for an endpoint, the caller's token (hashed) and any parameters"""
+    return (endpoint, compute_fingerprint([access_token, list(params)]))
+
+
+# Shared list-endpoint cache (in production, use a proper cache store); the crawl snapshots survive restarts on disk
+swr_cache = SWRCache(store=local_store, persisted=SNAPSHOT_RECORDS.keys(), rollups=activity_rollups)
@@ -10,7 +10,8 @@ load_dotenv()
 class TeamsAuthService:
     """Service for handling Microsoft Teams OAuth authentication"""
     
-    def __init__(self):
+    def __init__(self, http: Optional[requests.Session] = None):
+        self.http = http or requests
         self.client_id = os.getenv("TEAMS_CLIENT_ID")
         self.client_secret = os.getenv("TEAMS_CLIENT_SECRET")
         self.redirect_uri = os.getenv("TEAMS_REDIRECT_URI", "http://localhost:8000/auth/teams/callback")
@@ -57,7 +58,7 @@ class TeamsAuthService:
         print(f"Teams token request - Redirect URI: {self.redirect_uri}")
         
         try:
-            response = requests.post(self.token_url, data=data, headers=headers)
+            response = self.http.post(self.token_url, data=data, headers=headers)
             print(f"Teams token response status: {response.status_code}")
             print(f"Teams token response: {response.text}")
             
@@ -91,7 +92,7 @@ class TeamsAuthService:
         }
         
         try:
-            response = requests.post(self.token_url, data=data, headers=headers)
+            response = self.http.post(self.token_url, data=data, headers=headers)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -115,7 +116,7 @@ class TeamsAuthService:
                 "Authorization": f"Bearer {token}",
                 "Content-Type": "application/json"
             }
-            response = requests.get("https://graph.microsoft.com/v1.0/me", headers=headers)
+            response = self.http.get("https://graph.microsoft.com/v1.0/me", headers=headers)
             return response.status_code == 200
         except:
             return False
@@ -127,7 +128,7 @@ class TeamsAuthService:
                 "Authorization": f"Bearer {token}",
                 "Content-Type": "application/json"
             }
-            response = requests.get("https://graph.microsoft.com/v1.0/me", headers=headers)
+            response = self.http.get("https://graph.microsoft.com/v1.0/me", headers=headers)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -1,37 +1,63 @@
-import google.generativeai as genai
-import os
-from typing import Dict, List
-from dotenv import load_dotenv
+from typing import Dict, List, Optional
+from .chat_session_service import ChatSession
+from .ai_service import create_gemini_model
+from .rollup_service import ActivityRollups, activity_rollups
+from .render_service import CHAT_ANSWER_SCHEMA, CHAT_ANSWER_INSTRUCTIONS, json_generation_config, renderer
 
-load_dotenv()
+# Constants
+TEAMS_SUGGESTIONS = [
+    "How many teams do I have?",
+    "What are my most active channels?",
+    "Show me recent messages from my teams",
+    "Which teams have the most activity?",
+    "What are my personal chat conversations?",
+    "How many channels do I have access to?",
+    "What's my Teams activity pattern?",
+    "Which channels are most active?",
+    "Show me messages from a specific team",
+    "What are my recent conversations?",
+    "What meetings do I have coming up?",
+    "Show me my recent meetings",
+    "How many online meetings do I have?",
+    "Who are the organizers of my meetings?",
+    "What's my meeting schedule like?"
+]
 
 class TeamsChatbotService:
     """Service for Teams chatbot functionality using AI"""
     
-    def __init__(self):
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY environment variable is required")
-        
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
+    def __init__(self, model=None, rollups: Optional[ActivityRollups] = None):
+        self.model = model or create_gemini_model()
+        self.rollups = rollups or activity_rollups
     
-    def chat_about_teams(self, user_message: str, teams_data: Dict) -> str:
+    def chat_about_teams(self, user_message: str, teams_data: Dict, session: Optional[ChatSession] = None, raise_on_error: bool = False) -> str:
         """Generate a response about Teams data based on user query"""
         try:
+            # Reuse the session's context so follow-ups don't rebuild it
+            if session is not None:
+                if session.context is None:
+                    session.context = self._create_teams_context(teams_data)
+                teams_summary = session.context
+                memory = session.get_memory()
+            else:
+                teams_summary = self._create_teams_context(teams_data)
+                memory = ""
+            
             # Create a comprehensive prompt with Teams data
-            prompt = self._create_teams_prompt(user_message, teams_data)
+            prompt = self._create_teams_prompt(user_message, teams_summary, memory)
             
             # Generate response using AI
-            response = self.model.generate_content(prompt)
+            response = self.model.generate_content(prompt, generation_config=json_generation_config(CHAT_ANSWER_SCHEMA))
             
-            return response.text
+            return renderer.render_chat_response(response.text)
             
         except Exception as e:
+            if raise_on_error:
+                raise
             return f"I'm sorry, I encountered an error while processing your request: {str(e)}"
     
-    def _create_teams_prompt(self, user_message: str, teams_data: Dict) -> str:
-        """Create a detailed prompt for Teams data analysis"""
+    def _create_teams_context(self, teams_data: Dict) -> str:
+        """Create a context summary from Teams data"""
         
         # Extract key information from teams_data
         teams = teams_data.get("teams", [])
@@ -103,11 +129,21 @@ You have access to the following Microsoft Teams data:
                 
                 teams_summary += f"- {meeting.get('subject', 'No Subject')} (Start: {formatted_time}, Organizer: {meeting.get('organizer', 'Unknown')})\n"
         
+        # Precomputed counts answer activity pattern questions without eyeballing the messages above
+        self.rollups.observe("teams/all", teams_data)
+        activity_table = self.rollups.activity_table("teams")
+        if activity_table:
+            teams_summary += "\n" + activity_table + "\n"
+        
+        return teams_summary
+    
+    def _create_teams_prompt(self, user_message: str, teams_summary: str, memory: str = "") -> str:
+        """Create a detailed prompt for Teams data analysis"""
         prompt = f"""
 You are a helpful Microsoft Teams assistant. You have access to the user's Teams data and can answer questions about their teams, channels, messages, meetings, and activity.
 
 {teams_summary}
-
+{memory}
 **User Question:** {user_message}
 
 Please provide a helpful, informative response based on the Teams data above. Be conversational and helpful. If the user asks about specific information that's not available in the data, let them know what information is available instead.
@@ -121,51 +157,28 @@ Focus on:
 - Online meeting participation
 
 Keep your response concise but informative, and be helpful in guiding the user to understand their Teams usage.
+
+{CHAT_ANSWER_INSTRUCTIONS}
 """
         
         return prompt
     
     def get_teams_insights(self, teams_data: Dict) -> Dict:
-        """Generate insights about Teams usage"""
+        """Generate insights about Teams usage from the activity rollups"""
         try:
-            teams = teams_data.get("teams", [])
-            channels = teams_data.get("channels", [])
-            messages = teams_data.get("messages", [])
-            
-            # Calculate insights
-            total_teams = len(teams)
-            total_channels = len(channels)
-            total_messages = len(messages)
-            
-            # Most active teams (by message count)
-            team_activity = {}
-            for message in messages:
-                team_name = message.get("team_name", "Personal Chat")
-                if team_name not in team_activity:
-                    team_activity[team_name] = 0
-                team_activity[team_name] += 1
-            
-            most_active_teams = sorted(team_activity.items(), key=lambda x: x[1], reverse=True)[:5]
-            
-            # Most active channels
-            channel_activity = {}
-            for message in messages:
-                if not message.get("is_personal_chat", False):
-                    channel_name = message.get("channel_name", "Unknown")
-                    team_name = message.get("team_name", "Unknown")
-                    key = f"{team_name} - {channel_name}"
-                    if key not in channel_activity:
-                        channel_activity[key] = 0
-                    channel_activity[key] += 1
-            
-            most_active_channels = sorted(channel_activity.items(), key=lambda x: x[1], reverse=True)[:5]
+            # Only new or changed messages are counted; the rest was counted when first seen
+            self.rollups.observe("teams/all", teams_data)
+            activity = self.rollups.insights("teams")
+            total_messages = len(teams_data.get("messages", []))
             
             return {
-                "total_teams": total_teams,
-                "total_channels": total_channels,
+                "total_teams": len(teams_data.get("teams", [])),
+                "total_channels": len(teams_data.get("channels", [])),
                 "total_messages": total_messages,
-                "most_active_teams": most_active_teams,
-                "most_active_channels": most_active_channels,
+                "most_active_teams": [(entry["name"], entry["count"]) for entry in activity["top"].get("team", [])],
+                "most_active_channels": [(entry["name"], entry["count"]) for entry in activity["top"].get("channel", [])],
+                "busiest_hour": activity["busiest_hour"],
+                "busiest_weekday": activity["busiest_weekday"],
                 "activity_level": "High" if total_messages > 100 else "Medium" if total_messages > 50 else "Low"
             }
             
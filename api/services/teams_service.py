@@ -2,85 +2,74 @@ import requests
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
 from ..models.teams import TeamsSummary
+from .single_flight_service import coalesce
+from .graph_client_service import GraphClient
+from .job_service import report_progress
+from .record_service import ChannelRecord, MeetingRecord, MessageRecord, TeamRecord
+from .text_service import normalize_body
 
 class TeamsService:
     """Service for interacting with Microsoft Teams via Graph API"""
     
-    def __init__(self):
+    def __init__(self, http: Optional[requests.Session] = None):
         self.base_url = "https://graph.microsoft.com/v1.0"
+        self.http = http or requests
+        self.graph = GraphClient(self.http)
     
-    def get_user_teams(self, access_token: str) -> List[Dict]:
+    def get_user_teams(self, access_token: str) -> List[TeamRecord]:
         """Get user's teams"""
         try:
             headers = {
                 "Authorization": f"Bearer {access_token}",
                 "Content-Type": "application/json"
             }
-            response = requests.get(f"{self.base_url}/me/joinedTeams", headers=headers)
+            response = self.graph.get(f"{self.base_url}/me/joinedTeams", headers=headers)
             response.raise_for_status()
-            return response.json().get("value", [])
+            return [TeamRecord.from_graph(team) for team in response.json().get("value", [])]
         except requests.exceptions.RequestException as e:
             print(f"Error getting teams: {e}")
             return []
     
-    def get_team_channels(self, access_token: str, team_id: str) -> List[Dict]:
-        """Get channels for a specific team"""
+    def get_team_channels(self, access_token: str, team_id: str, team: Optional[Dict] = None) -> List[ChannelRecord]:
+        """Get channels for a specific team, labelled with the team when given"""
         try:
             headers = {
                 "Authorization": f"Bearer {access_token}",
                 "Content-Type": "application/json"
             }
-            response = requests.get(f"{self.base_url}/teams/{team_id}/channels", headers=headers)
+            response = self.graph.get(f"{self.base_url}/teams/{team_id}/channels", headers=headers)
             response.raise_for_status()
-            return response.json().get("value", [])
+            return [ChannelRecord.from_graph(channel, team) for channel in response.json().get("value", [])]
         except requests.exceptions.RequestException as e:
             print(f"Error getting channels for team {team_id}: {e}")
             return []
     
-    def get_channel_messages(self, access_token: str, team_id: str, channel_id: str, limit: int = 50) -> List[Dict]:
-        """Get messages from a specific channel"""
+    def get_channel_messages(
+        self,
+        access_token: str,
+        team_id: str,
+        channel_id: str,
+        limit: int = 50,
+        team: Optional[Dict] = None,
+        channel: Optional[Dict] = None
+    ) -> List[MessageRecord]:
+        """Get messages from a specific channel, labelled with the team and channel when given"""
         try:
             headers = {
                 "Authorization": f"Bearer {access_token}",
                 "Content-Type": "application/json"
             }
             
-            # Try without date filter first (some channels don't support it)
-            try:
-                response = requests.get(
-                    f"{self.base_url}/teams/{team_id}/channels/{channel_id}/messages",
-                    headers=headers,
-                    params={
-                        "$top": limit,
-                        "$orderby": "createdDateTime desc"
-                    }
-                )
-                response.raise_for_status()
-                return response.json().get("value", [])
-            except requests.exceptions.RequestException as e:
-                if "400" in str(e):
-                    # If 400 error, try with date filter but handle gracefully
-                    since_date = (datetime.now() - timedelta(days=7)).isoformat() + "Z"
-                    try:
-                        response = requests.get(
-                            f"{self.base_url}/teams/{team_id}/channels/{channel_id}/messages",
-                            headers=headers,
-                            params={
-                                "$top": limit,
-                                "$filter": f"createdDateTime ge {since_date}",
-                                "$orderby": "createdDateTime desc"
-                            }
-                        )
-                        response.raise_for_status()
-                        return response.json().get("value", [])
-                    except requests.exceptions.RequestException as e2:
-                        print(f"Error getting messages for channel {channel_id} (with filter): {e2}")
-                        return []
-                else:
-                    print(f"Error getting messages for channel {channel_id}: {e}")
-                    return []
-        except Exception as e:
-            print(f"Unexpected error getting messages for channel {channel_id}: {e}")
+            # Channel messages only support $top; they come back newest first
+            response = self.graph.get(
+                f"{self.base_url}/teams/{team_id}/channels/{channel_id}/messages",
+                headers=headers,
+                params={"$top": limit}
+            )
+            response.raise_for_status()
+            return [MessageRecord.from_graph(message, team, channel) for message in response.json().get("value", [])]
+        except requests.exceptions.RequestException as e:
+            print(f"Error getting messages for channel {channel_id}: {e}")
             return []
     
     def get_chats(self, access_token: str) -> List[Dict]:
@@ -90,15 +79,15 @@ class TeamsService:
                 "Authorization": f"Bearer {access_token}",
                 "Content-Type": "application/json"
             }
-            response = requests.get(f"{self.base_url}/me/chats", headers=headers)
+            response = self.graph.get(f"{self.base_url}/me/chats", headers=headers)
             response.raise_for_status()
             return response.json().get("value", [])
         except requests.exceptions.RequestException as e:
             print(f"Error getting chats: {e}")
             return []
     
-    def get_chat_messages(self, access_token: str, chat_id: str, limit: int = 50) -> List[Dict]:
-        """Get messages from a specific chat"""
+    def get_chat_messages(self, access_token: str, chat_id: str, limit: int = 50, chat: Optional[Dict] = None) -> List[MessageRecord]:
+        """Get messages from a specific chat, labelled with the chat when given"""
         try:
             headers = {
                 "Authorization": f"Bearer {access_token}",
@@ -107,7 +96,7 @@ class TeamsService:
             
             # Try without date filter first (some chat types don't support it)
             try:
-                response = requests.get(
+                response = self.graph.get(
                     f"{self.base_url}/chats/{chat_id}/messages",
                     headers=headers,
                     params={
@@ -116,13 +105,13 @@ class TeamsService:
                     }
                 )
                 response.raise_for_status()
-                return response.json().get("value", [])
+                return [MessageRecord.from_graph(message, chat=chat) for message in response.json().get("value", [])]
             except requests.exceptions.RequestException as e:
-                if "400" in str(e):
+                if e.response is not None and e.response.status_code == 400:
                     # If 400 error, try with date filter but handle gracefully
                     since_date = (datetime.now() - timedelta(days=7)).isoformat() + "Z"
                     try:
-                        response = requests.get(
+                        response = self.graph.get(
                             f"{self.base_url}/chats/{chat_id}/messages",
                             headers=headers,
                             params={
@@ -132,7 +121,7 @@ class TeamsService:
                             }
                         )
                         response.raise_for_status()
-                        return response.json().get("value", [])
+                        return [MessageRecord.from_graph(message, chat=chat) for message in response.json().get("value", [])]
                     except requests.exceptions.RequestException as e2:
                         print(f"Error getting messages for chat {chat_id} (with filter): {e2}")
                         return []
@@ -143,6 +132,48 @@ class TeamsService:
             print(f"Unexpected error getting messages for chat {chat_id}: {e}")
             return []
     
+    def get_chat_message(self, access_token: str, chat_id: str, message_id: str, chat: Optional[Dict] = None) -> Optional[MessageRecord]:
+        """Get a single chat message, e.g. one a change notification reported"""
+        try:
+            headers = {
+                "Authorization": f"Bearer {access_token}",
+                "Content-Type": "application/json"
+            }
+            response = self.graph.get(f"{self.base_url}/chats/{chat_id}/messages/{message_id}", headers=headers)
+            response.raise_for_status()
+            return MessageRecord.from_graph(response.json(), chat=chat or {"id": chat_id})
+        except requests.exceptions.RequestException as e:
+            print(f"Error getting message {message_id} in chat {chat_id}: {e}")
+            return None
+    
+    def get_message_body(
+        self,
+        access_token: str,
+        message_id: str,
+        chat_id: Optional[str] = None,
+        team_id: Optional[str] = None,
+        channel_id: Optional[str] = None
+    ) -> Optional[str]:
+        """Get the full plain-text body of a chat or channel message, for when its preview was cut"""
+        if chat_id:
+            url = f"{self.base_url}/chats/{chat_id}/messages/{message_id}"
+        else:
+            url = f"{self.base_url}/teams/{team_id}/channels/{channel_id}/messages/{message_id}"
+        try:
+            headers = {
+                "Authorization": f"Bearer {access_token}",
+                "Content-Type": "application/json"
+            }
+            response = self.graph.get(url, headers=headers)
+            response.raise_for_status()
+            body = response.json().get("body") or {}
+            text, _ = normalize_body(body.get("content"), body.get("contentType"))
+            return text
+        except requests.exceptions.RequestException as e:
+            print(f"Error getting body of message {message_id}: {e}")
+            return None
+    
+    @coalesce("teams.get_teams_summary")
     def get_teams_summary(self, access_token: str) -> TeamsSummary:
         """Get comprehensive Teams summary"""
         try:
@@ -152,35 +183,35 @@ class TeamsService:
             all_channels = []
             all_messages = []
             
+            report_progress(stage="channels", teams_done=0, teams_total=len(teams), channels_done=0)
+            
             # Get channels and messages for each team
-            for team in teams:
+            for teams_done, team in enumerate(teams, start=1):
                 team_id = team["id"]
-                channels = self.get_team_channels(access_token, team_id)
+                channels = self.get_team_channels(access_token, team_id, team)
                 
                 for channel in channels:
-                    channel["team_name"] = team["displayName"]
-                    channel["team_id"] = team_id
                     all_channels.append(channel)
                     
                     # Get messages for this channel
-                    messages = self.get_channel_messages(access_token, team_id, channel["id"])
-                    for message in messages:
-                        message["channel_name"] = channel["displayName"]
-                        message["team_name"] = team["displayName"]
+                    messages = self.get_channel_messages(access_token, team_id, channel["id"], team=team, channel=channel)
                     all_messages.extend(messages)
+                    report_progress(channels_done=len(all_channels))
+                
+                report_progress(teams_done=teams_done)
             
             # Get personal chats
             chats = self.get_chats(access_token)
-            for chat in chats:
+            report_progress(stage="chats", chats_done=0, chats_total=len(chats))
+            for chats_done, chat in enumerate(chats, start=1):
                 try:
-                    chat_messages = self.get_chat_messages(access_token, chat["id"])
-                    for message in chat_messages:
-                        message["chat_name"] = chat.get("topic", "Personal Chat")
-                        message["is_personal_chat"] = True
+                    chat_messages = self.get_chat_messages(access_token, chat["id"], chat=chat)
                     all_messages.extend(chat_messages)
                 except Exception as e:
                     print(f"Error processing chat {chat.get('id', 'unknown')}: {e}")
                     continue
+                finally:
+                    report_progress(chats_done=chats_done)
             
             return TeamsSummary(
                 channels=all_channels,
@@ -201,35 +232,35 @@ class TeamsService:
             all_channels = []
             all_messages = []
             
+            report_progress(stage="channels", teams_done=0, teams_total=len(teams), channels_done=0)
+            
             # Get channels and messages for each team
-            for team in teams:
+            for teams_done, team in enumerate(teams, start=1):
                 team_id = team["id"]
-                channels = self.get_team_channels(access_token, team_id)
+                channels = self.get_team_channels(access_token, team_id, team)
                 
                 for channel in channels:
-                    channel["team_name"] = team["displayName"]
-                    channel["team_id"] = team_id
                     all_channels.append(channel)
                     
                     # Get messages for this channel
-                    messages = self.get_channel_messages(access_token, team_id, channel["id"])
-                    for message in messages:
-                        message["channel_name"] = channel["displayName"]
-                        message["team_name"] = team["displayName"]
+                    messages = self.get_channel_messages(access_token, team_id, channel["id"], team=team, channel=channel)
                     all_messages.extend(messages)
+                    report_progress(channels_done=len(all_channels))
+                
+                report_progress(teams_done=teams_done)
             
             # Get personal chats
             chats = self.get_chats(access_token)
-            for chat in chats:
+            report_progress(stage="chats", chats_done=0, chats_total=len(chats))
+            for chats_done, chat in enumerate(chats, start=1):
                 try:
-                    chat_messages = self.get_chat_messages(access_token, chat["id"])
-                    for message in chat_messages:
-                        message["chat_name"] = chat.get("topic", "Personal Chat")
-                        message["is_personal_chat"] = True
+                    chat_messages = self.get_chat_messages(access_token, chat["id"], chat=chat)
                     all_messages.extend(chat_messages)
                 except Exception as e:
                     print(f"Error processing chat {chat.get('id', 'unknown')}: {e}")
                     continue
+                finally:
+                    report_progress(chats_done=chats_done)
             
             return {
                 "teams": teams,
@@ -244,7 +275,17 @@ class TeamsService:
         except Exception as e:
             raise Exception(f"Failed to get all Teams data: {str(e)}")
     
-    def get_user_meetings(self, access_token: str, days_back: int = 30) -> List[Dict]:
+    @coalesce("teams.get_teams_data_with_meetings")
+    def get_teams_data_with_meetings(self, access_token: str) -> Dict:
+        """Get all Teams data including the user's meetings"""
+        teams_data = self.get_all_teams_data(access_token)
+        report_progress(stage="meetings")
+        meetings = self.get_user_meetings(access_token)
+        teams_data["meetings"] = meetings
+        teams_data["total_meetings"] = len(meetings)
+        return teams_data
+    
+    def get_user_meetings(self, access_token: str, days_back: int = 30) -> List[MeetingRecord]:
         """Get user's meetings and events"""
         try:
             headers = {
@@ -258,7 +299,7 @@ class TeamsService:
             end_date = (datetime.now() + timedelta(days=30)).isoformat() + "Z"
             
             # Get calendar events (which include meetings)
-            response = requests.get(
+            response = self.graph.get(
                 f"{self.base_url}/me/calendarView",
                 headers=headers,
                 params={
@@ -275,17 +316,7 @@ class TeamsService:
             meetings = []
             for event in events:
                 if event.get("isOnlineMeeting", False) or "teams" in event.get("onlineMeeting", {}).get("joinUrl", "").lower():
-                    meetings.append({
-                        "id": event.get("id"),
-                        "subject": event.get("subject", "No Subject"),
-                        "start": event.get("start", {}).get("dateTime"),
-                        "end": event.get("end", {}).get("dateTime"),
-                        "organizer": event.get("organizer", {}).get("emailAddress", {}).get("name"),
-                        "attendees": [attendee.get("emailAddress", {}).get("name") for attendee in event.get("attendees", [])],
-                        "isOnlineMeeting": event.get("isOnlineMeeting", False),
-                        "joinUrl": event.get("onlineMeeting", {}).get("joinUrl"),
-                        "body": event.get("body", {}).get("content", "")
-                    })
+                    meetings.append(MeetingRecord.from_graph(event))
             
             return meetings
         except requests.exceptions.RequestException as e:
@@ -300,9 +331,12 @@ class TeamsService:
                 "Content-Type": "application/json"
             }
             
-            response = requests.get(f"{self.base_url}/me/events/{meeting_id}", headers=headers)
+            response = self.graph.get(f"{self.base_url}/me/events/{meeting_id}", headers=headers)
             response.raise_for_status()
             event = response.json()
+            # The full body, unlike the capped preview kept in the meeting list
+            body = event.get("body") or {}
+            text, _ = normalize_body(body.get("content"), body.get("contentType", "html"))
             
             return {
                 "id": event.get("id"),
@@ -313,9 +347,9 @@ class TeamsService:
                 "attendees": [attendee.get("emailAddress", {}).get("name") for attendee in event.get("attendees", [])],
                 "isOnlineMeeting": event.get("isOnlineMeeting", False),
                 "joinUrl": event.get("onlineMeeting", {}).get("joinUrl"),
-                "body": event.get("body", {}).get("content", ""),
+                "body": text,
                 "location": event.get("location", {}).get("displayName"),
-                "description": event.get("body", {}).get("content", "")
+                "description": text
             }
         except requests.exceptions.RequestException as e:
             print(f"Error getting meeting details: {e}")
@@ -329,7 +363,7 @@ class TeamsService:
                 "Content-Type": "application/json"
             }
             
-            response = requests.get(f"{self.base_url}/me/onlineMeetings/{meeting_id}/attendanceReport", headers=headers)
+            response = self.graph.get(f"{self.base_url}/me/onlineMeetings/{meeting_id}/attendanceReport", headers=headers)
             response.raise_for_status()
             return response.json().get("value", [])
         except requests.exceptions.RequestException as e:
@@ -343,7 +377,7 @@ class TeamsService:
                 "Authorization": f"Bearer {token}",
                 "Content-Type": "application/json"
             }
-            response = requests.get("https://graph.microsoft.com/v1.0/me", headers=headers)
+            response = self.graph.get("https://graph.microsoft.com/v1.0/me", headers=headers)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
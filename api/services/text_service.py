@@ -0,0 +1,111 @@
+import re
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+
+# Constants
+FEED_CHUNK_CHARS = 4096
+BLOCK_TAGS = frozenset((
+    "address", "article", "aside", "br", "dd", "div", "dl", "dt", "footer", "h1", "h2", "h3", "h4", "h5", "h6",
+    "header", "hr", "li", "ol", "p", "pre", "section", "table", "td", "th", "tr", "ul"
+))
+# Never text; blockquote is how Outlook, Gmail and Teams quote the message being replied to
+SKIPPED_TAGS = frozenset(("blockquote", "head", "script", "style", "title"))
+# Elements that start quoted history or a signature; nothing from them on is kept
+CUTOFF_IDS = frozenset(("divrplyfwdmsg", "appendonsend", "signature", "ms-outlook-mobile-signature"))
+CUTOFF_CLASSES = frozenset(("gmail_quote", "gmail_signature", "moz-cite-prefix", "moz-signature"))
+# Plain-text lines that do the same: signature delimiter, Teams join block and Outlook separators, reply headers
+CUTOFF_LINE_PATTERN = re.compile(
+    r"^(?:--|_{10,}|-{4,} ?Original Message ?-{4,}|On .{1,200} wrote:|Sent from my .*|Get Outlook for .*)$",
+    re.IGNORECASE
+)
+
+
+class _TextWriter(HTMLParser):
+    """Collects the visible text of an HTML body line by line, stopping at the cap or at quoted history"""
+
+    def __init__(self, max_chars: Optional[int]):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.lines: List[str] = []
+        self.length = 0
+        self.done = False
+        self.truncated = False
+        self._line: List[str] = []
+        self._line_length = 0
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        attributes = dict(attrs)
+        if (attributes.get("id") or "").lower() in CUTOFF_IDS or CUTOFF_CLASSES.intersection((attributes.get("class") or "").split()):
+            self.end_line()
+            self.done = True
+        elif tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self.end_line()
+        elif tag == "emoji":
+            # Teams emoji are elements whose text is in alt
+            self.handle_data(attributes.get("alt") or "")
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+        elif tag in BLOCK_TAGS:
+            self.end_line()
+
+    def handle_data(self, data):
+        if self.done or self._skip_depth:
+            return
+        self._line.append(data)
+        self._line_length += len(data)
+        # A body with no block markup is one long line; don't buffer past the cap waiting for its end
+        if self.max_chars is not None and self.length + self._line_length > 2 * self.max_chars:
+            self.end_line()
+
+    def end_line(self):
+        line = " ".join("".join(self._line).split())
+        self._line = []
+        self._line_length = 0
+        if self.done or not line or line.startswith(">"):
+            return
+        if CUTOFF_LINE_PATTERN.match(line):
+            self.done = True
+            return
+        if self.max_chars is not None and self.length + len(line) > self.max_chars:
+            line = line[:self.max_chars - self.length].rstrip()
+            self.done = self.truncated = True
+            if not line:
+                return
+        self.lines.append(line)
+        self.length += len(line) + 1
+
+    def text(self) -> str:
+        self.end_line()
+        return "\n".join(self.lines)
+
+
+def normalize_body(content: Optional[str], content_type: str = "html", max_chars: Optional[int] = None) -> Tuple[str, bool]:
+    """Plain text of a message or event body without markup, quoted replies or signatures.
+
+    HTML is parsed in chunks and parsing stops once max_chars of text are
+    collected, so large bodies are never fully decoded. Returns the text and
+    whether it was cut at max_chars.
+    """
+    writer = _TextWriter(max_chars)
+    content = content or ""
+    if (content_type or "").lower() == "html":
+        for start in range(0, len(content), FEED_CHUNK_CHARS):
+            writer.feed(content[start:start + FEED_CHUNK_CHARS])
+            if writer.done:
+                break
+        if not writer.done:
+            writer.close()
+    else:
+        for line in content.splitlines():
+            writer.handle_data(line)
+            writer.end_line()
+            if writer.done:
+                break
+    return writer.text(), writer.truncated
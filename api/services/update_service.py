@@ -0,0 +1,98 @@
+import asyncio
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+# Constants
+MAX_BUFFERED_UPDATES = 100
+
+
+class UpdateBroker:
+    """Fans out snapshot and summary changes to connected dashboards, carrying only what changed"""
+
+    def __init__(self, max_buffered: int = MAX_BUFFERED_UPDATES):
+        self._updates = deque(maxlen=max_buffered)
+        self._last_published: Dict[str, Dict] = {}
+        self._seq = 0
+        self._subscribers = 0
+        self._changed = threading.Condition()
+        # (event loop, asyncio.Event) of each stream waiting for its next update
+        self._waiters = set()
+
+    @property
+    def seq(self) -> int:
+        with self._changed:
+            return self._seq
+
+    @property
+    def subscribers(self) -> int:
+        with self._changed:
+            return self._subscribers
+
+    def publish(self, source: str, snapshot: Dict) -> Optional[Dict]:
+        """Publish the fields of a source snapshot that differ from the last one; returns the update, if any"""
+        with self._changed:
+            last = self._last_published.get(source, {})
+            changes = {field: value for field, value in snapshot.items() if last.get(field) != value}
+            if not changes:
+                return None
+
+            self._last_published[source] = dict(snapshot)
+            self._seq += 1
+            update = {"seq": self._seq, "source": source, "changes": changes}
+            self._updates.append(update)
+            self._changed.notify_all()
+            for loop, event in self._waiters:
+                loop.call_soon_threadsafe(event.set)
+            return update
+
+    def updates_since(self, seq: int) -> List[Dict]:
+        """Updates after seq, without waiting"""
+        with self._changed:
+            return self._since(seq)
+
+    def _since(self, seq: int) -> List[Dict]:
+        """Updates after seq, or every source's full snapshot if some were already dropped from the buffer"""
+        if seq > self._seq or (self._updates and seq < self._updates[0]["seq"] - 1):
+            # Deltas only make sense on top of the ones before them, so a client that fell behind (or
+            # carries a seq from before a server restart) resyncs
+            return [
+                {"seq": self._seq, "source": source, "changes": dict(snapshot), "resync": True}
+                for source, snapshot in self._last_published.items()
+            ]
+        return [update for update in self._updates if update["seq"] > seq]
+
+    async def wait_for_updates(self, seq: int, timeout: float) -> List[Dict]:
+        """Updates after seq, waiting up to timeout for the first one without holding a thread"""
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._changed:
+            updates = self._since(seq)
+            if updates:
+                return updates
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._changed:
+                self._waiters.discard(waiter)
+        return self.updates_since(seq)
+
+    def subscribe(self):
+        with self._changed:
+            self._subscribers += 1
+            self._changed.notify_all()
+
+    def unsubscribe(self):
+        with self._changed:
+            self._subscribers = max(0, self._subscribers - 1)
+
+    def wait_for_subscribers(self, timeout: Optional[float] = None) -> bool:
+        """Block until at least one dashboard is connected"""
+        with self._changed:
+            return self._changed.wait_for(lambda: self._subscribers > 0, timeout=timeout)
+
+
+# Shared update broker (in production, use a proper pub/sub channel)
+update_broker = UpdateBroker()
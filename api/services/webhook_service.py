@@ -0,0 +1,285 @@
+import hashlib
+import hmac
+import os
+import re
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+from dotenv import load_dotenv
+from .graph_client_service import GraphClient
+from .record_service import CommitRecord, IssueRecord
+
+# Load environment variables
+load_dotenv()
+
+# Constants
+GRAPH_API_BASE_URL = "https://graph.microsoft.com/v1.0"
+RENEW_MARGIN_SECONDS = 15 * 60
+RENEW_CHECK_SECONDS = 5 * 60
+CHAT_RESOURCE_PATTERN = re.compile(r"chats(?:\('([^']+)'\)|/([^/]+))/messages", re.IGNORECASE)
+
+# Subscribed resources per source: (resource, change types, longest lifetime Graph allows in minutes)
+GRAPH_SUBSCRIPTIONS = {
+    "email": [("me/mailFolders('Inbox')/messages", "created,updated,deleted", 4230)],
+    "teams": [
+        ("me/chats/getAllMessages", "created,updated,deleted", 60),
+        ("me/events", "created,updated,deleted", 4230)
+    ]
+}
+
+
+class GraphSubscriptionManager:
+    """Creates, renews and recreates Microsoft Graph change-notification subscriptions"""
+
+    def __init__(self, http=None, notification_url: Optional[str] = None, client_state: Optional[str] = None):
+        self.graph = GraphClient(http)
+        self.notification_url = notification_url or os.getenv("GRAPH_WEBHOOK_URL")
+        self.lifecycle_url = os.getenv("GRAPH_LIFECYCLE_WEBHOOK_URL") or (
+            f"{self.notification_url.rstrip('/')}/lifecycle" if self.notification_url else None
+        )
+        # A fixed client state lets notifications for subscriptions made before a restart still verify
+        self.client_state = client_state or os.getenv("GRAPH_WEBHOOK_CLIENT_STATE") or secrets.token_urlsafe(24)
+        self._subscriptions: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._renewer: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        """Subscriptions need a public notification URL; without one, data is refreshed by polling"""
+        return bool(self.notification_url)
+
+    def is_active(self, source: Optional[str]) -> bool:
+        """Whether every resource of a source has an unexpired subscription"""
+        if source not in GRAPH_SUBSCRIPTIONS:
+            return False
+        with self._lock:
+            active = {s["resource"] for s in self._subscriptions.values() if s["source"] == source and s["expires_at"] > time.time()}
+        return all(resource in active for resource, _, _ in GRAPH_SUBSCRIPTIONS[source])
+
+    def ensure(self, source: str, get_token: Callable[[], Optional[str]]):
+        """Subscribe to a source's resources unless already subscribed; get_token supplies the current token for renewals"""
+        if not self.enabled:
+            return
+
+        for resource, change_type, lifetime_minutes in GRAPH_SUBSCRIPTIONS[source]:
+            with self._lock:
+                subscribed = any(
+                    s["resource"] == resource and s["expires_at"] > time.time()
+                    for s in self._subscriptions.values()
+                )
+            if not subscribed:
+                self._create(source, resource, change_type, lifetime_minutes, get_token)
+
+        self._start_renewer()
+
+    def verify(self, notification: Dict) -> bool:
+        """Whether a notification carries our client state"""
+        return hmac.compare_digest(str(notification.get("clientState", "")), self.client_state)
+
+    def renew(self, subscription_id: str) -> bool:
+        """Extend a subscription, recreating it if Graph no longer knows it"""
+        with self._lock:
+            subscription = self._subscriptions.get(subscription_id)
+        if subscription is None:
+            return False
+
+        token = subscription["get_token"]()
+        if not token:
+            return False
+
+        response = self.graph.patch(
+            f"{GRAPH_API_BASE_URL}/subscriptions/{subscription_id}",
+            headers=_headers(token),
+            json={"expirationDateTime": _expiry(subscription["lifetime_minutes"])}
+        )
+        if response.status_code == 404:
+            return self.recreate(subscription_id)
+        if response.status_code != 200:
+            print(f"Warning: Could not renew Graph subscription for {subscription['resource']}: {response.status_code}")
+            return False
+
+        with self._lock:
+            subscription["expires_at"] = _parse_expiry(response.json().get("expirationDateTime"))
+        return True
+
+    def recreate(self, subscription_id: str) -> bool:
+        """Replace a removed subscription with a new one for the same resource"""
+        with self._lock:
+            subscription = self._subscriptions.pop(subscription_id, None)
+        if subscription is None:
+            return False
+        return self._create(
+            subscription["source"],
+            subscription["resource"],
+            subscription["change_type"],
+            subscription["lifetime_minutes"],
+            subscription["get_token"]
+        )
+
+    def renew_due(self):
+        """Renew every subscription that expires within the renewal margin"""
+        with self._lock:
+            due = [sid for sid, s in self._subscriptions.items() if s["expires_at"] - time.time() < RENEW_MARGIN_SECONDS]
+        for subscription_id in due:
+            try:
+                self.renew(subscription_id)
+            except Exception as e:
+                print(f"Warning: Graph subscription renewal failed: {e}")
+
+    def snapshot(self) -> List[Dict]:
+        """Subscriptions for health reporting"""
+        with self._lock:
+            return [
+                {"id": sid, "source": s["source"], "resource": s["resource"], "expires_in_seconds": int(s["expires_at"] - time.time())}
+                for sid, s in self._subscriptions.items()
+            ]
+
+    def _create(self, source: str, resource: str, change_type: str, lifetime_minutes: int, get_token: Callable[[], Optional[str]]) -> bool:
+        token = get_token()
+        if not token:
+            return False
+
+        response = self.graph.request(
+            "POST",
+            f"{GRAPH_API_BASE_URL}/subscriptions",
+            headers=_headers(token),
+            json={
+                "changeType": change_type,
+                "notificationUrl": self.notification_url,
+                "lifecycleNotificationUrl": self.lifecycle_url,
+                "resource": resource,
+                "expirationDateTime": _expiry(lifetime_minutes),
+                "clientState": self.client_state
+            }
+        )
+        if response.status_code not in (200, 201):
+            print(f"Warning: Could not subscribe to {resource}: {response.status_code} {response.text[:200]}")
+            return False
+
+        data = response.json()
+        with self._lock:
+            self._subscriptions[data["id"]] = {
+                "source": source,
+                "resource": resource,
+                "change_type": change_type,
+                "lifetime_minutes": lifetime_minutes,
+                "expires_at": _parse_expiry(data.get("expirationDateTime")),
+                "get_token": get_token
+            }
+        print(f"Subscribed to Graph change notifications for {resource}")
+        return True
+
+    def _start_renewer(self):
+        with self._lock:
+            if self._renewer is not None:
+                return
+            self._renewer = threading.Thread(target=self._renew_forever, name="graph-subscription-renewer", daemon=True)
+            self._renewer.start()
+
+    def _renew_forever(self):
+        while True:
+            time.sleep(RENEW_CHECK_SECONDS)
+            self.renew_due()
+
+
+def _headers(access_token: str) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"}
+
+
+def _expiry(lifetime_minutes: int) -> str:
+    expires = datetime.now(timezone.utc) + timedelta(minutes=lifetime_minutes)
+    return expires.strftime("%Y-%m-%dT%H:%M:%S.0000000Z")
+
+
+def _parse_expiry(value: Optional[str]) -> float:
+    """Epoch seconds of a Graph expirationDateTime"""
+    if not value:
+        return time.time()
+    try:
+        # Graph sends UTC with seven fractional digits; seconds precision is plenty
+        return datetime.strptime(value[:19], "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc).timestamp()
+    except ValueError:
+        return time.time()
+
+
+def graph_notification_source(resource: str) -> Optional[str]:
+    """Which snapshot a Graph notification's resource belongs to"""
+    lowered = resource.lower()
+    if "chats(" in lowered or "chats/" in lowered or "channels(" in lowered or "/events" in lowered or lowered.startswith("events"):
+        return "teams"
+    if "messages" in lowered:
+        return "email"
+    return None
+
+
+def graph_resource_id(notification: Dict) -> Optional[str]:
+    """Id of the changed item in a Graph notification"""
+    resource_id = (notification.get("resourceData") or {}).get("id")
+    if resource_id:
+        return resource_id
+    resource = notification.get("resource", "").rstrip("')")
+    return resource.rsplit("/", 1)[-1].split("('")[-1] or None
+
+
+def graph_chat_id(resource: str) -> Optional[str]:
+    """Chat id of a chat message notification's resource, e.g. chats('19:...')/messages('...')"""
+    match = CHAT_RESOURCE_PATTERN.search(resource)
+    return (match.group(1) or match.group(2)) if match else None
+
+
+def verify_github_signature(secret: Optional[str], body: bytes, signature_header: Optional[str]) -> bool:
+    """Check X-Hub-Signature-256; unsigned deliveries are rejected, as is everything when no secret is configured"""
+    if not secret or not signature_header or not signature_header.startswith("sha256="):
+        return False
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(signature_header[len("sha256="):], expected)
+
+
+def upsert_by(items: List[Dict], record: Dict, field: str = "id", prepend: bool = True) -> List[Dict]:
+    """Copy of items with record replacing the item that has the same field value, or added if new"""
+    patched = [record if item.get(field) == record.get(field) else item for item in items]
+    if not any(item.get(field) == record.get(field) for item in items):
+        patched = [record] + patched if prepend else patched + [record]
+    return patched
+
+
+def upsert_all(items: List[Dict], records: List[Dict], field: str = "id") -> List[Dict]:
+    """Copy of items with each record upserted, keeping the records' order at the front"""
+    for record in reversed(records):
+        items = upsert_by(items, record, field)
+    return items
+
+
+def remove_by(items: List[Dict], value, field: str = "id") -> List[Dict]:
+    """Copy of items without the item whose field equals value"""
+    return [item for item in items if item.get(field) != value]
+
+
+def github_issue_record(payload: Dict) -> IssueRecord:
+    """An issues event's issue, shaped like GitHubService.get_user_issues items"""
+    return IssueRecord.from_github(payload["issue"], payload["repository"]["full_name"])
+
+
+def github_commit_records(payload: Dict) -> List[CommitRecord]:
+    """A push event's commits, shaped like GitHubService.get_repository_commits items (newest first)"""
+    repository = payload["repository"]["full_name"]
+    return [
+        CommitRecord(
+            commit["id"],
+            commit.get("url"),
+            commit.get("message", ""),
+            commit.get("author", {}).get("name"),
+            commit.get("author", {}).get("email"),
+            commit.get("timestamp"),
+            repository
+        )
+        for commit in reversed(payload.get("commits", []))
+    ]
+
+
+def is_default_branch_push(payload: Dict) -> bool:
+    """Only default-branch pushes appear in the commit listing the snapshot is built from"""
+    default_branch = payload.get("repository", {}).get("default_branch")
+    return bool(default_branch) and payload.get("ref") == f"refs/heads/{default_branch}"
@@ -0,0 +1,102 @@
+"""Micro-benchmark: folding near-duplicate automated mail in a notification-heavy inbox.
+
+Run from the repository root:
+
+    python scripts/bench_dedup.py [emails]
+
+Builds a synthetic inbox where most mail comes from a few templates (CI runs,
+GitHub notifications, calendar updates) that differ only in numbers, ids and
+branch names, mixed with distinct human-written mail. It then times reply
+chain collapsing and SimHash folding, both cold and with the fingerprints
+cached by an earlier refresh, and reports how many items a prompt would see.
+No network calls are made.
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from api.services.record_service import EmailRecord, fold_near_duplicates, group_threads
+
+DEFAULT_EMAILS = 5000
+AUTOMATED_SHARE = 0.7
+REPEATS = 5
+PEOPLE = ["Alice", "Bob", "Carol", "Dan", "Erin", "Frank", "Grace", "Heidi"]
+WORDS = ("budget review deploy release incident planning roadmap invoice contract hiring onboarding offsite "
+         "migration outage security audit design feedback quarterly customer launch lunch travel").split()
+TEMPLATES = [
+    ("GitHub Actions", "[acme/api] Run failed: CI - main ({sha})",
+     "Run failed for main ({sha}). Workflow CI #{run} failed in {minutes} minutes. View the workflow run for details."),
+    ("GitHub Actions", "[acme/web] Run failed: Deploy - release/{run} ({sha})",
+     "Run failed for release/{run} ({sha}). Workflow Deploy #{run} failed in {minutes} minutes. View the workflow run for details."),
+    ("notifications@github.com", "Re: [acme/api] Fix flaky test in payments (PR #{run})",
+     "@bob approved this pull request. You are receiving this because you were mentioned. Reply to this email directly or view it on GitHub."),
+    ("Calendar", "Updated invitation: Weekly sync @ Mon {minutes}:00",
+     "This event has been changed. When: Monday {minutes}:00 to {minutes}:30. Joining info: meet link {sha}. View all guest info."),
+    ("Jira", "[JIRA] (OPS-{run}) Disk usage above {minutes}% on db-{minutes}",
+     "Alert OPS-{run} was created by monitoring. Disk usage is above {minutes}% on host db-{minutes}. Assignee: on-call."),
+]
+
+
+def human_email(rng: random.Random, index: int) -> dict:
+    name = rng.choice(PEOPLE)
+    return {
+        "id": f"email-{index}",
+        "conversationId": f"conversation-{index}",
+        "subject": " ".join(rng.choice(WORDS) for _ in range(5)),
+        "bodyPreview": " ".join(rng.choice(WORDS) for _ in range(30)),
+        "from": {"emailAddress": {"name": name, "address": f"{name.lower()}@example.com"}},
+        "receivedDateTime": f"2026-05-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00Z",
+        "isRead": rng.random() < 0.7
+    }
+
+
+def automated_email(rng: random.Random, index: int) -> dict:
+    sender, subject, preview = rng.choice(TEMPLATES)
+    values = {"sha": f"{rng.getrandbits(28):07x}", "run": rng.randint(100, 9999), "minutes": rng.randint(1, 59)}
+    return {
+        "id": f"email-{index}",
+        "conversationId": f"conversation-{index}",
+        "subject": subject.format(**values),
+        "bodyPreview": preview.format(**values),
+        "from": {"emailAddress": {"name": sender, "address": "noreply@example.com"}},
+        "receivedDateTime": f"2026-05-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00Z",
+        "isRead": rng.random() < 0.9
+    }
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_EMAILS
+    rng = random.Random(42)
+    emails = [
+        EmailRecord.from_graph(automated_email(rng, index) if rng.random() < AUTOMATED_SHARE else human_email(rng, index))
+        for index in range(count)
+    ]
+
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        threads = group_threads(emails)
+    grouping_ms = (time.perf_counter() - start) / REPEATS * 1000
+
+    start = time.perf_counter()
+    folded = fold_near_duplicates(threads)
+    first_ms = (time.perf_counter() - start) * 1000
+
+    # Later refreshes see mostly the same mail, whose fingerprints are cached
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        folded = fold_near_duplicates(threads)
+    repeat_ms = (time.perf_counter() - start) / REPEATS * 1000
+
+    automated = sum(1 for email in emails if email["from"]["emailAddress"]["address"] == "noreply@example.com")
+    print(f"{count} emails ({automated} automated) -> {len(threads)} conversations -> {len(folded)} after folding")
+    print(f"grouping {grouping_ms:.1f} ms, folding {first_ms:.1f} ms on the first refresh, {repeat_ms:.1f} ms on later ones")
+    print("largest folds:")
+    for thread in sorted(folded, key=lambda thread: -thread.get("foldedConversations", 1))[:len(TEMPLATES)]:
+        print(f"  {thread.get('foldedConversations', 1):5d} x {thread['subject']}")
+
+
+if __name__ == "__main__":
+    main()
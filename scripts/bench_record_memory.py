@@ -0,0 +1,194 @@
+"""Micro-benchmark: memory held by cached snapshots as raw payload dicts vs compact records.
+
+Run from the repository root:
+
+    python scripts/bench_record_memory.py [items]
+
+Builds synthetic Graph and GitHub payloads shaped like the real API responses
+(GitHub repositories carry ~80 fields, Teams messages carry HTML bodies,
+reactions and mentions, meetings carry Outlook invite HTML), then measures with tracemalloc how much memory the
+raw lists and the equivalent record lists hold. No network calls are made.
+"""
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from api.services.record_service import (
+    CommitRecord, EmailRecord, IssueRecord, MeetingRecord, MessageRecord, RepositoryRecord
+)
+
+DEFAULT_ITEMS = 5000
+PEOPLE = ["Alice", "Bob", "Carol", "Dan", "Erin", "Frank", "Grace", "Heidi"]
+REPOSITORIES = [f"acme/service-{index}" for index in range(40)]
+LANGUAGES = ["Python", "TypeScript", "Go", "Rust", None]
+WORDS = "budget review deploy release incident planning roadmap invoice contract hiring design feedback".split()
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def user(rng: random.Random) -> dict:
+    name = rng.choice(PEOPLE)
+    return {
+        "login": name.lower(), "id": rng.randint(1, 10 ** 6), "node_id": "MDQ6VXNlcjE=", "type": "User",
+        "site_admin": False, "avatar_url": f"https://avatars.example.com/{name}",
+        **{f"{field}_url": f"https://api.github.com/users/{name.lower()}/{field}" for field in (
+            "html", "followers", "following", "gists", "starred", "subscriptions", "organizations", "repos", "events", "received_events"
+        )}
+    }
+
+
+def raw_email(rng: random.Random, index: int) -> dict:
+    name = rng.choice(PEOPLE)
+    address = {"emailAddress": {"name": name, "address": f"{name.lower()}@example.com"}}
+    return {
+        "@odata.etag": f'W/"CQAAABYAAAA{index}"',
+        "id": f"AAMkAGI2TG93AAA{index:08d}",
+        "subject": sentence(rng, 6),
+        "bodyPreview": sentence(rng, 40),
+        "from": address,
+        "sender": address,
+        "toRecipients": [{"emailAddress": {"name": "Me", "address": "me@example.com"}}],
+        "receivedDateTime": f"2026-05-{rng.randint(1, 28):02d}T09:00:00Z",
+        "sentDateTime": f"2026-05-{rng.randint(1, 28):02d}T08:59:00Z",
+        "isRead": rng.random() < 0.7,
+        "importance": "normal",
+        "conversationId": f"AAQkAGI2{index:08d}",
+        "webLink": f"https://outlook.office365.com/owa/?ItemID=AAMkAGI2TG93AAA{index:08d}",
+        "categories": [],
+        "flag": {"flagStatus": "notFlagged"}
+    }
+
+
+def raw_message(rng: random.Random, index: int) -> dict:
+    name = rng.choice(PEOPLE)
+    return {
+        "id": str(1700000000000 + index),
+        "etag": str(1700000000000 + index),
+        "messageType": "message",
+        "createdDateTime": f"2026-05-{rng.randint(1, 28):02d}T10:00:00Z",
+        "lastModifiedDateTime": f"2026-05-{rng.randint(1, 28):02d}T10:00:00Z",
+        "importance": "normal",
+        "locale": "en-us",
+        "webUrl": f"https://teams.microsoft.com/l/message/19%3Aabc/{index}",
+        "from": {"user": {"id": f"user-{name}", "displayName": name, "userIdentityType": "aadUser", "tenantId": "tenant"}},
+        "body": {"contentType": "html", "content": f"<div><p>{sentence(rng, 30)}</p><p><at id=\"0\">{name}</at></p></div>"},
+        "channelIdentity": {"teamId": "team-1", "channelId": "19:abc@thread.tacv2"},
+        "attachments": [],
+        "mentions": [{"id": 0, "mentionText": name, "mentioned": {"user": {"id": f"user-{name}", "displayName": name}}}],
+        "reactions": [{"reactionType": "like", "createdDateTime": "2026-05-02T10:00:00Z", "user": {"user": {"id": "u", "displayName": None}}}]
+    }
+
+
+def raw_meeting(rng: random.Random, index: int) -> dict:
+    name = rng.choice(PEOPLE)
+    style = "<style>" + "p.MsoNormal{margin:0cm;font-size:11pt;font-family:Calibri,sans-serif}" * 40 + "</style>"
+    agenda = "".join(f"<p class=\"MsoNormal\"><span style=\"font-size:11pt\">{sentence(rng, 20)}</span></p>" for _ in range(8))
+    join_block = "<div>" + "_" * 80 + "</div>" + "<div class=\"me-email-text\"><p>Microsoft Teams meeting</p>" + "<p>Join on your computer, mobile app or room device</p>" * 30 + "</div>"
+    return {
+        "id": f"AAMkAGI2EVT{index:08d}",
+        "subject": sentence(rng, 4),
+        "start": {"dateTime": "2026-05-04T15:00:00.0000000", "timeZone": "UTC"},
+        "end": {"dateTime": "2026-05-04T15:30:00.0000000", "timeZone": "UTC"},
+        "organizer": {"emailAddress": {"name": name, "address": f"{name.lower()}@example.com"}},
+        "attendees": [{"type": "required", "status": {"response": "none"}, "emailAddress": {"name": person, "address": f"{person.lower()}@example.com"}} for person in PEOPLE],
+        "isOnlineMeeting": True,
+        "onlineMeeting": {"joinUrl": f"https://teams.microsoft.com/l/meetup-join/19%3ameeting_{index}"},
+        "body": {"contentType": "html", "content": f"<html><head>{style}</head><body>{agenda}{join_block}</body></html>"}
+    }
+
+
+def raw_repository(rng: random.Random, index: int) -> dict:
+    full_name = REPOSITORIES[index % len(REPOSITORIES)]
+    api = f"https://api.github.com/repos/{full_name}"
+    return {
+        "id": index, "node_id": f"R_kgDO{index}", "name": full_name.split("/")[1], "full_name": full_name,
+        "private": rng.random() < 0.5, "owner": user(rng), "html_url": f"https://github.com/{full_name}",
+        "description": sentence(rng, 8), "fork": False, "url": api,
+        **{f"{field}_url": f"{api}/{field}" for field in (
+            "forks", "keys", "collaborators", "teams", "hooks", "issue_events", "events", "assignees", "branches", "tags",
+            "blobs", "git_tags", "git_refs", "trees", "statuses", "languages", "stargazers", "contributors", "subscribers",
+            "subscription", "commits", "git_commits", "comments", "issue_comment", "contents", "compare", "merges",
+            "archive", "downloads", "issues", "pulls", "milestones", "notifications", "labels", "releases", "deployments"
+        )},
+        "created_at": "2024-01-01T00:00:00Z", "updated_at": "2026-05-01T00:00:00Z", "pushed_at": "2026-05-01T00:00:00Z",
+        "git_url": f"git://github.com/{full_name}.git", "ssh_url": f"git@github.com:{full_name}.git",
+        "clone_url": f"https://github.com/{full_name}.git", "svn_url": f"https://github.com/{full_name}",
+        "homepage": None, "size": rng.randint(100, 100000), "stargazers_count": rng.randint(0, 500),
+        "watchers_count": rng.randint(0, 500), "language": rng.choice(LANGUAGES), "has_issues": True,
+        "has_projects": True, "has_downloads": True, "has_wiki": False, "has_pages": False, "has_discussions": False,
+        "forks_count": rng.randint(0, 50), "mirror_url": None, "archived": False, "disabled": False,
+        "open_issues_count": rng.randint(0, 30), "license": None, "allow_forking": True, "is_template": False,
+        "web_commit_signoff_required": False, "topics": [], "visibility": "private", "forks": 0, "open_issues": 0,
+        "watchers": 0, "default_branch": "main",
+        "permissions": {"admin": True, "maintain": True, "push": True, "triage": True, "pull": True}
+    }
+
+
+def raw_commit(rng: random.Random, index: int) -> dict:
+    name = rng.choice(PEOPLE)
+    signature = {"name": name, "email": f"{name.lower()}@example.com", "date": "2026-05-01T00:00:00Z"}
+    sha = f"{index:040x}"
+    return {
+        "sha": sha, "node_id": f"C_kwDO{index}", "url": f"https://api.github.com/repos/acme/x/commits/{sha}",
+        "html_url": f"https://github.com/acme/x/commit/{sha}", "comments_url": f"https://api.github.com/repos/acme/x/commits/{sha}/comments",
+        "commit": {
+            "author": signature, "committer": dict(signature), "message": sentence(rng, 10), "comment_count": 0,
+            "tree": {"sha": sha, "url": f"https://api.github.com/repos/acme/x/git/trees/{sha}"},
+            "url": f"https://api.github.com/repos/acme/x/git/commits/{sha}",
+            "verification": {"verified": False, "reason": "unsigned", "signature": None, "payload": None}
+        },
+        "author": user(rng), "committer": user(rng), "parents": [{"sha": sha, "url": "https://api.github.com/repos/acme/x/commits/p"}]
+    }
+
+
+def raw_issue(rng: random.Random, index: int) -> dict:
+    full_name = REPOSITORIES[index % len(REPOSITORIES)]
+    api = f"https://api.github.com/repos/{full_name}/issues/{index}"
+    return {
+        "url": api, "repository_url": f"https://api.github.com/repos/{full_name}", "labels_url": f"{api}/labels{{/name}}",
+        "comments_url": f"{api}/comments", "events_url": f"{api}/events", "html_url": f"https://github.com/{full_name}/issues/{index}",
+        "id": index, "node_id": f"I_kwDO{index}", "number": index, "title": sentence(rng, 7), "user": user(rng),
+        "labels": [], "state": rng.choice(["open", "closed"]), "locked": False, "assignee": None, "assignees": [],
+        "milestone": None, "comments": rng.randint(0, 10), "created_at": "2026-04-01T00:00:00Z",
+        "updated_at": "2026-05-01T00:00:00Z", "closed_at": None, "author_association": "OWNER",
+        "body": sentence(rng, 60), "reactions": {"url": f"{api}/reactions", "total_count": 0, "+1": 0, "-1": 0},
+        "timeline_url": f"{api}/timeline", "state_reason": None
+    }
+
+
+def measure(build) -> int:
+    """Bytes still allocated once the built value is kept alive"""
+    tracemalloc.start()
+    value = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del value
+    return current
+
+
+def main():
+    items = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ITEMS
+    kinds = [
+        ("emails", raw_email, EmailRecord.from_graph),
+        ("teams messages", raw_message, MessageRecord.from_graph),
+        ("meetings", raw_meeting, MeetingRecord.from_graph),
+        ("repositories", raw_repository, RepositoryRecord.from_github),
+        ("commits", raw_commit, lambda commit: CommitRecord.from_github(commit, "acme/x")),
+        ("issues", raw_issue, IssueRecord.from_github)
+    ]
+
+    print(f"{'kind':<16} {'raw':>10} {'records':>10} {'saved':>7}")
+    for label, build_raw, to_record in kinds:
+        raw_bytes = measure(lambda: [build_raw(random.Random(index), index) for index in range(items)])
+        # Each raw payload is dropped once its record is built, as at ingest
+        record_bytes = measure(lambda: [to_record(build_raw(random.Random(index), index)) for index in range(items)])
+        print(f"{label:<16} {raw_bytes / 2 ** 20:8.1f}MB {record_bytes / 2 ** 20:8.1f}MB {1 - record_bytes / raw_bytes:6.0%}")
+
+
+if __name__ == "__main__":
+    main()
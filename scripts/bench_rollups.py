@@ -0,0 +1,87 @@
+"""Micro-benchmark: activity pattern questions answered by recounting items vs from the rollups.
+
+Run from the repository root:
+
+    python scripts/bench_rollups.py [messages]
+
+Builds a synthetic Teams snapshot spread over the last four weeks, then times
+recounting it per call (hour, weekday and top channel counts in Python loops,
+as get_teams_insights used to) against reading the same figures from the
+incrementally maintained rollups, plus the cost of observing a refresh that
+adds a handful of new messages. No network calls are made.
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from api.services.record_service import MessageRecord
+from api.services.rollup_service import ActivityRollups
+
+DEFAULT_MESSAGES = 20000
+NEW_PER_REFRESH = 20
+REPEATS = 20
+PEOPLE = ["Alice", "Bob", "Carol", "Dan", "Erin", "Frank", "Grace", "Heidi"]
+CHANNELS = [(f"Team {team}", f"Channel {channel}") for team in range(8) for channel in range(6)]
+
+
+def message(rng: random.Random, index: int, now: datetime) -> MessageRecord:
+    created = (now - timedelta(minutes=rng.randint(0, 27 * 24 * 60))).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+    team, channel = rng.choice(CHANNELS)
+    return MessageRecord(
+        f"m{index}", created, None, "status update", False, rng.choice(PEOPLE),
+        None, team, channel, team, channel, None
+    )
+
+
+def recount(messages) -> dict:
+    """Hour, weekday and channel counts recomputed from every message"""
+    by_hour = [0] * 24
+    by_weekday = [0] * 7
+    channels = {}
+    for item in messages:
+        created = datetime.fromisoformat(item["createdDateTime"].replace("Z", "+00:00"))
+        by_hour[created.hour] += 1
+        by_weekday[created.weekday()] += 1
+        key = f"{item.get('team_name', 'Unknown')} - {item.get('channel_name', 'Unknown')}"
+        channels[key] = channels.get(key, 0) + 1
+    return {"by_hour": by_hour, "by_weekday": by_weekday, "top": sorted(channels.items(), key=lambda entry: -entry[1])[:5]}
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_MESSAGES
+    rng = random.Random(42)
+    now = datetime.now(timezone.utc)
+    messages = [message(rng, index, now) for index in range(count)]
+    rollups = ActivityRollups()
+
+    start = time.perf_counter()
+    rollups.observe("teams/all", {"messages": messages})
+    first_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        recount(messages)
+    recount_ms = (time.perf_counter() - start) / REPEATS * 1000
+
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        rollups.insights("teams")
+    query_ms = (time.perf_counter() - start) / REPEATS * 1000
+
+    # A refresh is mostly messages already counted plus a few new ones
+    refreshed = [message(rng, count + index, now) for index in range(NEW_PER_REFRESH)] + messages
+    start = time.perf_counter()
+    added = rollups.observe("teams/all", {"messages": refreshed})
+    refresh_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{count} messages: first observe {first_ms:.1f} ms, refresh with {added} new {refresh_ms:.1f} ms")
+    print(f"recount per question {recount_ms:.2f} ms, rollup query {query_ms:.2f} ms ({recount_ms / query_ms:.0f}x)")
+    print(rollups.activity_table("teams"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Micro-benchmark: full-text search over a local store of synthetic mail and Teams messages.
+
+Run from the repository root:
+
+    python scripts/bench_search.py [items]
+
+Fills a throwaway store with the given number of emails and as many Teams
+messages, through the same snapshot path the crawl jobs use, then times
+/search-style queries against it. No network calls are made.
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from api.services.store_service import LocalStore
+
+DEFAULT_ITEMS = 20000
+BATCH_SIZE = 1000
+QUERY_REPEATS = 50
+TOPIC_WORDS = ("budget review deploy release incident planning roadmap invoice contract hiring onboarding "
+               "offsite migration outage security audit design feedback quarterly customer launch").split()
+TOPIC_WORD_RATE = 0.03
+# Filler vocabulary, so topic words are as rare in the corpus as real subject words are in a mailbox
+FILLER_WORDS = [f"{a}{b}{c}" for a in "bcdfghklmnprstvz" for b in "aeiou" for c in ("la", "ro", "mi", "nu", "te", "sk", "ve", "do")]
+PEOPLE = ["Alice", "Bob", "Carol", "Dan", "Erin", "Frank", "Grace", "Heidi"]
+TEAMS = [("Engineering", "General"), ("Engineering", "Releases"), ("Sales", "Deals"), ("Ops", "Incidents")]
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(TOPIC_WORDS if rng.random() < TOPIC_WORD_RATE else FILLER_WORDS) for _ in range(words))
+
+
+def timestamp(rng: random.Random) -> str:
+    return f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00Z"
+
+
+def email(rng: random.Random, index: int) -> dict:
+    name = rng.choice(PEOPLE)
+    return {
+        "id": f"email-{index}",
+        "subject": sentence(rng, 5),
+        "bodyPreview": sentence(rng, 40),
+        "from": {"emailAddress": {"name": name, "address": f"{name.lower()}@example.com"}},
+        "receivedDateTime": timestamp(rng),
+        "isRead": rng.random() < 0.7
+    }
+
+
+def message(rng: random.Random, index: int) -> dict:
+    team, channel = rng.choice(TEAMS)
+    return {
+        "id": str(index),
+        "channelIdentity": {"teamId": team, "channelId": f"{team}-{channel}"},
+        "body": {"contentType": "html", "content": f"<p>{sentence(rng, 30)}</p>"},
+        "from": {"user": {"displayName": rng.choice(PEOPLE)}},
+        "createdDateTime": timestamp(rng),
+        "team_name": team,
+        "channel_name": channel
+    }
+
+
+def measure(label: str, fn) -> float:
+    fn()  # warm the page cache
+    start = time.perf_counter()
+    for _ in range(QUERY_REPEATS):
+        count = len(fn())
+    per_query_ms = (time.perf_counter() - start) / QUERY_REPEATS * 1000
+    print(f"{label:<40} {per_query_ms:8.2f} ms/query ({count} results)")
+    return per_query_ms
+
+
+def main():
+    items = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ITEMS
+    rng = random.Random(42)
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = LocalStore(os.path.join(directory, "bench.db"))
+
+        start = time.perf_counter()
+        for offset in range(0, items, BATCH_SIZE):
+            batch = range(offset, min(offset + BATCH_SIZE, items))
+            store.save_snapshot("emails/all", [email(rng, index) for index in batch])
+            store.save_snapshot("teams/all", {"messages": [message(rng, index) for index in batch], "meetings": []})
+        print(f"indexed {items * 2} items in {time.perf_counter() - start:.1f}s")
+
+        measure("one term", lambda: store.search("budget"))
+        measure("two terms", lambda: store.search("quarterly invoice"))
+        measure("prefix", lambda: store.search("migr*"))
+        measure("term + sender + date range", lambda: store.search("outage", sender="carol", since="2026-03-01", until="2026-06-30"))
+        measure("unread emails, no text", lambda: store.search(kinds=["email"], unread=True))
+        measure("term in a team and channel", lambda: store.search("release", team="Engineering", channel="Releases"))
+        store.stop()
+
+
+if __name__ == "__main__":
+    main()
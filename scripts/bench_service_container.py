@@ -0,0 +1,82 @@
+"""Micro-benchmark: per-request service construction vs the shared service container.
+
+Run from the repository root:
+
+    python scripts/bench_service_container.py [iterations]
+
+"Before" builds every service the way each request used to (fresh Gemini
+configuration, fresh auth env validation). "After" resolves the same
+services from the lifespan container. No network calls are made.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Placeholder credentials so the services can be constructed offline
+for name in ["GEMINI_API_KEY", "CLIENT_ID", "TENANT_ID", "REDIRECT_URI", "SCOPES",
+             "GITHUB_CLIENT_ID", "GITHUB_CLIENT_SECRET", "TEAMS_CLIENT_ID", "TEAMS_CLIENT_SECRET"]:
+    os.environ.setdefault(name, "benchmark")
+
+from api.services.ai_service import AIService
+from api.services.auth_service import AuthService
+from api.services.chatbot_service import ChatbotService
+from api.services.email_service import EmailService
+from api.services.github_auth_service import GitHubAuthService
+from api.services.github_chatbot_service import GitHubChatbotService
+from api.services.teams_auth_service import TeamsAuthService
+from api.services.teams_chatbot_service import TeamsChatbotService
+from api.services.service_container import ServiceContainer
+
+DEFAULT_ITERATIONS = 2000
+
+
+def per_request_construction():
+    """What one request paid before the container"""
+    AIService()
+    ChatbotService()
+    GitHubChatbotService()
+    TeamsChatbotService()
+    EmailService()
+    AuthService()
+    GitHubAuthService()
+    TeamsAuthService()
+
+
+def container_lookup(container: ServiceContainer):
+    """What one request pays with the container"""
+    container.ai_service
+    container.chatbot_service
+    container.github_chatbot_service
+    container.teams_chatbot_service
+    container.email_service
+    container.auth_service
+    container.github_auth_service
+    container.teams_auth_service
+
+
+def measure(label: str, fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    per_call_us = (time.perf_counter() - start) / iterations * 1e6
+    print(f"{label:<28} {per_call_us:10.1f} us/request")
+    return per_call_us
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ITERATIONS
+
+    container = ServiceContainer()
+    container_lookup(container)  # first use builds everything once
+
+    before = measure("per-request construction", per_request_construction, iterations)
+    after = measure("service container", lambda: container_lookup(container), iterations)
+    container.close()
+
+    print(f"{'speedup':<28} {before / after:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
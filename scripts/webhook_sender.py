@@ -0,0 +1,157 @@
+"""Local stand-in for Microsoft Graph and GitHub webhook deliveries.
+
+Run from the repository root against a running server:
+
+    python scripts/webhook_sender.py validate
+    python scripts/webhook_sender.py mail --change created --id <message id>
+    python scripts/webhook_sender.py mail --change deleted --id <message id>
+    python scripts/webhook_sender.py chat
+    python scripts/webhook_sender.py lifecycle --event reauthorizationRequired --subscription <id>
+    python scripts/webhook_sender.py github push --repo owner/name
+    python scripts/webhook_sender.py github issues --repo owner/name --number 7
+
+Graph notifications carry GRAPH_WEBHOOK_CLIENT_STATE and GitHub deliveries are
+signed with GITHUB_WEBHOOK_SECRET, both read from the environment (or .env),
+so the server must be started with the same values.
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_BASE_URL = "http://127.0.0.1:8000"
+
+
+def post(url: str, body: bytes, headers: dict):
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json", **headers}, method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            print(f"{response.status} {response.read().decode()}")
+    except urllib.error.HTTPError as e:
+        print(f"{e.code} {e.read().decode()}")
+
+
+def graph_notification(resource: str, change_type: str, resource_id: str, **extra) -> dict:
+    return {
+        "subscriptionId": extra.pop("subscription_id", str(uuid.uuid4())),
+        "clientState": os.getenv("GRAPH_WEBHOOK_CLIENT_STATE", ""),
+        "changeType": change_type,
+        "resource": resource,
+        "resourceData": {"id": resource_id},
+        "tenantId": str(uuid.uuid4()),
+        **extra
+    }
+
+
+def send_graph(base_url: str, path: str, notifications: list):
+    post(f"{base_url}{path}", json.dumps({"value": notifications}).encode(), {})
+
+
+def send_github(base_url: str, event: str, payload: dict):
+    body = json.dumps(payload).encode()
+    secret = os.getenv("GITHUB_WEBHOOK_SECRET", "")
+    signature = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    post(f"{base_url}/webhooks/github", body, {
+        "X-GitHub-Event": event,
+        "X-GitHub-Delivery": str(uuid.uuid4()),
+        "X-Hub-Signature-256": signature
+    })
+
+
+def github_payload(event: str, repo: str, number: int) -> dict:
+    repository = {"full_name": repo, "name": repo.split("/")[-1], "default_branch": "main"}
+    now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    if event == "push":
+        sha = uuid.uuid4().hex + uuid.uuid4().hex[:8]
+        return {
+            "ref": "refs/heads/main",
+            "repository": repository,
+            "commits": [{
+                "id": sha,
+                "message": "Stand-in commit from webhook_sender",
+                "timestamp": now,
+                "url": f"https://github.com/{repo}/commit/{sha}",
+                "author": {"name": "Webhook Sender", "email": "sender@example.com"}
+            }]
+        }
+    if event == "issues":
+        return {
+            "action": "opened",
+            "repository": repository,
+            "issue": {
+                "id": number * 1000,
+                "number": number,
+                "title": f"Stand-in issue #{number}",
+                "state": "open",
+                "created_at": now,
+                "updated_at": now,
+                "html_url": f"https://github.com/{repo}/issues/{number}",
+                "user": {"login": "webhook-sender"}
+            }
+        }
+    return {
+        "action": "closed",
+        "repository": repository,
+        "pull_request": {"number": number, "title": f"Stand-in PR #{number}", "state": "closed", "updated_at": now}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("validate", help="Graph subscription validation handshake")
+
+    mail = commands.add_parser("mail", help="Graph mail change notification")
+    mail.add_argument("--change", choices=["created", "updated", "deleted"], default="created")
+    mail.add_argument("--id", required=True, help="Message id")
+
+    chat = commands.add_parser("chat", help="Graph chat message notification")
+    chat.add_argument("--chat-id", default="19:stand-in@thread.v2")
+
+    lifecycle = commands.add_parser("lifecycle", help="Graph lifecycle notification")
+    lifecycle.add_argument("--event", choices=["reauthorizationRequired", "subscriptionRemoved", "missed"], required=True)
+    lifecycle.add_argument("--subscription", required=True, help="Subscription id (see /health)")
+    lifecycle.add_argument("--resource", default="me/mailFolders('Inbox')/messages")
+
+    github = commands.add_parser("github", help="Signed GitHub webhook delivery")
+    github.add_argument("event", choices=["ping", "push", "issues", "pull_request"])
+    github.add_argument("--repo", default="octocat/hello-world")
+    github.add_argument("--number", type=int, default=1)
+
+    args = parser.parse_args()
+
+    if args.command == "validate":
+        token = f"validation-{uuid.uuid4()}"
+        for path in ("/webhooks/graph", "/webhooks/graph/lifecycle"):
+            with urllib.request.urlopen(urllib.request.Request(f"{args.base_url}{path}?validationToken={token}", data=b"", method="POST"), timeout=10) as response:
+                echoed = response.read().decode()
+                print(f"{path}: {'ok' if echoed == token else 'MISMATCH: ' + echoed}")
+    elif args.command == "mail":
+        send_graph(args.base_url, "/webhooks/graph", [graph_notification(f"Users/stand-in/Messages/{args.id}", args.change, args.id)])
+    elif args.command == "chat":
+        message_id = str(int(time.time() * 1000))
+        resource = f"chats('{args.chat_id}')/messages('{message_id}')"
+        send_graph(args.base_url, "/webhooks/graph", [graph_notification(resource, "created", message_id)])
+    elif args.command == "lifecycle":
+        notification = graph_notification(args.resource, "", "", subscription_id=args.subscription, lifecycleEvent=args.event)
+        send_graph(args.base_url, "/webhooks/graph/lifecycle", [notification])
+    elif args.command == "github":
+        payload = {"zen": "Keep it logically awesome."} if args.event == "ping" else github_payload(args.event, args.repo, args.number)
+        send_github(args.base_url, args.event, payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
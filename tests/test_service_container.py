@@ -0,0 +1,62 @@
+"""Service container tests.
+
+Run from the repository root:
+
+    python -m pytest tests
+"""
+import os
+import sys
+import threading
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from api.services import service_container
+from api.services.ai_service import AIService
+from api.services.service_container import ServiceContainer
+
+BUILD_TIMEOUT_SECONDS = 5
+
+
+def build_in_thread(build):
+    """Run build() on a daemon thread, so a deadlock fails the test instead of hanging it"""
+    built = []
+    thread = threading.Thread(target=lambda: built.append(build()), daemon=True)
+    thread.start()
+    thread.join(BUILD_TIMEOUT_SECONDS)
+    assert not thread.is_alive(), "building the service deadlocked"
+    return built[0]
+
+
+def test_services_built_on_the_shared_model_do_not_deadlock(monkeypatch):
+    model = object()
+    monkeypatch.setattr(service_container, "create_gemini_model", lambda: model)
+    container = ServiceContainer()
+
+    ai_service = build_in_thread(lambda: container.ai_service)
+    assert isinstance(ai_service, AIService)
+    assert ai_service.model is model
+    assert build_in_thread(lambda: container.chatbot_service).model is model
+    assert container.ai_service is ai_service
+
+    build_in_thread(container.close)
+
+
+def test_failed_construction_is_retried(monkeypatch):
+    calls = []
+
+    def create_model():
+        calls.append(None)
+        if len(calls) == 1:
+            raise ValueError("GEMINI_API_KEY environment variable is required")
+        return object()
+
+    monkeypatch.setattr(service_container, "create_gemini_model", create_model)
+    container = ServiceContainer()
+
+    try:
+        container.model
+    except ValueError:
+        pass
+    assert build_in_thread(lambda: container.ai_service).model is not None
+    assert len(calls) == 2
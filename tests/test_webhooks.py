@@ -0,0 +1,294 @@
+"""Webhook router tests, driven by the payload builders of scripts/webhook_sender.py.
+
+Run from the repository root:
+
+    python -m pytest tests
+"""
+import hashlib
+import hmac
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+
+from api.routers import webhooks
+from api.services.record_service import MessageRecord
+from api.services.swr_cache_service import SWRCache, swr_key
+from api.services.webhook_service import (
+    GraphSubscriptionManager,
+    is_default_branch_push,
+    remove_by,
+    upsert_by,
+    verify_github_signature
+)
+from webhook_sender import github_payload, graph_notification
+
+CLIENT_STATE = "test-client-state"
+GITHUB_SECRET = "test-github-secret"
+TOKEN = "test-token"
+CHAT_ID = "19:stand-in@thread.v2"
+
+
+class RecordingSubscriptions(GraphSubscriptionManager):
+    """Subscription manager that records lifecycle handling instead of calling Graph"""
+
+    def __init__(self):
+        super().__init__(client_state=CLIENT_STATE)
+        self.calls = []
+
+    def renew(self, subscription_id: str) -> bool:
+        self.calls.append(("renew", subscription_id))
+        return True
+
+    def recreate(self, subscription_id: str):
+        self.calls.append(("recreate", subscription_id))
+
+
+@pytest.fixture
+def applied(monkeypatch):
+    """Captures the background work the router queues instead of touching the caches"""
+    calls = []
+    monkeypatch.setattr(webhooks, "apply_graph_notifications", lambda notifications: calls.append(("graph", notifications)))
+    monkeypatch.setattr(webhooks, "apply_github_event", lambda event, payload: calls.append((event, payload)))
+    return calls
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("GRAPH_WEBHOOK_CLIENT_STATE", CLIENT_STATE)
+    monkeypatch.setenv("GITHUB_WEBHOOK_SECRET", GITHUB_SECRET)
+    app = FastAPI()
+    app.include_router(webhooks.router)
+    subscriptions = RecordingSubscriptions()
+    app.dependency_overrides[webhooks.get_graph_subscriptions] = lambda: subscriptions
+    client = TestClient(app)
+    client.subscriptions = subscriptions
+    return client
+
+
+@pytest.fixture
+def caches(monkeypatch):
+    """A fresh snapshot cache seeded like a signed-in session, with Graph reads and job submission stubbed"""
+    cache = SWRCache()
+    cache.put(swr_key("emails/all", TOKEN), [{"id": "old", "isRead": True}, {"id": "AAA", "isRead": False, "subject": "before"}])
+    cache.put(swr_key("emails/unread", TOKEN), [{"id": "AAA", "isRead": False, "subject": "before"}])
+    cache.put(swr_key("teams/all", TOKEN), {
+        "messages": [{"id": "m1", "chatId": CHAT_ID, "chat_name": "Launch"}],
+        "total_messages": 1
+    })
+    cache.put(swr_key("github/all", TOKEN), {"commits": [], "total_commits": 0, "issues": [], "total_issues": 0})
+    cache.put(swr_key("github/pull-requests", TOKEN), [{"number": 1}])
+
+    emails = {"BBB": {"id": "BBB", "isRead": False, "subject": "new"}, "AAA": {"id": "AAA", "isRead": True, "subject": "after"}}
+    chat_messages = []
+
+    def get_chat_message(access_token, chat_id, message_id, chat=None):
+        chat_messages.append((chat_id, message_id))
+        return MessageRecord.from_graph({"id": message_id, "createdDateTime": "2024-05-01T10:30:00.0000000Z", "body": {"content": "hi"}}, chat=chat)
+
+    jobs = []
+    deleted = []
+    monkeypatch.setattr(webhooks, "swr_cache", cache)
+    monkeypatch.setattr(webhooks, "container", SimpleNamespace(
+        email_service=SimpleNamespace(get_email=lambda access_token, email_id: emails.get(email_id)),
+        teams_service=SimpleNamespace(get_chat_message=get_chat_message)
+    ))
+    monkeypatch.setattr(webhooks, "local_store", SimpleNamespace(delete_record=lambda kind, record_id: deleted.append((kind, record_id))))
+    monkeypatch.setattr(webhooks, "submit_job", lambda kind, refresh=False, **params: jobs.append((kind, params)))
+    for name in ("is_authenticated", "is_github_authenticated", "is_teams_authenticated"):
+        monkeypatch.setattr(webhooks, name, lambda: True)
+    monkeypatch.setitem(webhooks.tokens, "access_token", TOKEN)
+    monkeypatch.setitem(webhooks.teams_tokens, "teams_access_token", TOKEN)
+    return SimpleNamespace(cache=cache, jobs=jobs, deleted=deleted, chat_messages=chat_messages)
+
+
+def cached(caches, endpoint: str):
+    entry = caches.cache.peek(swr_key(endpoint, TOKEN))
+    return entry[0] if entry else None
+
+
+def sign(body: bytes, secret: str = GITHUB_SECRET) -> str:
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+@pytest.mark.parametrize("path", ["/webhooks/graph", "/webhooks/graph/lifecycle"])
+def test_validation_token_is_echoed_as_plain_text(client, path):
+    response = client.post(f"{path}?validationToken=validation-123")
+    assert response.status_code == 200
+    assert response.text == "validation-123"
+    assert response.headers["content-type"].startswith("text/plain")
+
+
+def test_graph_notifications_with_a_bad_client_state_are_dropped(client, applied):
+    good = graph_notification("Users/stand-in/Messages/AAA", "created", "AAA")
+    bad = {**graph_notification("Users/stand-in/Messages/BBB", "created", "BBB"), "clientState": "forged"}
+    response = client.post("/webhooks/graph", json={"value": [good, bad]})
+    assert response.status_code == 202
+    assert applied == [("graph", [good])]
+
+
+def test_graph_notifications_that_all_fail_verification_queue_nothing(client, applied):
+    bad = {**graph_notification("Users/stand-in/Messages/AAA", "deleted", "AAA"), "clientState": "forged"}
+    response = client.post("/webhooks/graph", json={"value": [bad]})
+    assert response.status_code == 202
+    assert applied == []
+
+
+def test_signed_github_delivery_is_accepted(client, applied):
+    payload = github_payload("issues", "octocat/hello-world", 7)
+    body = json.dumps(payload).encode()
+    response = client.post("/webhooks/github", content=body, headers={"X-GitHub-Event": "issues", "X-Hub-Signature-256": sign(body)})
+    assert response.status_code == 200
+    assert applied == [("issues", payload)]
+
+
+@pytest.mark.parametrize("signature", [None, "sha256=" + "0" * 64, sign(b"{}", "wrong-secret")])
+def test_unsigned_or_badly_signed_github_delivery_is_rejected(client, applied, signature):
+    body = json.dumps(github_payload("push", "octocat/hello-world", 1)).encode()
+    headers = {"X-GitHub-Event": "push"}
+    if signature is not None:
+        headers["X-Hub-Signature-256"] = signature
+    response = client.post("/webhooks/github", content=body, headers=headers)
+    assert response.status_code == 401
+    assert applied == []
+
+
+def test_verify_github_signature():
+    body = b'{"zen": "Keep it logically awesome."}'
+    assert verify_github_signature(GITHUB_SECRET, body, sign(body))
+    assert not verify_github_signature(GITHUB_SECRET, body + b" ", sign(body))
+    assert not verify_github_signature(GITHUB_SECRET, body, None)
+    assert not verify_github_signature(None, body, sign(body))
+
+
+def test_upsert_by_replaces_in_place_or_prepends():
+    items = [{"id": "a", "v": 1}, {"id": "b", "v": 1}]
+    assert upsert_by(items, {"id": "b", "v": 2}) == [{"id": "a", "v": 1}, {"id": "b", "v": 2}]
+    assert upsert_by(items, {"id": "c", "v": 1}) == [{"id": "c", "v": 1}] + items
+    assert upsert_by(items, {"id": "c", "v": 1}, prepend=False) == items + [{"id": "c", "v": 1}]
+    assert items == [{"id": "a", "v": 1}, {"id": "b", "v": 1}]
+
+
+def test_remove_by():
+    items = [{"sha": "1"}, {"sha": "2"}]
+    assert remove_by(items, "1", "sha") == [{"sha": "2"}]
+    assert remove_by(items, "3", "sha") == items
+
+
+def test_is_default_branch_push():
+    payload = github_payload("push", "octocat/hello-world", 1)
+    assert is_default_branch_push(payload)
+    assert not is_default_branch_push({**payload, "ref": "refs/heads/feature"})
+    assert not is_default_branch_push({**payload, "ref": "refs/tags/v1.0"})
+    assert not is_default_branch_push({"ref": "refs/heads/main", "repository": {}})
+
+
+def test_new_mail_is_added_to_the_cached_lists(client, caches):
+    response = client.post("/webhooks/graph", json={"value": [graph_notification("Users/stand-in/Messages/BBB", "created", "BBB")]})
+    assert response.status_code == 202
+    assert [email["id"] for email in cached(caches, "emails/all")] == ["BBB", "old", "AAA"]
+    assert [email["id"] for email in cached(caches, "emails/unread")] == ["BBB", "AAA"]
+    assert caches.jobs == [("email-summary", {"from_cache": True})]
+
+
+def test_mail_marked_read_leaves_the_unread_list(client, caches):
+    client.post("/webhooks/graph", json={"value": [graph_notification("Users/stand-in/Messages/AAA", "updated", "AAA")]})
+    assert cached(caches, "emails/all")[1] == {"id": "AAA", "isRead": True, "subject": "after"}
+    assert cached(caches, "emails/unread") == []
+
+
+def test_deleted_mail_is_removed_everywhere(client, caches):
+    client.post("/webhooks/graph", json={"value": [graph_notification("Users/stand-in/Messages/AAA", "deleted", "AAA")]})
+    assert [email["id"] for email in cached(caches, "emails/all")] == ["old"]
+    assert cached(caches, "emails/unread") == []
+    assert caches.deleted == [("email", "AAA")]
+
+
+def test_chat_message_is_patched_into_the_teams_snapshot(client, caches):
+    resource = f"chats('{CHAT_ID}')/messages('m2')"
+    client.post("/webhooks/graph", json={"value": [graph_notification(resource, "created", "m2")]})
+    teams_data = cached(caches, "teams/all")
+    assert [message["id"] for message in teams_data["messages"]] == ["m2", "m1"]
+    assert teams_data["total_messages"] == 2
+    # Labelled with the chat name the cached messages of that chat carry
+    assert teams_data["messages"][0]["chat_name"] == "Launch"
+    assert caches.chat_messages == [(CHAT_ID, "m2")]
+    assert caches.jobs == [("teams-summary", {"from_cache": True})]
+
+
+def test_deleted_chat_message_is_removed_from_the_teams_snapshot(client, caches):
+    resource = f"chats('{CHAT_ID}')/messages('m1')"
+    client.post("/webhooks/graph", json={"value": [graph_notification(resource, "deleted", "m1")]})
+    assert cached(caches, "teams/all") == {"messages": [], "total_messages": 0}
+    assert caches.deleted == [("message", f"{CHAT_ID}/m1")]
+
+
+def test_meeting_change_recrawls_teams_but_keeps_serving_the_snapshot(client, caches):
+    client.post("/webhooks/graph", json={"value": [graph_notification("Users/stand-in/Events/e1", "updated", "e1")]})
+    assert cached(caches, "teams/all")["total_messages"] == 1
+    assert caches.jobs == [("teams-summary", {"from_cache": False})]
+
+
+def test_unsupported_graph_resource_changes_nothing(client, caches):
+    client.post("/webhooks/graph", json={"value": [graph_notification("Users/stand-in/Contacts/c1", "created", "c1")]})
+    assert len(cached(caches, "emails/all")) == 2
+    assert caches.jobs == []
+
+
+def test_missed_notifications_drop_the_snapshot_and_resync(client, caches):
+    notification = graph_notification("me/mailFolders('Inbox')/messages", "", "", subscription_id="sub-1", lifecycleEvent="missed")
+    response = client.post("/webhooks/graph/lifecycle", json={"value": [notification]})
+    assert response.status_code == 202
+    assert cached(caches, "emails/all") is None
+    assert cached(caches, "emails/unread") is None
+    assert cached(caches, "teams/all") is not None
+    assert caches.jobs == [("email-summary", {})]
+
+
+@pytest.mark.parametrize("event, handled", [("reauthorizationRequired", "renew"), ("subscriptionRemoved", "recreate")])
+def test_lifecycle_notifications_renew_or_recreate_the_subscription(client, caches, event, handled):
+    notification = graph_notification("me/events", "", "", subscription_id="sub-1", lifecycleEvent=event)
+    client.post("/webhooks/graph/lifecycle", json={"value": [notification, {**notification, "clientState": "forged"}]})
+    assert client.subscriptions.calls == [(handled, "sub-1")]
+
+
+def post_github(client, event: str, payload: dict):
+    body = json.dumps(payload).encode()
+    return client.post("/webhooks/github", content=body, headers={"X-GitHub-Event": event, "X-Hub-Signature-256": sign(body)})
+
+
+def test_issue_event_is_patched_into_the_github_snapshot(client, caches):
+    post_github(client, "issues", github_payload("issues", "octocat/hello-world", 7))
+    github_data = cached(caches, "github/all")
+    assert [issue["number"] for issue in github_data["issues"]] == [7]
+    assert github_data["total_issues"] == 1
+    assert caches.jobs == [("github-summary", {"from_cache": True})]
+
+
+def test_default_branch_push_is_patched_into_the_github_snapshot(client, caches):
+    payload = github_payload("push", "octocat/hello-world", 1)
+    post_github(client, "push", payload)
+    github_data = cached(caches, "github/all")
+    assert [commit["sha"] for commit in github_data["commits"]] == [payload["commits"][0]["id"]]
+    assert github_data["total_commits"] == 1
+
+
+def test_feature_branch_push_changes_nothing(client, caches):
+    post_github(client, "push", {**github_payload("push", "octocat/hello-world", 1), "ref": "refs/heads/feature"})
+    assert cached(caches, "github/all")["total_commits"] == 0
+    assert caches.jobs == []
+
+
+def test_pull_request_event_drops_the_cached_pull_requests(client, caches):
+    post_github(client, "pull_request", github_payload("pull_request", "octocat/hello-world", 1))
+    assert cached(caches, "github/pull-requests") is None
+    assert cached(caches, "github/all") is None
+    assert caches.jobs == [("github-summary", {"from_cache": True})]